@@ -0,0 +1,205 @@
+"""Benchmarks of the utxterm pipeline on generated diagrams.
+
+Run with `python -m benchmarks --help`.
+"""
+
+import os
+import sys
+import json
+import platform
+import argparse
+import subprocess
+from pathlib import Path
+from dataclasses import asdict
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from benchmarks._generate import DiagramSpec, generate_utxt, generate_puml
+from benchmarks._measure import (
+    Measurement,
+    measure,
+    format_table,
+    format_comparison,
+)
+from benchmarks._fake_plantuml import install_fake_plantuml
+
+from utxterm._pumlcallable import InPath
+from utxterm._render_puml import render_puml, render_diagrams
+from utxterm._read_file import read_utxt_content
+from utxterm._replace_formatting import (
+    ReplaceMode,
+    replace_formatting,
+    get_ansi_color,
+    set_segment_cache_size,
+)
+from utxterm._grid import reflow_formatting
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_args() -> argparse.Namespace:
+    defaults: DiagramSpec = DiagramSpec()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the utxterm pipeline on generated diagrams.",
+    )
+    parser.add_argument("--objects", type=int, default=defaults.objects)
+    parser.add_argument(
+        "--lines-per-object", type=int, default=defaults.lines_per_object
+    )
+    parser.add_argument("--line-width", type=int, default=defaults.line_width)
+    parser.add_argument(
+        "--tag-density", type=float, default=defaults.tag_density
+    )
+    parser.add_argument(
+        "--nesting-depth", type=int, default=defaults.nesting_depth
+    )
+    parser.add_argument("--hex-ratio", type=float, default=defaults.hex_ratio)
+    parser.add_argument("--columns", type=int, default=defaults.columns)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--skip-plantuml",
+        action="store_true",
+        help="Do not benchmark rendering with the fake plantuml.",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Write the results as JSON."
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="JSON results of a previous run."
+    )
+    return parser.parse_args()
+
+
+def run_formatting(spec: DiagramSpec, repeat: int) -> list[Measurement]:
+    utxt: str = generate_utxt(spec)
+    size: int = len(utxt.encode())
+    measurements: list[Measurement] = []
+    # Every repetition formats the same segments, which would otherwise only
+    # measure the lookups in the segment cache.
+    set_segment_cache_size(0)
+
+    for mode in ReplaceMode:
+        measurements.append(
+            measure(
+                "replace_formatting",
+                lambda mode=mode: replace_formatting(utxt, mode),
+                size,
+                repeat,
+                mode=mode.value,
+            )
+        )
+    measurements.append(
+        measure(
+            "reflow_formatting",
+            lambda: reflow_formatting(utxt, ReplaceMode.align_left),
+            size,
+            repeat,
+        )
+    )
+
+    color_specs: list[str] = [
+        "red",
+        "brightgreen",
+        "#D27E99",
+        "#00ff00",
+    ] * 1000
+    measurements.append(
+        measure(
+            "get_ansi_color",
+            lambda: [get_ansi_color(spec) for spec in color_specs],
+            sum(len(spec) for spec in color_specs),
+            repeat,
+        )
+    )
+    return measurements
+
+
+def run_plantuml(spec: DiagramSpec, repeat: int) -> list[Measurement]:
+    """Render with the fake plantuml, measuring everything but the JVM."""
+
+    measurements: list[Measurement] = []
+    with TemporaryDirectory() as temp_dir_str:
+        temp_dir: Path = Path(temp_dir_str)
+        install_fake_plantuml(temp_dir)
+        old_path: str = os.environ.get("PATH", "")
+        os.environ["PATH"] = f"{temp_dir_str}{os.pathsep}{old_path}"
+
+        try:
+            source: str = generate_puml(spec)
+            puml_file: Path = temp_dir / "diagram.puml"
+            puml_file.write_text(source)
+            size: int = len(source.encode())
+
+            measurements.append(
+                measure(
+                    "render_puml",
+                    lambda: read_utxt_content(render_puml(puml_file, InPath())),
+                    size,
+                    repeat,
+                )
+            )
+            measurements.append(
+                measure(
+                    "render_diagrams[8]",
+                    lambda: render_diagrams([source] * 8, InPath()),
+                    size * 8,
+                    repeat,
+                )
+            )
+        finally:
+            os.environ["PATH"] = old_path
+
+    return measurements
+
+
+def main():
+    args: argparse.Namespace = _parse_args()
+    spec: DiagramSpec = DiagramSpec(
+        objects=args.objects,
+        lines_per_object=args.lines_per_object,
+        line_width=args.line_width,
+        tag_density=args.tag_density,
+        nesting_depth=args.nesting_depth,
+        hex_ratio=args.hex_ratio,
+        columns=args.columns,
+        seed=args.seed,
+    )
+
+    measurements: list[Measurement] = run_formatting(spec, args.repeat)
+    if not args.skip_plantuml:
+        measurements.extend(run_plantuml(spec, args.repeat))
+
+    print(format_table(measurements))
+
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            baseline: dict[str, Any] = json.load(f)
+        print()
+        print(
+            format_comparison(
+                [Measurement.from_dict(m) for m in baseline["measurements"]],
+                measurements,
+            )
+        )
+
+    if args.output is not None:
+        result: dict[str, Any] = {
+            "commit": _git_commit(),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "spec": asdict(spec),
+            "measurements": [m.as_dict() for m in measurements],
+        }
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
@@ -0,0 +1,84 @@
+"""Stand-in for the plantuml command in `-pipe` mode, the only mode `utxterm`
+uses, without starting a JVM. Used by the benchmarks and the tests.
+
+Every object of a diagram is drawn as a box. Diagrams without objects are
+answered with a line containing the process id instead. A line in the
+diagram changes what happens:
+
+- `crash`: exit without answering.
+- `hang`: never answer.
+- `drip`: answer with ten lines, one every 0.1 seconds.
+"""
+
+import os
+import re
+import sys
+import stat
+import time
+from pathlib import Path
+from typing import Final
+
+from benchmarks._generate import draw_utxt
+
+
+OBJECT_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"object (\S+) \{\n(.*?)\n\}", re.DOTALL
+)
+
+
+def render(source: str) -> str:
+    objects: list[tuple[str, list[str]]] = [
+        (name, [line.strip() for line in body.split("\n")])
+        for name, body in OBJECT_PATTERN.findall(source)
+    ]
+    if len(objects) == 0:
+        return f"│{os.getpid()}│\n"
+    return draw_utxt(objects, 4)
+
+
+def main():
+    args: list[str] = sys.argv[1:]
+    delimiter: str = args[args.index("-pipedelimitor") + 1]
+
+    block: list[str] = []
+    for line in sys.stdin:
+        block.append(line)
+        if not line.strip().lower().startswith("@end"):
+            continue
+
+        commands: set[str] = {line.strip() for line in block}
+        if "crash" in commands:
+            sys.exit(1)
+        if "hang" in commands:
+            time.sleep(3600)
+        if "drip" in commands:
+            for index in range(10):
+                time.sleep(0.1)
+                print(f"│drip {index}│", flush=True)
+        sys.stdout.write(render("".join(block)))
+        sys.stdout.write(f"{delimiter}\n")
+        sys.stdout.flush()
+        block = []
+
+
+def install_fake_plantuml(directory: Path) -> Path:
+    """Write an executable `plantuml` into the directory and return it.
+
+    The directory has to be put in front of `PATH` to be picked up.
+    """
+
+    import utxterm
+
+    # plantuml runs in the directory of the rendered file, where a relative
+    # `PYTHONPATH` would not find the modules anymore.
+    paths: list[str] = [
+        str(Path(__file__).resolve().parent.parent),
+        str(Path(utxterm.__file__).resolve().parent.parent),
+    ]
+    executable: Path = directory / "plantuml"
+    with open(executable, "w") as f:
+        f.write(f"#!{sys.executable}\n")
+        f.write(f"import sys\nsys.path[:0] = {paths!r}\n")
+        f.write("from benchmarks._fake_plantuml import main\nmain()\n")
+    os.chmod(executable, os.stat(executable).st_mode | stat.S_IEXEC)
+    return executable
@@ -0,0 +1,150 @@
+import random
+from dataclasses import dataclass
+from typing import Final
+
+from utxterm._colors import ColorDict
+
+
+ATTRIBUTE_TAGS: Final[tuple[str, ...]] = ("b", "i", "u", "s")
+WORDS: Final[tuple[str, ...]] = (
+    "id",
+    "name",
+    "value",
+    "status",
+    "created",
+    "updated",
+    "owner",
+    "count",
+    "ERROR",
+    "OK",
+)
+
+#: Columns between two boxes placed next to each other.
+BOX_GAP: Final[int] = 2
+
+
+@dataclass(frozen=True)
+class DiagramSpec:
+    """Parameters of a generated diagram."""
+
+    objects: int = 100
+    lines_per_object: int = 5
+    #: Visible width of every text line, excluding the tags.
+    line_width: int = 40
+    #: Fraction of text lines containing tags.
+    tag_density: float = 0.5
+    #: Number of tags nested into each other on a tagged line.
+    nesting_depth: int = 1
+    #: Fraction of color tags using a hex code instead of a color name.
+    hex_ratio: float = 0.5
+    #: Number of boxes placed next to each other.
+    columns: int = 4
+    seed: int = 0
+
+
+def _random_color(rng: random.Random, spec: DiagramSpec) -> str:
+    if rng.random() < spec.hex_ratio:
+        return f"#{rng.randrange(0x1000000):06x}"
+    return rng.choice(list(ColorDict))
+
+
+def _random_tags(rng: random.Random, spec: DiagramSpec) -> list[str]:
+    tags: list[str] = []
+    for _ in range(spec.nesting_depth):
+        if rng.random() < 0.5:
+            tags.append(f"color:{_random_color(rng, spec)}")
+        else:
+            tags.append(rng.choice(ATTRIBUTE_TAGS))
+    return tags
+
+
+def generate_line(rng: random.Random, spec: DiagramSpec) -> str:
+    """Generate a single text line of an object with the given spec."""
+
+    words: list[str] = []
+    length: int = 0
+    while length < spec.line_width:
+        word: str = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    text: str = " ".join(words)[: spec.line_width].rstrip()
+
+    if rng.random() >= spec.tag_density:
+        return text
+
+    split: int = rng.randrange(len(text) + 1)
+    before, content = text[:split], text[split:]
+    for tag in _random_tags(rng, spec):
+        name: str = tag.split(":")[0]
+        content = f"<{tag}>{content}</{name}>"
+    return f"{before}{content}"
+
+
+def _generate_objects(spec: DiagramSpec) -> list[tuple[str, list[str]]]:
+    rng: random.Random = random.Random(spec.seed)
+    return [
+        (
+            f"Object{index}",
+            [generate_line(rng, spec) for _ in range(spec.lines_per_object)],
+        )
+        for index in range(spec.objects)
+    ]
+
+
+def _draw_box(name: str, lines: list[str]) -> list[str]:
+    width: int = max(len(line) for line in [name, *lines])
+    return [
+        f"┌{'─' * width}┐",
+        f"│{name.ljust(width)}│",
+        f"├{'─' * width}┤",
+        *[f"│{line.ljust(width)}│" for line in lines],
+        f"└{'─' * width}┘",
+    ]
+
+
+def draw_utxt(objects: list[tuple[str, list[str]]], columns: int) -> str:
+    """Draw the objects as boxes, `columns` of them next to each other.
+
+    Boxes in the same row are connected on their name line.
+    """
+
+    rows: list[str] = []
+    for start in range(0, len(objects), columns):
+        boxes: list[list[str]] = [
+            _draw_box(name, lines)
+            for name, lines in objects[start : start + columns]
+        ]
+        height: int = max(len(box) for box in boxes)
+        for line_index in range(height):
+            parts: list[str] = []
+            for box_index, box in enumerate(boxes):
+                box_width: int = len(box[0])
+                if box_index != 0:
+                    gap: str = "-" if line_index == 1 else " "
+                    parts.append(gap * BOX_GAP)
+                if line_index < len(box):
+                    parts.append(box[line_index])
+                else:
+                    parts.append(" " * box_width)
+            rows.append("".join(parts))
+        rows.append("")
+    return "\n".join(rows)
+
+
+def generate_utxt(spec: DiagramSpec) -> str:
+    """Generate the utxt output plantuml would produce for the spec."""
+    return draw_utxt(_generate_objects(spec), spec.columns)
+
+
+def generate_puml(spec: DiagramSpec) -> str:
+    """Generate a plantuml object diagram for the spec."""
+
+    parts: list[str] = ["@startuml", ""]
+    for name, lines in _generate_objects(spec):
+        parts.append(f"object {name} {{")
+        parts.extend(f"    {line}" for line in lines)
+        parts.append("}")
+        parts.append("")
+    parts.append("@enduml")
+    parts.append("")
+    return "\n".join(parts)
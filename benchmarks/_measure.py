@@ -0,0 +1,106 @@
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class Measurement:
+    stage: str
+    mode: str | None
+    repeat: int
+    best_seconds: float
+    mean_seconds: float
+    input_bytes: int
+    throughput_mb_s: float
+    peak_memory_bytes: int
+
+    @property
+    def key(self) -> str:
+        if self.mode is None:
+            return self.stage
+        return f"{self.stage}[{self.mode}]"
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> "Measurement":
+        return Measurement(**data)
+
+
+def measure(
+    stage: str,
+    func: Callable[[], Any],
+    input_bytes: int,
+    repeat: int,
+    mode: str | None = None,
+) -> Measurement:
+    """Time `func` `repeat` times and measure its peak memory once.
+
+    Memory is measured in a separate run, since tracing allocations slows
+    down the code considerably.
+    """
+
+    timings: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best: float = min(timings)
+    return Measurement(
+        stage=stage,
+        mode=mode,
+        repeat=repeat,
+        best_seconds=best,
+        mean_seconds=sum(timings) / len(timings),
+        input_bytes=input_bytes,
+        throughput_mb_s=input_bytes / best / 1e6 if best > 0 else 0.0,
+        peak_memory_bytes=peak_memory,
+    )
+
+
+def format_table(measurements: list[Measurement]) -> str:
+    lines: list[str] = [
+        f"{'stage':<32} {'best ms':>10} {'mean ms':>10} "
+        f"{'MB/s':>9} {'peak KiB':>10}"
+    ]
+    for m in measurements:
+        lines.append(
+            f"{m.key:<32} {m.best_seconds * 1e3:>10.2f} "
+            f"{m.mean_seconds * 1e3:>10.2f} {m.throughput_mb_s:>9.2f} "
+            f"{m.peak_memory_bytes / 1024:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(
+    baseline: list[Measurement], current: list[Measurement]
+) -> str:
+    """Compare the best time of every stage present in both runs."""
+
+    baseline_by_key: dict[str, Measurement] = {m.key: m for m in baseline}
+    lines: list[str] = [
+        f"{'stage':<32} {'before ms':>10} {'after ms':>10} {'change':>8}"
+    ]
+    for m in current:
+        old: Measurement | None = baseline_by_key.get(m.key)
+        if old is None:
+            continue
+        change: float = (m.best_seconds / old.best_seconds - 1) * 100
+        lines.append(
+            f"{m.key:<32} {old.best_seconds * 1e3:>10.2f} "
+            f"{m.best_seconds * 1e3:>10.2f} {change:>+7.1f}%"
+        )
+    return "\n".join(lines)
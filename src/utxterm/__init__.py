@@ -1,29 +1,104 @@
-import logging
+import sys
+from typing import TYPE_CHECKING, Any, Final
 
-from utxterm._argparse import setup_argparse, CliArgs
-from utxterm._validate import generate_config, Config
-from utxterm._render_puml import render_puml, UtxtPath
-from utxterm._read_file import read_utxt_content
-from utxterm._replace_formatting import replace_loop
+if TYPE_CHECKING:
+    from utxterm._colors import ColorDepth
+    from utxterm._pumlcallable import (
+        PlantUmlNotAvailable,
+        PlantUmlRenderError,
+    )
+    from utxterm._replace_formatting import ReplaceMode, set_segment_cache_size
+    from utxterm._renderer import Renderer
+    from utxterm._width import display_width
+    from utxterm._tags import TagHandler, InvalidTagHandler
+    from utxterm._emit import EMITTERS, HTML_STYLESHEET, UnknownEmitter, emit
+    from utxterm._plantuml_pool import (
+        PlantUmlWorkerError,
+        PlantUmlRenderTimeout,
+    )
+    from utxterm._async_render import AsyncRenderer, RenderQueueFull
+    from utxterm._timings import (
+        Timings,
+        TimingEvent,
+        TimingHook,
+        add_timing_hook,
+        remove_timing_hook,
+    )
 
 
-LOGGER: logging.Logger = logging.getLogger(__name__)
+#: Module defining each of the public names. Modules are only imported once
+#: one of their names is used, so a command line forwarded to a running
+#: daemon imports none of them.
+_EXPORTS: Final[dict[str, str]] = {
+    "Renderer": "utxterm._renderer",
+    "AsyncRenderer": "utxterm._async_render",
+    "RenderQueueFull": "utxterm._async_render",
+    "ReplaceMode": "utxterm._replace_formatting",
+    "set_segment_cache_size": "utxterm._replace_formatting",
+    "ColorDepth": "utxterm._colors",
+    "display_width": "utxterm._width",
+    "TagHandler": "utxterm._tags",
+    "InvalidTagHandler": "utxterm._tags",
+    "emit": "utxterm._emit",
+    "EMITTERS": "utxterm._emit",
+    "HTML_STYLESHEET": "utxterm._emit",
+    "UnknownEmitter": "utxterm._emit",
+    "PlantUmlNotAvailable": "utxterm._pumlcallable",
+    "PlantUmlRenderError": "utxterm._pumlcallable",
+    "PlantUmlWorkerError": "utxterm._plantuml_pool",
+    "PlantUmlRenderTimeout": "utxterm._plantuml_pool",
+    "Timings": "utxterm._timings",
+    "TimingEvent": "utxterm._timings",
+    "TimingHook": "utxterm._timings",
+    "add_timing_hook": "utxterm._timings",
+    "remove_timing_hook": "utxterm._timings",
+}
 
 
 def main():
-    args: CliArgs = setup_argparse()
-    if args.verbose:
-        logging.basicConfig(
-            level=logging.INFO, format="[%(levelname)s] %(message)s "
-        )
-    config: Config = generate_config(args)
-
-    utxt_path: UtxtPath = config.filepath
-    if config.is_puml:
-        LOGGER.info("Rendering the puml file.")
-        utxt_path = render_puml(config.filepath, config.plantuml_callable)
-
-    utxt_content: str = read_utxt_content(utxt_path)
-    terminal_content: str = replace_loop(utxt_content, config.mode)
-
-    print(terminal_content, end="")
+    from utxterm._client import forward
+
+    status: int | None = forward(sys.argv[1:])
+    if status is not None:
+        raise SystemExit(status)
+
+    from utxterm._cli import run
+
+    run()
+
+
+def __getattr__(name: str) -> Any:
+    module_name: str | None = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    return getattr(importlib.import_module(module_name), name)
+
+
+__all__ = [
+    "main",
+    "Renderer",
+    "AsyncRenderer",
+    "RenderQueueFull",
+    "ReplaceMode",
+    "set_segment_cache_size",
+    "ColorDepth",
+    "display_width",
+    "TagHandler",
+    "InvalidTagHandler",
+    "emit",
+    "EMITTERS",
+    "HTML_STYLESHEET",
+    "UnknownEmitter",
+    "PlantUmlNotAvailable",
+    "PlantUmlRenderError",
+    "PlantUmlWorkerError",
+    "PlantUmlRenderTimeout",
+    "Timings",
+    "TimingEvent",
+    "TimingHook",
+    "add_timing_hook",
+    "remove_timing_hook",
+]
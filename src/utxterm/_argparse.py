@@ -1,33 +1,105 @@
+from __future__ import annotations
+import os
+import sys
+import codecs
 import argparse
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 from dataclasses import dataclass
 
-from utxterm._replace_formatting import ReplaceMode
+from utxterm._colors import ColorDepth
+
+if TYPE_CHECKING:
+    from utxterm._replace_formatting import ReplaceMode
 
 
 @dataclass
 class CliArgs:
-    filepath: str
+    filepaths: list[str]
     verbose: bool
     mode: ReplaceMode
+    no_cache: bool
+    cache_stats: bool
+    jobs: int | None
+    output_dir: str | None
+    watch: bool
+    reflow: bool
+    timings: Literal["text", "json"] | None
+    profile: str | None
+    color: str | None
+    pager: bool
+    diagram: int | None
+    daemon: bool
+    idle_timeout: float
+    no_daemon: bool
+    encoding: str
+    segment_cache_size: int
+
+
+def _encoding(value: str) -> str:
+    try:
+        return codecs.lookup(value).name
+    except LookupError as e:
+        raise argparse.ArgumentTypeError(f"unknown encoding: '{value}'") from e
+
+
+def _terminal_columns() -> int:
+    """Like `shutil.get_terminal_size`, without importing `shutil`, which
+    imports all compression modules.
+    """
+
+    try:
+        return int(os.environ["COLUMNS"])
+    except (KeyError, ValueError):
+        pass
+    if sys.__stdout__ is None:
+        return 80
+    try:
+        return os.get_terminal_size(sys.__stdout__.fileno()).columns
+    except (ValueError, OSError):
+        return 80
+
 
+class _HelpFormatter(argparse.RawTextHelpFormatter):
+    """`RawTextHelpFormatter` which does not import `shutil` for the width.
+
+    A formatter is created for every argument added to the parser.
+    """
+
+    def __init__(
+        self,
+        prog: str,
+        indent_increment: int = 2,
+        max_help_position: int = 24,
+        width: int | None = None,
+    ):
+        if width is None:
+            width = _terminal_columns() - 2
+        super().__init__(prog, indent_increment, max_help_position, width)
+
+
+def setup_argparse(argv: list[str] | None = None) -> CliArgs:
+    # Only needed for the defaults, so importing this module stays cheap.
+    from utxterm._client import DEFAULT_IDLE_TIMEOUT
+    from utxterm._replace_formatting import ReplaceMode, SEGMENT_CACHE_SIZE
 
-def setup_argparse() -> CliArgs:
     parser: argparse.ArgumentParser = argparse.ArgumentParser(
         prog="utxt",
         description=(
             "View ASCII-based or unicode-based puml diagrams "
             "in your terminal with color."
         ),
-        formatter_class=argparse.RawTextHelpFormatter,
+        formatter_class=_HelpFormatter,
     )
 
     parser.add_argument(
-        "filepath",
+        "filepaths",
         type=str,
+        nargs="*",
         help=(
-            "The file view. If it has the file extension `.puml`, "
-            "it will first be rendered."
+            "The files to view. Glob patterns like `docs/**/*.puml` are\n"
+            "expanded. Files with the extension `.puml` will first be\n"
+            "rendered. Multiple files are printed one after another in\n"
+            "the given order."
         ),
     )
 
@@ -76,10 +148,204 @@ def setup_argparse() -> CliArgs:
             "\n"
             "| before <color:blue>Blue Text</color> after |\n"
             "|           before Blue Text after           |\n"
-        )
+        ),
+    )
+
+    parser.add_argument(
+        "--color",
+        default=None,
+        choices=ColorDepth.as_list(),
+        help=(
+            "Colors supported by the terminal. Hex colors are converted to\n"
+            "the nearest available color, `none` only removes the tags.\n"
+            "Detected from `NO_COLOR`, `COLORTERM` and `TERM` by default."
+        ),
+    )
+
+    parser.add_argument(
+        "--encoding",
+        type=_encoding,
+        default="utf-8",
+        help=(
+            "Encoding of the input files and stdin. UTF-8 input is\n"
+            "formatted without decoding the lines which contain no tags.\n"
+            "Defaults to `utf-8`."
+        ),
+    )
+
+    parser.add_argument(
+        "--segment-cache-size",
+        type=int,
+        default=SEGMENT_CACHE_SIZE,
+        metavar="N",
+        help=(
+            "Number of formatted segments remembered, so rows repeated\n"
+            "throughout a diagram are only formatted once. `0` disables\n"
+            f"it. Defaults to {SEGMENT_CACHE_SIZE}."
+        ),
+    )
+
+    parser.add_argument(
+        "-d",
+        "--diagram",
+        type=int,
+        default=None,
+        metavar="N",
+        help=(
+            "Only show the N-th diagram (starting at 1) of `.puml` files\n"
+            "with multiple `@startuml` blocks. All of them are shown by\n"
+            "default."
+        ),
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            "Always render `.puml` files with plantuml instead of using\n"
+            "previously rendered output from the cache."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print information about the render cache and exit.",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Number of processes used to format multiple files, or large\n"
+            "files in chunks of lines. Defaults to the number of CPUs\n"
+            "available to the process."
+        ),
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=str,
+        default=None,
+        help=(
+            "Write every formatted file to `<output-dir>/<name>.ansi`\n"
+            "instead of printing them."
+        ),
     )
 
-    args: argparse.Namespace = parser.parse_args()
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running and render the file again every time it\n"
+            "changes. Only the changed lines are redrawn."
+        ),
+    )
+
+    parser.add_argument(
+        "-p",
+        "--pager",
+        action="store_true",
+        help=(
+            "Show the file in an interactive pager. Only the visible lines\n"
+            "are read and formatted, so huge files open immediately.\n"
+            "Scroll with the arrow keys, `j`/`k`/`h`/`l`, `space`/`b` and\n"
+            "`g`/`G`, search with `/`, `n` and `N`, and quit with `q`."
+        ),
+    )
+
+    parser.add_argument(
+        "-r",
+        "--reflow",
+        action="store_true",
+        help=(
+            "Remove the whitespace the tags leave in the boxes. Columns\n"
+            "are removed from the whole diagram, so a box only shrinks\n"
+            "where no text of another box above or below it is in the\n"
+            "same columns. Everything to the right moves to the left.\n"
+            "The text is always aligned to the left, so `--mode` has no\n"
+            "effect."
+        ),
+    )
+
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=(
+            "Start a background process, which keeps plantuml and\n"
+            "everything else loaded between commands. Later commands are\n"
+            "run by it, until it exits after being idle for\n"
+            "`--idle-timeout` seconds."
+        ),
+    )
+
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help=(
+            "Seconds without any command after which the daemon exits.\n"
+            f"Defaults to {DEFAULT_IDLE_TIMEOUT:.0f}."
+        ),
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process, even if a daemon is running.",
+    )
+
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="text",
+        default=None,
+        choices=["text", "json"],
+        help=(
+            "Print the duration of every phase and counters like the\n"
+            "number of replaced tags to stderr once done.\n"
+            "`--timings=json` prints them as JSON."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="PSTATS_FILE",
+        help="Run with cProfile and write the statistics to the file.",
+    )
+
+    args: argparse.Namespace = parser.parse_args(argv)
+    if args.daemon:
+        if len(args.filepaths) != 0:
+            parser.error("--daemon does not take any files")
+        if args.idle_timeout <= 0:
+            parser.error("--idle-timeout must be positive")
+    elif len(args.filepaths) == 0 and not args.cache_stats:
+        parser.error("the following arguments are required: filepaths")
+    if args.watch and (len(args.filepaths) != 1 or args.filepaths == ["-"]):
+        parser.error("--watch requires exactly one file")
+    if args.watch and args.output_dir is not None:
+        parser.error("--watch cannot be combined with --output-dir")
+    if args.pager and len(args.filepaths) != 1:
+        parser.error("--pager requires exactly one file")
+    if args.pager and (args.watch or args.output_dir or args.reflow):
+        parser.error(
+            "--pager cannot be combined with --watch, --output-dir or --reflow"
+        )
+    if args.diagram is not None and args.diagram < 1:
+        parser.error("--diagram must be at least 1")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.segment_cache_size < 0:
+        parser.error("--segment-cache-size must not be negative")
+
     args_dict: dict[str, Any] = vars(args)
 
     # The following error checks should never happen due to the parser
@@ -89,7 +355,7 @@ def setup_argparse() -> CliArgs:
     if mode_str is None:
         raise ValueError("No 'mode' setting passed by the argument parser.")
     mode: ReplaceMode | None = ReplaceMode.get_by_value(mode_str)
-    if mode is None: 
+    if mode is None:
         raise ValueError("Invalid mode passed")
     args_dict["mode"] = mode
 
@@ -0,0 +1,199 @@
+from __future__ import annotations
+import os
+import signal
+import asyncio
+import logging
+from typing import Final, Self
+
+from utxterm._colors import ColorDepth
+from utxterm._pumlcallable import PlantumlCallable, PlantUmlRenderError
+from utxterm._plantuml_pool import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUT,
+    PlantUmlWorkerError,
+    PlantUmlRenderTimeout,
+)
+from utxterm._render_puml import (
+    pipe_command,
+    split_diagrams,
+    split_pipe_output,
+    join_diagrams,
+)
+from utxterm._replace_formatting import ReplaceMode
+from utxterm._renderer import Renderer
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Number of renders which may wait for a free slot before new ones are
+#: rejected.
+DEFAULT_MAX_QUEUED: Final[int] = 16
+
+
+class RenderQueueFull(PlantUmlWorkerError):
+    """Raised instead of waiting if too many renders are queued already."""
+
+
+def _kill(process: asyncio.subprocess.Process):
+    """Kill the process group of the process, which is its own session."""
+
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        # The whole group exited in the meantime.
+        pass
+
+
+class AsyncRenderer:
+    """Render plantuml sources from asyncio code without blocking the loop.
+
+    Every diagram is rendered by its own plantuml process. At most
+    `max_concurrency` processes run at once, and at most `max_queued` renders
+    wait for one of them to finish. Any further render fails immediately with
+    `RenderQueueFull`, so a burst of requests cannot start an unbounded number
+    of JVMs.
+
+    A process still running after `timeout` seconds is killed, together with
+    all processes it started, e.g. the JVM of a wrapper script, and
+    `PlantUmlRenderTimeout` is raised. `max_heap`, e.g. `"256m"`, limits the
+    heap of every JVM.
+    """
+
+    def __init__(
+        self,
+        mode: ReplaceMode = ReplaceMode.align_left,
+        color_depth: ColorDepth | None = None,
+        plantuml: PlantumlCallable | None = None,
+        reflow: bool = False,
+        max_concurrency: int = DEFAULT_POOL_SIZE,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_heap: str | None = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("At least one concurrent render is required.")
+        if max_queued < 0:
+            raise ValueError("The queue size cannot be negative.")
+
+        #: Formats the rendered utxt content and finds plantuml.
+        self.renderer: Renderer = Renderer(
+            mode=mode, color_depth=color_depth, plantuml=plantuml, reflow=reflow
+        )
+        self.max_concurrency: int = max_concurrency
+        self.max_queued: int = max_queued
+        self.timeout: float = timeout
+        self.max_heap: str | None = max_heap
+
+        self._slots: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self._queued: int = 0
+        self._processes: set[asyncio.subprocess.Process] = set()
+
+    @property
+    def running(self) -> int:
+        """Number of plantuml processes currently running."""
+        return len(self._processes)
+
+    @property
+    def queued(self) -> int:
+        """Number of renders waiting for a free slot."""
+        return self._queued
+
+    def _environment(self) -> dict[str, str] | None:
+        if self.max_heap is None:
+            return None
+        # Read by every JVM, no matter whether plantuml is started through
+        # `java -jar` or a wrapper script.
+        env: dict[str, str] = dict(os.environ)
+        options: str = env.get("JAVA_TOOL_OPTIONS", "")
+        env["JAVA_TOOL_OPTIONS"] = f"{options} -Xmx{self.max_heap}".strip()
+        return env
+
+    async def _acquire_slot(self):
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+
+        if self._queued >= self.max_queued:
+            raise RenderQueueFull(
+                f"{self.running} renders are running and {self._queued} are "
+                "queued already."
+            )
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+
+    async def _plantuml(self) -> PlantumlCallable:
+        # Searching for plantuml lists the working directory and walks the
+        # `PATH`, which must not block the event loop.
+        return await asyncio.to_thread(lambda: self.renderer.plantuml)
+
+    async def render_unformatted(self, source: str) -> str:
+        """Render the plantuml source to utxt without replacing the tags."""
+
+        diagrams: list[str] = split_diagrams(source)
+        if len(diagrams) == 0:
+            raise PlantUmlRenderError("The source contains no diagram.")
+        cmd: list[str] = pipe_command(await self._plantuml())
+
+        await self._acquire_slot()
+        try:
+            LOGGER.info(f"Starting plantuml: '{' '.join(cmd)}'")
+            process: asyncio.subprocess.Process = (
+                await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=self._environment(),
+                    # Its own process group, which is killed as a whole.
+                    start_new_session=True,
+                )
+            )
+            self._processes.add(process)
+            try:
+                async with asyncio.timeout(self.timeout):
+                    stdout, stderr = await process.communicate(
+                        "".join(diagrams).encode("utf-8")
+                    )
+            except TimeoutError as e:
+                raise PlantUmlRenderTimeout(
+                    f"plantuml did not finish within {self.timeout}s."
+                ) from e
+            finally:
+                # Also reached if the calling task was cancelled.
+                if process.returncode is None:
+                    _kill(process)
+                    await process.wait()
+                self._processes.discard(process)
+        finally:
+            self._slots.release()
+
+        if process.returncode != 0:
+            message: str = stderr.decode("utf-8", "replace").strip()
+            raise PlantUmlWorkerError(
+                f"plantuml exited with code {process.returncode}: {message}"
+            )
+        return join_diagrams(split_pipe_output(stdout.decode("utf-8")))
+
+    async def render_puml(self, source: str) -> str:
+        """Render the plantuml source and replace the formatting tags."""
+
+        utxt: str = await self.render_unformatted(source)
+        return self.renderer.render_utxt(utxt)
+
+    async def close(self):
+        """Kill all running plantuml processes."""
+
+        for process in list(self._processes):
+            if process.returncode is None:
+                _kill(process)
+        for process in list(self._processes):
+            await process.wait()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
@@ -0,0 +1,354 @@
+from __future__ import annotations
+import os
+import sys
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+from itertools import repeat
+from contextvars import Context, copy_context
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from utxterm import _timings
+from utxterm._validate import Config, is_puml
+from utxterm._cache import RenderCache, plantuml_identity
+from utxterm._chunks import should_split, split_line_chunks
+from utxterm._pumlcallable import PlantumlCallable, PlantUmlRenderError
+from utxterm._render_puml import (
+    render_diagrams,
+    split_diagrams,
+    join_diagrams,
+    has_includes,
+)
+from utxterm._read_file import read_utxt_content
+from utxterm._colors import ColorDepth
+from utxterm._replace_formatting import (
+    ReplaceMode,
+    replace_formatting,
+    set_segment_cache_size,
+)
+from utxterm._grid import reflow_formatting
+
+if TYPE_CHECKING:
+    from utxterm._plantuml_pool import PlantumlPool
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Suffix of the files written to the output directory.
+OUTPUT_SUFFIX: str = ".ansi"
+
+Formatter = Callable[[str, ReplaceMode, ColorDepth], str]
+#: Returns persistent plantuml processes for the executable, running in the
+#: directory, used instead of starting plantuml for every command.
+PoolProvider = Callable[[PlantumlCallable, Path | None], "PlantumlPool"]
+
+
+def _select_diagrams(
+    diagrams: list[str], filepath: Path, diagram: int | None
+) -> list[str]:
+    if len(diagrams) == 0:
+        raise PlantUmlRenderError(f"'{filepath.name}' contains no diagram.")
+    if diagram is None:
+        return diagrams
+    if diagram > len(diagrams):
+        raise ValueError(
+            f"'{filepath.name}' only contains {len(diagrams)} diagram(s)."
+        )
+    return [diagrams[diagram - 1]]
+
+
+def _render_sources(
+    sources: list[str],
+    directories: list[Path | None],
+    puml_callable: PlantumlCallable,
+    pool_for: PoolProvider | None,
+) -> list[str]:
+    """Render the sources, each within its directory.
+
+    Sources without a directory do not depend on it and are rendered in the
+    working directory. Sources of the same directory are rendered together,
+    by a pool concurrently on all of its workers.
+    """
+
+    groups: dict[Path | None, list[int]] = {}
+    for index, directory in enumerate(directories):
+        groups.setdefault(directory, []).append(index)
+
+    outputs: list[str] = [""] * len(sources)
+    for directory, indices in groups.items():
+        group: list[str] = [sources[index] for index in indices]
+        rendered: list[str]
+        if pool_for is None:
+            rendered = render_diagrams(group, puml_callable, directory)
+        else:
+            pool: PlantumlPool = pool_for(puml_callable, directory)
+            _timings.count("plantuml.pool_renders", len(group))
+            # Every render runs in a copy of this context, so the threads
+            # record into the timings of the run. A context can only be
+            # entered by one thread at a time.
+            contexts: list[Context] = [copy_context() for _ in group]
+            # Every worker of the pool renders a source at the same time.
+            with (
+                _timings.phase("plantuml.pipe"),
+                ThreadPoolExecutor(min(pool.size, len(group))) as executor,
+            ):
+                rendered = list(
+                    executor.map(
+                        Context.run, contexts, repeat(pool.render), group
+                    )
+                )
+        for index, output in zip(indices, rendered):
+            outputs[index] = output
+    return outputs
+
+
+def load_utxt_contents(
+    config: Config, pool_for: PoolProvider | None = None
+) -> list[str]:
+    """Return the utxt content of every input file in order.
+
+    Every diagram of the `.puml` files is cached on its own, so only the
+    changed diagrams of a file are rendered again. All diagrams which are not
+    cached are rendered with a single plantuml call, or by the pool of
+    running plantuml processes returned by `pool_for`.
+
+    Diagrams including other files are rendered in the directory of their
+    file, and never cached, since the included files may have changed.
+    """
+
+    contents: list[str | None] = [None] * len(config.filepaths)
+    cache: RenderCache | None = RenderCache() if config.use_cache else None
+    # Looking up the plantuml installation walks the `PATH`, so it is only
+    # done once, for the first diagram.
+    identity: str | None = None
+
+    # Rendered diagrams of every `.puml` file, `None` until rendered.
+    file_diagrams: dict[int, list[str | None]] = {}
+    # Index of every diagram to render in `sources`, by its directory and
+    # its source.
+    pending: dict[tuple[Path | None, str], int] = {}
+    sources: list[str] = []
+    directories: list[Path | None] = []
+    targets: list[list[tuple[int, int]]] = []
+    cache_keys: list[str | None] = []
+
+    for index, filepath in enumerate(config.filepaths):
+        if not is_puml(filepath):
+            contents[index] = read_utxt_content(filepath, config.encoding)
+            continue
+
+        with open(filepath, "r", encoding=config.encoding) as f:
+            source: str = f.read()
+        diagrams: list[str] = _select_diagrams(
+            split_diagrams(source), filepath, config.diagram
+        )
+        _timings.count("diagrams", len(diagrams))
+        rendered: list[str | None] = [None] * len(diagrams)
+        file_diagrams[index] = rendered
+
+        for position, diagram in enumerate(diagrams):
+            directory: Path | None = None
+            if has_includes(diagram):
+                directory = filepath.parent
+            if (directory, diagram) in pending:
+                targets[pending[directory, diagram]].append((index, position))
+                continue
+
+            key: str | None = None
+            if directory is not None:
+                _timings.count("cache.skipped")
+            elif cache is not None:
+                if identity is None:
+                    identity = plantuml_identity(config.plantuml_callable)
+                key = RenderCache.key(diagram, identity)
+                cached: str | None = cache.get(key)
+                if cached is not None:
+                    _timings.count("cache.hits")
+                    rendered[position] = cached
+                    continue
+                _timings.count("cache.misses")
+
+            pending[directory, diagram] = len(sources)
+            sources.append(diagram)
+            directories.append(directory)
+            targets.append([(index, position)])
+            cache_keys.append(key)
+
+    if len(sources) != 0:
+        LOGGER.info(f"{len(sources)} diagram(s) have to be rendered.")
+        with _timings.phase("render"):
+            outputs: list[str] = _render_sources(
+                sources, directories, config.plantuml_callable, pool_for
+            )
+        for output, key, diagram_targets in zip(outputs, cache_keys, targets):
+            for index, position in diagram_targets:
+                file_diagrams[index][position] = output
+            if cache is not None and key is not None:
+                try:
+                    cache.put(key, output)
+                except OSError as e:
+                    LOGGER.info(f"Could not write the cache entry: {e}")
+        if cache is not None and any(key is not None for key in cache_keys):
+            # Once for all written entries, as it lists the whole cache.
+            try:
+                cache.evict()
+            except OSError as e:
+                LOGGER.info(f"Could not evict cache entries: {e}")
+
+    for index, rendered in file_diagrams.items():
+        contents[index] = join_diagrams(
+            [diagram for diagram in rendered if diagram is not None]
+        )
+
+    loaded: list[str] = []
+    for filepath, content in zip(config.filepaths, contents):
+        if content is None:
+            raise FileNotFoundError(f"No content loaded for '{filepath}'.")
+        loaded.append(content)
+    return loaded
+
+
+def _format_counted(
+    formatter: Formatter,
+    content: str,
+    mode: ReplaceMode,
+    color_depth: ColorDepth,
+) -> tuple[str, dict[str, int]]:
+    """Format in a worker process and return the counters collected there."""
+
+    timings: _timings.Timings = _timings.start_recording()
+    try:
+        return formatter(content, mode, color_depth), timings.counters
+    finally:
+        _timings.stop_recording()
+
+
+def format_contents(contents: list[str], config: Config) -> list[str]:
+    """Replace the formatting of every content, in parallel if `jobs > 1`
+    and the contents are large enough in total to make up for starting the
+    worker processes.
+
+    Large contents are split into chunks of whole lines, so even a single
+    document uses all workers. Reflowing needs the whole diagram at once, so
+    these contents are never split.
+
+    The results are returned in the same order as `contents`.
+    """
+
+    formatter: Formatter = replace_formatting
+    if config.reflow:
+        formatter = reflow_formatting
+
+    pieces: list[str] = []
+    owners: list[int] = []
+    for index, content in enumerate(contents):
+        chunks: list[str] = [content]
+        if not config.reflow and should_split(len(content), config.jobs):
+            chunks = split_line_chunks(content, config.jobs)
+            LOGGER.info(f"Split content {index} into {len(chunks)} chunks.")
+        pieces.extend(chunks)
+        owners.extend([index] * len(chunks))
+
+    formatted_pieces: list[str]
+    with _timings.phase("format"):
+        num_workers: int = min(config.jobs, len(pieces))
+        total: int = sum(len(content) for content in contents)
+        if num_workers <= 1 or not should_split(total, num_workers):
+            formatted_pieces = [
+                formatter(piece, config.mode, config.color_depth)
+                for piece in pieces
+            ]
+        else:
+            formatted_pieces = _format_parallel(
+                formatter, pieces, config, num_workers
+            )
+
+    grouped: list[list[str]] = [[] for _ in contents]
+    for owner, piece in zip(owners, formatted_pieces):
+        grouped[owner].append(piece)
+    formatted: list[str] = ["\n".join(group) for group in grouped]
+
+    if _timings.is_enabled():
+        _timings.count("bytes_in", sum(len(c.encode()) for c in contents))
+        _timings.count("bytes_out", sum(len(c.encode()) for c in formatted))
+    return formatted
+
+
+def _format_parallel(
+    formatter: Formatter,
+    contents: list[str],
+    config: Config,
+    num_workers: int,
+) -> list[str]:
+    LOGGER.info(f"Formatting {len(contents)} pieces with {num_workers} jobs.")
+    chunksize: int = max(1, len(contents) // (num_workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=set_segment_cache_size,
+        initargs=(config.segment_cache_size,),
+    ) as executor:
+        if not _timings.is_enabled():
+            return list(
+                executor.map(
+                    formatter,
+                    contents,
+                    repeat(config.mode),
+                    repeat(config.color_depth),
+                    chunksize=chunksize,
+                )
+            )
+
+        formatted: list[str] = []
+        for content, counters in executor.map(
+            _format_counted,
+            repeat(formatter),
+            contents,
+            repeat(config.mode),
+            repeat(config.color_depth),
+            chunksize=chunksize,
+        ):
+            formatted.append(content)
+            for name, value in counters.items():
+                _timings.count(name, value)
+        return formatted
+
+
+def output_paths(filepaths: list[Path], output_dir: Path) -> list[Path]:
+    """Return the path each formatted file is written to."""
+
+    outputs: list[Path] = [
+        output_dir / f"{filepath.stem}{OUTPUT_SUFFIX}" for filepath in filepaths
+    ]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError(
+            "Multiple input files share the same name. "
+            "Their output files in the output directory would collide."
+        )
+    return outputs
+
+
+def write_outputs(config: Config, formatted: list[str]):
+    with _timings.phase("write"):
+        _write_outputs(config, formatted)
+
+
+def _write_outputs(config: Config, formatted: list[str]):
+    if config.output_dir is None:
+        # Encoded once and written to the binary stream, instead of going
+        # through the text layer of stdout.
+        encoding: str = sys.stdout.encoding or "utf-8"
+        sys.stdout.flush()
+        for content in formatted:
+            sys.stdout.buffer.write(content.encode(encoding))
+        sys.stdout.buffer.flush()
+        return
+
+    os.makedirs(config.output_dir, exist_ok=True)
+    for path, content in zip(
+        output_paths(config.filepaths, config.output_dir), formatted
+    ):
+        LOGGER.info(f"Writing '{path.as_posix()}'.")
+        # Independent of `config.encoding`, which is only the encoding of
+        # the input and might not cover the box drawing characters.
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
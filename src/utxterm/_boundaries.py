@@ -0,0 +1,99 @@
+import re
+from typing import Final
+
+
+#: Characters separating the segments in which tags are searched for. These
+#: are the vertical borders of boxes, lifelines and frames in the `utxt`
+#: output of plantuml.
+BOUNDARIES: Final[str] = "│║┃"
+#: Border of boxes in the ASCII `txt` output of plantuml. Only a boundary in
+#: lines without box drawing characters, since unicode diagrams keep a `|`
+#: of the text, e.g. `str | None`.
+ASCII_BOUNDARY: Final[str] = "|"
+
+#: Split a line at every boundary in a single pass, keeping the boundaries.
+_SPLIT_PATTERN: Final[re.Pattern[str]] = re.compile(
+    f"([{re.escape(BOUNDARIES)}])"
+)
+_ASCII_SPLIT_PATTERN: Final[re.Pattern[str]] = re.compile(
+    f"({re.escape(ASCII_BOUNDARY)})"
+)
+
+#: Matches a box drawing character, which only unicode diagrams contain.
+_BOX_DRAWING_PATTERN: Final[re.Pattern[str]] = re.compile("[\\u2500-\\u257f]")
+
+#: Matches a character which may be wider or narrower than one column. Box
+#: drawing characters, which include all boundaries but `|`, are always one
+#: column wide, so lines only made up of them and ASCII can be skipped.
+_WIDE_CANDIDATE_PATTERN: Final[re.Pattern[str]] = re.compile(
+    "[^\\x00-\\x7f\\u2500-\\u257f]"
+)
+
+#: All characters which may be a boundary. Counting them gives an upper
+#: bound of the boundaries of a line.
+_ENCODED_BOUNDARIES: Final[tuple[bytes, ...]] = tuple(
+    boundary.encode("utf-8") for boundary in BOUNDARIES + ASCII_BOUNDARY
+)
+#: UTF-8 encoded box drawing characters are `E2 94 xx` or `E2 95 xx`.
+_BOX_DRAWING_LEAD: Final[bytes] = b"\xe2"
+_BOX_DRAWING_PREFIXES: Final[tuple[bytes, ...]] = (b"\xe2\x94", b"\xe2\x95")
+#: ASCII, all continuation bytes and the lead byte of box drawing characters.
+_NARROW_BYTES: Final[bytes] = bytes(range(0xC0)) + _BOX_DRAWING_LEAD
+
+
+def _split_pattern(line: str) -> re.Pattern[str]:
+    if not line.isascii() and _BOX_DRAWING_PATTERN.search(line) is not None:
+        return _SPLIT_PATTERN
+    return _ASCII_SPLIT_PATTERN
+
+
+def split_segments(line: str) -> list[str]:
+    """Split the line at every boundary.
+
+    The result alternates between text and the boundary following it, e.g.
+    `["a", "│", " b ", "║", "c"]`. Texts at even indices, except for the
+    first and the last one, are segments enclosed by two boundaries. Joining
+    the result restores the line.
+
+    Lines containing box drawing characters are split at `BOUNDARIES`, all
+    others at `ASCII_BOUNDARY`.
+    """
+
+    return _split_pattern(line).split(line)
+
+
+def is_aligned(line: str) -> bool:
+    """Whether every segment of the line takes one column per character.
+
+    Such segments never have to be fitted to the columns plantuml laid out.
+    Wide characters only matter within segments, so they are ignored if the
+    line has at most one boundary.
+    """
+
+    if line.isascii() or _WIDE_CANDIDATE_PATTERN.search(line) is None:
+        return True
+    return len(_split_pattern(line).findall(line)) < 2
+
+
+def is_narrow_encoded(text: bytes) -> bool:
+    """Whether UTF-8 encoded text only contains ASCII and box drawing.
+
+    Any number of lines are checked at once, without decoding them.
+    """
+
+    if text.isascii():
+        return True
+    if len(text.translate(None, _NARROW_BYTES)) > 0:
+        # Some character of another range of code points.
+        return False
+    return text.count(_BOX_DRAWING_LEAD) == sum(
+        map(text.count, _BOX_DRAWING_PREFIXES)
+    )
+
+
+def is_aligned_encoded(line: bytes) -> bool:
+    """`is_aligned` for a UTF-8 encoded line, without decoding it."""
+
+    if is_narrow_encoded(line):
+        return True
+    return sum(map(line.count, _ENCODED_BOUNDARIES)) < 2
@@ -0,0 +1,220 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+from shutil import which
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Final, assert_never, cast
+
+from utxterm._pumlcallable import (
+    PlantumlCallable,
+    NotAvailable,
+    JarInWorkDir,
+    InPath,
+    CustomJarPath,
+)
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Changing this invalidates all existing cache entries.
+CACHE_FORMAT_VERSION: Final[str] = "1"
+CACHE_SUFFIX: Final[str] = ".utxt"
+
+DEFAULT_MAX_SIZE: Final[int] = 64 * 1024 * 1024
+DEFAULT_MAX_AGE: Final[float] = 30 * 24 * 60 * 60
+
+#: Prefix of the temporary files entries are written to.
+TEMP_PREFIX: Final[str] = ".tmp-"
+#: Seconds after which a temporary file is assumed to be left behind by a
+#: process which got killed while writing it.
+STALE_TEMP_AGE: Final[float] = 60 * 60
+
+
+def default_cache_dir() -> Path:
+    """Return `$XDG_CACHE_HOME/utxterm`, falling back to `~/.cache`."""
+    xdg_cache_home: str | None = os.environ.get("XDG_CACHE_HOME")
+    if not xdg_cache_home:
+        xdg_cache_home = os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(xdg_cache_home) / "utxterm"
+
+
+def _file_identity(path: str | None) -> str:
+    if path is None:
+        return "missing"
+    try:
+        stat: os.stat_result = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{os.path.realpath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def plantuml_identity(puml_callable: PlantumlCallable) -> str:
+    """Identify the plantuml installation used for rendering.
+
+    Asking plantuml for its version would require a JVM launch. Instead the
+    location, size and modification time of the jar or command are used,
+    which change with every update of plantuml.
+    """
+
+    match puml_callable:
+        case NotAvailable():
+            return "not-available"
+        case JarInWorkDir() | CustomJarPath():
+            path: Path = cast(Path, puml_callable)
+            return f"jar:{_file_identity(path.as_posix())}"
+        case InPath():
+            return f"path:{_file_identity(which('plantuml'))}"
+        case _:
+            assert_never(puml_callable)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    directory: Path
+    num_entries: int
+    total_size: int
+    oldest_entry_age: float | None
+
+    def __str__(self) -> str:
+        oldest: str = "-"
+        if self.oldest_entry_age is not None:
+            oldest = f"{self.oldest_entry_age / 3600:.1f}h"
+        return (
+            f"Cache directory: {self.directory.as_posix()}\n"
+            f"Entries: {self.num_entries}\n"
+            f"Total size: {self.total_size / 1024:.1f} KiB\n"
+            f"Oldest entry: {oldest}\n"
+        )
+
+
+class RenderCache:
+    """Content addressed on-disk cache for rendered `.utxt` output.
+
+    Entries are keyed on the hash of the plantuml source and the identity of
+    the plantuml installation. Writes go to a temporary file which is then
+    atomically moved into place, so multiple processes can share the cache.
+    Every hit refreshes the modification time of the entry, which is used
+    for the least recently used eviction. Writing does not evict, as that
+    lists the whole directory; `evict` is called once after a batch of
+    writes instead.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_age: float = DEFAULT_MAX_AGE,
+    ):
+        self.directory: Path = (
+            directory if directory is not None else default_cache_dir()
+        )
+        self.max_size: int = max_size
+        self.max_age: float = max_age
+
+    @staticmethod
+    def key(source: str, identity: str) -> str:
+        """Return the key of the given source rendered by the plantuml
+        installation with the given `plantuml_identity`.
+        """
+
+        hasher = hashlib.sha256()
+        hasher.update(CACHE_FORMAT_VERSION.encode())
+        hasher.update(b"\0")
+        hasher.update(identity.encode())
+        hasher.update(b"\0")
+        hasher.update(source.encode())
+        return hasher.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> str | None:
+        entry: Path = self._entry_path(key)
+        try:
+            with open(entry, "r", encoding="utf-8") as f:
+                content: str = f.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(entry)
+        except OSError:
+            # Another process might have evicted the entry in the meantime.
+            pass
+        return content
+
+    def put(self, key: str, content: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=TEMP_PREFIX, suffix=CACHE_SUFFIX
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(temp_path, self._entry_path(key))
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries: list[tuple[Path, os.stat_result]] = []
+        try:
+            paths: list[Path] = list(self.directory.glob(f"*{CACHE_SUFFIX}"))
+        except OSError:
+            return entries
+        for path in paths:
+            if path.name.startswith(TEMP_PREFIX):
+                continue
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def _remove_stale_temp_files(self, now: float):
+        try:
+            paths: list[Path] = list(self.directory.glob(f"{TEMP_PREFIX}*"))
+        except OSError:
+            return
+        for path in paths:
+            try:
+                if now - path.stat().st_mtime <= STALE_TEMP_AGE:
+                    continue
+            except FileNotFoundError:
+                continue
+            LOGGER.info(f"Removing stale temporary file '{path.name}'.")
+            path.unlink(missing_ok=True)
+
+    def evict(self):
+        """Remove expired entries, then the least recently used ones until
+        the cache is smaller than `max_size`. Temporary files left behind by
+        killed processes are removed as well."""
+
+        now: float = time.time()
+        self._remove_stale_temp_files(now)
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total_size: int = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in entries:
+            expired: bool = now - stat.st_mtime > self.max_age
+            if not expired and total_size <= self.max_size:
+                break
+            LOGGER.info(f"Evicting cache entry '{path.name}'.")
+            path.unlink(missing_ok=True)
+            total_size -= stat.st_size
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        oldest_entry_age: float | None = None
+        if len(entries) != 0:
+            oldest_mtime: float = min(stat.st_mtime for _, stat in entries)
+            oldest_entry_age = time.time() - oldest_mtime
+        return CacheStats(
+            directory=self.directory,
+            num_entries=len(entries),
+            total_size=sum(stat.st_size for _, stat in entries),
+            oldest_entry_age=oldest_entry_age,
+        )
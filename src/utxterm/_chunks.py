@@ -0,0 +1,40 @@
+from typing import Final
+
+
+#: Documents with at least this many characters are split into chunks which
+#: are formatted in parallel. Below, starting the worker processes takes
+#: longer than formatting on a single core.
+PARALLEL_THRESHOLD: Final[int] = 2 * 1024 * 1024
+
+#: Smallest chunk size, so the work per chunk outweighs sending it to a
+#: worker and back.
+MIN_CHUNK_SIZE: Final[int] = 256 * 1024
+
+#: Chunks per worker, so workers finishing early can pick up more work.
+CHUNKS_PER_WORKER: Final[int] = 4
+
+
+def should_split(length: int, jobs: int) -> bool:
+    return jobs > 1 and length >= PARALLEL_THRESHOLD
+
+
+def split_line_chunks(content: str, jobs: int) -> list[str]:
+    """Split the content into chunks of whole lines.
+
+    The newlines between the chunks are dropped, so joining the chunks with
+    `"\\n"` restores the content.
+    """
+
+    chunk_size: int = max(
+        MIN_CHUNK_SIZE, len(content) // (jobs * CHUNKS_PER_WORKER)
+    )
+    chunks: list[str] = []
+    start: int = 0
+    while start < len(content):
+        end: int = content.find("\n", start + chunk_size)
+        if end == -1:
+            break
+        chunks.append(content[start:end])
+        start = end + 1
+    chunks.append(content[start:])
+    return chunks
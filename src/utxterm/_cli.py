@@ -0,0 +1,115 @@
+from __future__ import annotations
+import sys
+import logging
+from typing import TYPE_CHECKING
+
+from utxterm._argparse import setup_argparse, CliArgs
+from utxterm._validate import generate_config, Config
+from utxterm._stream import can_stream, stream_file
+from utxterm._replace_formatting import set_segment_cache_size
+from utxterm._timings import (
+    Timings,
+    phase,
+    start_recording,
+    stop_recording,
+)
+
+if TYPE_CHECKING:
+    from utxterm._batch import PoolProvider
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+def _run(args: CliArgs, pool_for: PoolProvider | None = None):
+    with phase("validate"):
+        config: Config = generate_config(args)
+    set_segment_cache_size(config.segment_cache_size)
+
+    if args.watch:
+        from utxterm._watch import watch
+
+        watch(config)
+        return
+
+    if args.pager:
+        from utxterm._pager import page
+
+        page(config)
+        return
+
+    if can_stream(config):
+        stream_file(config.filepaths[0], config)
+        return
+
+    # Process pools and plantuml rendering are only imported when needed,
+    # keeping the startup of the streaming path fast.
+    from utxterm._batch import (
+        load_utxt_contents,
+        format_contents,
+        output_paths,
+        write_outputs,
+    )
+
+    if config.output_dir is not None:
+        # Fail before rendering anything if the outputs would collide.
+        output_paths(config.filepaths, config.output_dir)
+
+    LOGGER.info("Loading the utxt content.")
+    with phase("load"):
+        utxt_contents: list[str] = load_utxt_contents(config, pool_for)
+    terminal_contents: list[str] = format_contents(utxt_contents, config)
+
+    write_outputs(config, terminal_contents)
+
+
+def execute(args: CliArgs, pool_for: PoolProvider | None = None):
+    """Run the parsed command, e.g. in the daemon.
+
+    `pool_for` provides running plantuml processes, which are used instead
+    of starting plantuml.
+    """
+
+    if args.verbose:
+        logging.basicConfig(
+            level=logging.INFO, format="[%(levelname)s] %(message)s "
+        )
+    if args.cache_stats:
+        from utxterm._cache import RenderCache
+
+        print(RenderCache().stats(), end="")
+        return
+
+    timings: Timings | None = None
+    if args.timings is not None:
+        timings = start_recording()
+
+    try:
+        with phase("total"):
+            if args.profile is None:
+                _run(args, pool_for)
+            else:
+                import cProfile
+
+                profiler: cProfile.Profile = cProfile.Profile()
+                try:
+                    profiler.runcall(_run, args, pool_for)
+                finally:
+                    profiler.dump_stats(args.profile)
+    finally:
+        if timings is not None and args.timings is not None:
+            stop_recording()
+            print(timings.format(args.timings), file=sys.stderr)
+
+
+def run(argv: list[str] | None = None):
+    """Run the command line in this process."""
+
+    args: CliArgs = setup_argparse(argv)
+    if args.daemon:
+        from utxterm._daemon import start_daemon
+
+        start_daemon(execute, args.idle_timeout)
+        return
+
+    execute(args)
@@ -0,0 +1,150 @@
+import os
+import sys
+import struct
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    import socket
+
+# Runs before anything else of utxterm is imported, so only small parts of
+# the standard library are used here. `socket` and `json` are only imported
+# once a daemon is found.
+
+
+#: Seconds without any request after which the daemon exits. Defined here,
+#: so the command line parser does not have to import the daemon.
+DEFAULT_IDLE_TIMEOUT: Final[float] = 15 * 60
+
+#: Changing the request format requires changing this version.
+PROTOCOL_VERSION: Final[int] = 1
+
+#: Length of the JSON request, sent in front of it.
+REQUEST_LENGTH: Final[struct.Struct] = struct.Struct("!I")
+#: Exit status of the command, sent once it finished.
+EXIT_STATUS: Final[struct.Struct] = struct.Struct("!i")
+#: Sent as soon as the daemon read a request. Without it, the client can
+#: safely fall back to running the command itself.
+ACCEPTED: Final[bytes] = b"\x01"
+
+#: stdin, stdout and stderr of the client, passed along with the request.
+CLIENT_FDS: Final[tuple[int, ...]] = (0, 1, 2)
+
+#: Options which only work in the calling process. Either they are
+#: interactive, or they configure the process itself.
+_LOCAL_OPTIONS: Final[tuple[str, ...]] = (
+    "--help",
+    "--verbose",
+    "--watch",
+    "--pager",
+    "--cache-stats",
+    "--profile",
+    "--daemon",
+    "--no-daemon",
+)
+_LOCAL_SHORT_OPTIONS: Final[str] = "hvwp"
+
+
+def socket_path() -> str:
+    """Return the per-user socket of the daemon.
+
+    `$XDG_RUNTIME_DIR` is only accessible by the user. Without it, a
+    directory only the user can access is used in `$TMPDIR` or `/tmp`.
+    """
+
+    runtime_dir: str | None = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "utxterm.sock")
+    temp_dir: str = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(temp_dir, f"utxterm-{os.getuid()}", "daemon.sock")
+
+
+def can_forward(argv: list[str]) -> bool:
+    """Whether the command line can be run by the daemon.
+
+    Checked without parsing the arguments, since that would import most of
+    utxterm. Abbreviated long options and grouped short options are handled
+    conservatively, e.g. `-ov out` is never forwarded. The daemon reports
+    invalid arguments just like the calling process would.
+
+    Reading from stdin is never forwarded: the daemon runs one command at a
+    time, so waiting for the input would block every other client.
+    """
+
+    if "-" in argv:
+        return False
+    for arg in argv:
+        if arg == "--":
+            break
+        if arg.startswith("--"):
+            name: str = arg.split("=", 1)[0]
+            if any(option.startswith(name) for option in _LOCAL_OPTIONS):
+                return False
+        elif arg.startswith("-") and any(
+            char in _LOCAL_SHORT_OPTIONS for char in arg[1:]
+        ):
+            return False
+    return True
+
+
+def recv_exactly(connection: "socket.socket", size: int) -> bytes:
+    chunks: list[bytes] = []
+    while size > 0:
+        chunk: bytes = connection.recv(size)
+        if len(chunk) == 0:
+            raise ConnectionError("The connection was closed too early.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def forward(argv: list[str]) -> int | None:
+    """Run the command line in the daemon and return its exit status.
+
+    stdin, stdout and stderr are passed to the daemon, which reads and writes
+    them directly, so the output is streamed without passing through this
+    process. Returns `None` if no daemon accepted the request, in which case
+    the command is run in this process instead.
+    """
+
+    if not can_forward(argv):
+        return None
+
+    path: str = socket_path()
+    try:
+        # Never talk to a socket of another user.
+        if os.stat(path).st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+
+    import json
+    import socket
+
+    request: bytes = json.dumps(
+        {
+            "version": PROTOCOL_VERSION,
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "environ": dict(os.environ),
+        }
+    ).encode()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+            socket.send_fds(
+                client,
+                [REQUEST_LENGTH.pack(len(request)) + request],
+                list(CLIENT_FDS),
+            )
+            if recv_exactly(client, len(ACCEPTED)) != ACCEPTED:
+                return None
+        except OSError:
+            return None
+
+        try:
+            status: bytes = recv_exactly(client, EXIT_STATUS.size)
+        except OSError as e:
+            print(f"utxterm: the daemon failed: {e}", file=sys.stderr)
+            return 1
+    return EXIT_STATUS.unpack(status)[0]
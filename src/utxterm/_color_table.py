@@ -0,0 +1,388 @@
+"""Lookup tables converting RGB values to the 256 and 16 color palettes.
+
+For the 16 colors, every channel is quantised to `_BASIC_BITS` bits, and
+the table is indexed by the red, green and blue bits in this order.
+Searching the palette for every entry takes far longer than loading the
+literals, so the tables are generated. Running this module updates them:
+
+    python -m utxterm._color_table
+"""
+
+from typing import Final
+
+
+# BEGIN GENERATED
+#: Index in the basic palette of the nearest color.
+BASIC_TABLE: Final[bytes] = (
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x08\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x08\x08\x08\x04\x04\x04\x04\x04\x0c\x0c"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x08\x06\x06\x06\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x02\x02\x08\x08\x06\x06\x06\x06\x06\x06\x06\x0c"
+    b"\x02\x02\x02\x02\x02\x02\x08\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x06\x06\x0e\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x0e\x0e\x0e"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x08\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x08\x08\x08\x04\x04\x04\x04\x04\x0c\x0c"
+    b"\x00\x00\x00\x00\x00\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x06\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x08\x06\x06\x06\x06\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x06\x06\x06\x06\x06\x06\x06\x0c"
+    b"\x02\x02\x02\x02\x02\x02\x08\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x06\x06\x0e\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x0e\x0e\x0e"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x08\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x08\x08\x08\x04\x04\x04\x04\x04\x0c\x0c"
+    b"\x00\x00\x00\x00\x00\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x00\x00\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x06\x06\x06\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x08\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x08\x08\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x08\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x06\x06\x0e\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x0e\x0e\x0e"
+    b"\x00\x00\x00\x00\x00\x00\x00\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x00\x08\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x08\x08\x08\x04\x04\x04\x04\x04\x0c\x0c"
+    b"\x00\x00\x00\x00\x00\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x00\x00\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x00\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x06\x06\x06\x06\x0c\x0c"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x08\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x08\x06\x06\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x02\x06\x06\x06\x06\x06\x06\x06\x06\x06\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x06\x06\x0e\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x0e\x0e\x0e"
+    b"\x00\x00\x00\x00\x00\x00\x00\x08\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x00\x00\x00\x00\x00\x00\x08\x08\x08\x04\x04\x04\x04\x04\x0c\x0c"
+    b"\x00\x00\x00\x00\x00\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x00\x00\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x00\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x06\x06\x06\x0c\x0c"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x08\x06\x06\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x02\x08\x08\x08\x06\x06\x06\x06\x06\x06\x06\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x08\x06\x06\x06\x06\x06\x06\x06\x0e\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x06\x06\x06\x06\x06\x06\x0e\x0e\x0e"
+    b"\x00\x00\x00\x00\x00\x00\x08\x08\x08\x04\x04\x04\x04\x04\x0c\x0c"
+    b"\x00\x00\x00\x00\x00\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x00\x00\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x00\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x00\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x00\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x08\x08\x06\x06\x06\x0c"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x08\x06\x06\x06\x06\x06"
+    b"\x02\x02\x02\x02\x08\x08\x08\x08\x08\x08\x06\x06\x06\x06\x06\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x08\x08\x08\x08\x06\x06\x06\x06\x06\x0e\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x0a\x08\x08\x06\x06\x06\x06\x06\x0e\x0e\x0e"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x08\x05\x05\x05\x0c\x0c\x0c\x0c"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x05\x0c\x0c\x0c\x0c\x0c"
+    b"\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x06\x06\x06\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x06\x06\x06\x06\x0e"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x06\x06\x06\x06\x0e\x0e"
+    b"\x0a\x0a\x0a\x0a\x0a\x08\x08\x08\x08\x06\x06\x06\x06\x0e\x0e\x0e"
+    b"\x01\x01\x01\x01\x01\x01\x08\x08\x05\x05\x05\x05\x05\x05\x05\x0c"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x08\x05\x05\x05\x05\x0c\x0c\x0c"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x01\x01\x01\x01\x01\x01\x08\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x05\x05\x05\x05\x05\x05\x05\x0c"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x05\x05\x05\x0c\x0c\x0c"
+    b"\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c\x0c"
+    b"\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x08\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x08\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x05\x05\x05\x05\x0c\x0c"
+    b"\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c\x0c"
+    b"\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x08\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x08\x08\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x08\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x05\x05\x05\x0c\x0c"
+    b"\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x08\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x08\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x08\x08\x05\x05\x05\x0c"
+    b"\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x0c\x0c\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x08\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x01\x08\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x08\x05\x05\x05\x05\x05\x05\x05"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x08\x05\x05\x05\x05\x05"
+    b"\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x05\x05\x05\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x0c"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x08\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x0d"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x0d"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x0d"
+    b"\x01\x01\x01\x01\x01\x01\x05\x05\x05\x05\x05\x05\x05\x05\x05\x0d"
+    b"\x01\x01\x01\x01\x01\x08\x08\x08\x05\x05\x05\x05\x05\x05\x05\x0d"
+    b"\x01\x01\x01\x01\x08\x08\x08\x08\x08\x08\x05\x05\x05\x05\x05\x0d"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x05\x05\x05\x05\x0d"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x08\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x05\x05\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x05\x05\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x05\x05\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x05\x05\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x08\x05\x05\x05\x05\x05\x05\x05\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x08\x08\x08\x08\x05\x05\x05\x05\x05\x0d\x0d"
+    b"\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x05\x05\x05\x05\x0d\x0d"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x08\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x07\x07\x07\x07\x07\x07\x07\x07\x0f"
+    b"\x09\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x0d\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x0d\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x0d\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x0d\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x09\x05\x05\x05\x05\x05\x05\x0d\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x09\x08\x08\x05\x05\x05\x05\x05\x0d\x0d\x0d"
+    b"\x09\x09\x09\x09\x09\x08\x08\x08\x08\x05\x05\x05\x05\x0d\x0d\x0d"
+    b"\x03\x03\x03\x03\x03\x08\x08\x08\x08\x08\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x08\x08\x08\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x08\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x03\x03\x03\x03\x03\x03\x03\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x07\x07\x07\x07\x07\x07\x07\x07\x07"
+    b"\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x07\x07\x07\x07\x07\x07\x07\x07\x0f"
+    b"\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x07\x07\x07\x07\x07\x07\x07\x0f\x0f"
+)
+
+#: Nearest level of the color cube for every channel value.
+CUBE_INDEX: Final[bytes] = (
+    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+    b"\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01"
+    b"\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01"
+    b"\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01"
+    b"\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01\x01"
+    b"\x01\x01\x01\x01\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02"
+    b"\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02"
+    b"\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x02\x03\x03\x03\x03"
+    b"\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03"
+    b"\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03\x03"
+    b"\x03\x03\x03\x03\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04"
+    b"\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x04\x05\x05\x05\x05"
+    b"\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05"
+)
+
+#: Nearest of the 24 grey levels (`8 + 10 * i`) for every channel value.
+GREY_INDEX: Final[bytes] = (
+    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x01"
+    b"\x01\x01\x01\x01\x01\x01\x01\x02\x02\x02\x02\x02\x02\x02\x02\x02"
+    b"\x02\x02\x03\x03\x03\x03\x03\x03\x03\x03\x03\x04\x04\x04\x04\x04"
+    b"\x04\x04\x04\x04\x04\x04\x05\x05\x05\x05\x05\x05\x05\x05\x05\x06"
+    b"\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06\x07\x07\x07\x07\x07\x07"
+    b"\x07\x07\x07\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x09\x09"
+    b"\x09\x09\x09\x09\x09\x09\x09\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a"
+    b"\x0a\x0a\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0c\x0c\x0c\x0c\x0c"
+    b"\x0c\x0c\x0c\x0c\x0c\x0c\x0d\x0d\x0d\x0d\x0d\x0d\x0d\x0d\x0d\x0e"
+    b"\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0f\x0f\x0f\x0f\x0f\x0f"
+    b"\x0f\x0f\x0f\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x11\x11"
+    b"\x11\x11\x11\x11\x11\x11\x11\x12\x12\x12\x12\x12\x12\x12\x12\x12"
+    b"\x12\x12\x13\x13\x13\x13\x13\x13\x13\x13\x13\x14\x14\x14\x14\x14"
+    b"\x14\x14\x14\x14\x14\x14\x15\x15\x15\x15\x15\x15\x15\x15\x15\x16"
+    b"\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x17\x17\x17\x17\x17\x17"
+    b"\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17"
+)
+# END GENERATED
+
+
+def _nearest(rgb: tuple[int, int, int]) -> int:
+    from utxterm._colors import _BASIC_PALETTE, _distance
+
+    return min(
+        range(len(_BASIC_PALETTE)),
+        key=lambda index: _distance(_BASIC_PALETTE[index], rgb),
+    )
+
+
+def _format_table(name: str, comment: str, table: bytes) -> list[str]:
+    lines: list[str] = [f"#: {comment}", f"{name}: Final[bytes] = ("]
+    for start in range(0, len(table), 16):
+        row: str = "".join(
+            f"\\x{value:02x}" for value in table[start : start + 16]
+        )
+        lines.append(f'    b"{row}"')
+    lines.append(")")
+    return lines
+
+
+def _generate() -> str:
+    from utxterm._colors import _BASIC_BITS, _CUBE_LEVELS
+
+    levels: int = 1 << _BASIC_BITS
+    shift: int = 8 - _BASIC_BITS
+    centers: list[int] = [
+        (level << shift) + (1 << shift) // 2 for level in range(levels)
+    ]
+    basic_table: bytes = bytes(
+        _nearest((r, g, b)) for r in centers for g in centers for b in centers
+    )
+    cube_index: bytes = bytes(
+        min(range(6), key=lambda level: abs(_CUBE_LEVELS[level] - value))
+        for value in range(256)
+    )
+    grey_index: bytes = bytes(
+        min(23, max(0, round((value - 8) / 10))) for value in range(256)
+    )
+
+    return "\n".join(
+        [
+            "# BEGIN GENERATED",
+            *_format_table(
+                "BASIC_TABLE",
+                "Index in the basic palette of the nearest color.",
+                basic_table,
+            ),
+            "",
+            *_format_table(
+                "CUBE_INDEX",
+                "Nearest level of the color cube for every channel value.",
+                cube_index,
+            ),
+            "",
+            *_format_table(
+                "GREY_INDEX",
+                "Nearest of the 24 grey levels (`8 + 10 * i`) for every "
+                "channel value.",
+                grey_index,
+            ),
+            "# END GENERATED",
+        ]
+    )
+
+
+if __name__ == "__main__":
+    with open(__file__, "r", encoding="utf-8") as f:
+        source: str = f.read()
+    start: int = source.index("# BEGIN GENERATED")
+    end: int = source.index("# END GENERATED") + len("# END GENERATED")
+    with open(__file__, "w", encoding="utf-8") as f:
+        f.write(source[:start] + _generate() + source[end:])
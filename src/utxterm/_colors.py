@@ -1,6 +1,7 @@
+import os
 import re
-from enum import Enum
-from typing import Final, assert_never
+from enum import Enum, StrEnum
+from typing import Final, Mapping, assert_never
 
 
 class Colors(Enum):
@@ -50,12 +51,159 @@ class InvalidColor(Exception):
     pass
 
 
-class AnsiFormat:
+class ColorDepth(StrEnum):
+    """Colors the terminal is able to show."""
+
+    truecolor = "truecolor"
+    color256 = "256"
+    color16 = "16"
+    #: No escape sequences at all, the tags are only removed.
+    none = "none"
+
+    @staticmethod
+    def as_list() -> list[str]:
+        return [depth.value for depth in ColorDepth]
+
+
+def detect_color_depth(environ: Mapping[str, str] = os.environ) -> ColorDepth:
+    """Guess the color depth of the terminal from the environment.
+
+    1. `NO_COLOR` set to anything disables all formatting.
+    2. `COLORTERM=truecolor` or `COLORTERM=24bit` enables truecolor.
+    3. `TERM=dumb` disables all formatting, a `TERM` ending in `256color`
+       selects 256 colors and any other `TERM` 16 colors.
+
+    Without `TERM`, e.g. in many CI environments, 256 colors are assumed.
+    Most CI log viewers show them, but not truecolor.
+    """
+
+    if environ.get("NO_COLOR", "") != "":
+        return ColorDepth.none
+    if environ.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return ColorDepth.truecolor
+
+    term: str = environ.get("TERM", "").lower()
+    if term == "":
+        return ColorDepth.color256
+    if term == "dumb":
+        return ColorDepth.none
+    if term.endswith("256color"):
+        return ColorDepth.color256
+    return ColorDepth.color16
+
+
+#: Channel values of the 6x6x6 color cube of the 256 color palette.
+_CUBE_LEVELS: Final[tuple[int, ...]] = (0, 95, 135, 175, 215, 255)
+
+#: RGB values of the 16 basic colors as shown by xterm.
+_BASIC_PALETTE: Final[tuple[tuple[int, int, int], ...]] = (
+    (0, 0, 0),
+    (205, 0, 0),
+    (0, 205, 0),
+    (205, 205, 0),
+    (0, 0, 238),
+    (205, 0, 205),
+    (0, 205, 205),
+    (229, 229, 229),
+    (127, 127, 127),
+    (255, 0, 0),
+    (0, 255, 0),
+    (255, 255, 0),
+    (92, 92, 255),
+    (255, 0, 255),
+    (0, 255, 255),
+    (255, 255, 255),
+)
+
+#: Every channel is quantised to this many bits to index the 16 color table.
+_BASIC_BITS: Final[int] = 4
+
+
+def _distance(a: tuple[int, int, int], b: tuple[int, int, int]) -> int:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def rgb_to_ansi256(red: int, green: int, blue: int) -> int:
+    """Return the index of the nearest color of the 256 color palette.
+
+    Both the nearest color of the color cube and of the grey ramp are looked
+    up per channel, the closer one of the two is used.
+    """
+
+    # Only loaded once the first color has to be converted to 256 colors.
+    from utxterm._color_table import CUBE_INDEX, GREY_INDEX
+
+    cube: tuple[int, int, int] = (
+        CUBE_INDEX[red],
+        CUBE_INDEX[green],
+        CUBE_INDEX[blue],
+    )
+    cube_rgb: tuple[int, int, int] = (
+        _CUBE_LEVELS[cube[0]],
+        _CUBE_LEVELS[cube[1]],
+        _CUBE_LEVELS[cube[2]],
+    )
+    grey: int = GREY_INDEX[(red + green + blue) // 3]
+    grey_value: int = 8 + 10 * grey
+
+    rgb: tuple[int, int, int] = (red, green, blue)
+    grey_rgb: tuple[int, int, int] = (grey_value, grey_value, grey_value)
+    if _distance(grey_rgb, rgb) < _distance(cube_rgb, rgb):
+        return 232 + grey
+    return 16 + 36 * cube[0] + 6 * cube[1] + cube[2]
+
 
+def ansi256_to_rgb(index: int) -> tuple[int, int, int]:
+    """Return (red, green, blue) of a color of the 256 color palette."""
+
+    if index < len(_BASIC_PALETTE):
+        return _BASIC_PALETTE[index]
+    if index >= 232:
+        grey_value: int = 8 + 10 * (index - 232)
+        return (grey_value, grey_value, grey_value)
+    index -= 16
+    return (
+        _CUBE_LEVELS[index // 36],
+        _CUBE_LEVELS[index // 6 % 6],
+        _CUBE_LEVELS[index % 6],
+    )
+
+
+def rgb_to_ansi16(red: int, green: int, blue: int) -> int:
+    """Return the SGR code of the nearest of the 16 basic colors."""
+
+    # Only loaded once the first color has to be converted to 16 colors.
+    from utxterm._color_table import BASIC_TABLE
+
+    shift: int = 8 - _BASIC_BITS
+    index: int = BASIC_TABLE[
+        (((red >> shift) << _BASIC_BITS) | (green >> shift)) << _BASIC_BITS
+        | (blue >> shift)
+    ]
+    if index < 8:
+        return 30 + index
+    return 90 + index - 8
+
+
+class AnsiFormat:
     reset_fg: Final[str] = "\033[39m"
 
+    bold_on: Final[str] = "\033[1m"
+    bold_off: Final[str] = "\033[22m"
+    underline_on: Final[str] = "\033[4m"
+    underline_off: Final[str] = "\033[24m"
+    italic_on: Final[str] = "\033[3m"
+    italic_off: Final[str] = "\033[23m"
+    strikethrough_on: Final[str] = "\033[9m"
+    strikethrough_off: Final[str] = "\033[29m"
+
     @staticmethod
-    def color(color: int | Colors) -> str:
+    def sgr(*params: str) -> str:
+        """Combine all SGR parameters into a single escape sequence."""
+        return f"\033[{';'.join(params)}m"
+
+    @staticmethod
+    def color_params(color: int | Colors) -> str:
         color_num: int
         match color:
             case int():
@@ -65,30 +213,53 @@ class AnsiFormat:
             case _:
                 assert_never(color)
 
-        return f"\033[{color_num}m"
+        return str(color_num)
 
     @staticmethod
-    def truecolor(hexcolor: str) -> str:
+    def color(color: int | Colors) -> str:
+        return AnsiFormat.sgr(AnsiFormat.color_params(color))
+
+    @staticmethod
+    def truecolor_params(hexcolor: str) -> str:
         r, g, b = hex_to_rgb(hexcolor)
-        return f"\033[38;2;{r};{g};{b}m"
+        return f"38;2;{r};{g};{b}"
+
+    @staticmethod
+    def color256_params(index: int) -> str:
+        return f"38;5;{index}"
+
+    @staticmethod
+    def background_params(foreground_params: str) -> str:
+        """Return the SGR parameters selecting the color as background."""
+        if foreground_params.startswith("38;"):
+            return f"48;{foreground_params.removeprefix('38;')}"
+        return str(int(foreground_params) + 10)
+
+    @staticmethod
+    def truecolor(hexcolor: str) -> str:
+        return AnsiFormat.sgr(AnsiFormat.truecolor_params(hexcolor))
 
     @staticmethod
     def bold(content: str, *args) -> str:
-        return f"\033[1m{content}\033[22m"
+        return f"{AnsiFormat.bold_on}{content}{AnsiFormat.bold_off}"
 
     @staticmethod
     def underline(content: str, *args) -> str:
-        return f"\033[4m{content}\033[24m"
+        return f"{AnsiFormat.underline_on}{content}{AnsiFormat.underline_off}"
 
     @staticmethod
     def italic(content: str, *args) -> str:
-        return f"\033[3m{content}\033[23m"
+        return f"{AnsiFormat.italic_on}{content}{AnsiFormat.italic_off}"
 
     @staticmethod
     def strikethrough(content: str, *args) -> str:
-        return f"\033[9m{content}\033[29m"
+        return (
+            f"{AnsiFormat.strikethrough_on}{content}"
+            f"{AnsiFormat.strikethrough_off}"
+        )
 
+    @staticmethod
     def extract_all_ansicodes(content: str) -> list[str]:
-        pattern: str = "\033[\\d+(;\\d+)*m"
+        pattern: str = "\033\\[\\d+(?:;\\d+)*m"
         match: list[str] = re.findall(pattern, content)
         return match
@@ -0,0 +1,259 @@
+from __future__ import annotations
+import os
+import sys
+import socket
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Final
+
+from utxterm._client import (
+    DEFAULT_IDLE_TIMEOUT,
+    PROTOCOL_VERSION,
+    REQUEST_LENGTH,
+    EXIT_STATUS,
+    ACCEPTED,
+    CLIENT_FDS,
+    socket_path,
+    recv_exactly,
+)
+from utxterm._pumlcallable import PlantumlCallable
+
+if TYPE_CHECKING:
+    from utxterm._argparse import CliArgs
+    from utxterm._batch import PoolProvider
+    from utxterm._plantuml_pool import PlantumlPool
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Plantuml pools kept running at once. Every directory whose diagrams
+#: include other files needs a pool of its own.
+MAX_POOLS: Final[int] = 4
+
+#: Upper bound for the first read of a request.
+_RECV_SIZE: Final[int] = 64 * 1024
+
+Execute = Callable[["CliArgs", "PoolProvider | None"], None]
+
+
+class DaemonError(Exception):
+    pass
+
+
+class _Pools:
+    """Plantuml pools kept running between requests.
+
+    There is one pool per executable and working directory. The least
+    recently used pool is closed once more than `MAX_POOLS` are needed.
+    """
+
+    def __init__(self):
+        self._pools: OrderedDict[
+            tuple[tuple[str, ...], Path | None], PlantumlPool
+        ] = OrderedDict()
+
+    def get(
+        self, puml_callable: PlantumlCallable, directory: Path | None
+    ) -> PlantumlPool:
+        from utxterm._plantuml_pool import PlantumlPool
+        from utxterm._render_puml import pipe_command
+
+        cmd: tuple[str, ...] = tuple(pipe_command(puml_callable))
+        key: tuple[tuple[str, ...], Path | None] = (cmd, directory)
+        pool: PlantumlPool | None = self._pools.get(key)
+        if pool is not None:
+            self._pools.move_to_end(key)
+            return pool
+
+        LOGGER.info(
+            f"Starting a plantuml pool for '{' '.join(cmd)}' in "
+            f"'{directory or os.getcwd()}'."
+        )
+        pool = PlantumlPool(puml_callable, directory=directory)
+        self._pools[key] = pool
+        if len(self._pools) > MAX_POOLS:
+            _, evicted = self._pools.popitem(last=False)
+            evicted.close()
+        return pool
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+
+
+def _exit_status(code: Any) -> int:
+    """Convert the code of a `SystemExit` like the interpreter does."""
+
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_request(
+    request: dict[str, Any], fds: list[int], execute: Execute, pools: _Pools
+) -> int:
+    """Run the command of the request with the streams of the client.
+
+    The working directory, environment and standard streams of the daemon are
+    replaced by the ones of the client while the command runs.
+    """
+
+    import traceback
+    from utxterm._argparse import setup_argparse
+
+    saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+    saved_environ: dict[str, str] = dict(os.environ)
+    saved_cwd: str = os.getcwd()
+
+    stdin = open(fds[0], "r", closefd=False)
+    stdout = open(fds[1], "w", closefd=False)
+    stderr = open(fds[2], "w", closefd=False)
+    status: int = 0
+    try:
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["environ"])
+        sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+        try:
+            execute(setup_argparse(request["argv"]), pools.get)
+        except SystemExit as e:
+            status = _exit_status(e.code)
+        except Exception:
+            traceback.print_exc()
+            status = 1
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        os.chdir(saved_cwd)
+        for stream in (stdin, stdout, stderr):
+            try:
+                stream.close()
+            except OSError:
+                # E.g. a closed pipe, the command already finished anyway.
+                pass
+    return status
+
+
+def _handle(connection: socket.socket, execute: Execute, pools: _Pools):
+    import json
+
+    message, fds, _, _ = socket.recv_fds(
+        connection, _RECV_SIZE, len(CLIENT_FDS)
+    )
+    try:
+        if len(fds) != len(CLIENT_FDS) or len(message) < REQUEST_LENGTH.size:
+            LOGGER.info("Ignoring a request without streams.")
+            return
+        length: int = REQUEST_LENGTH.unpack_from(message)[0]
+        payload: bytes = message[REQUEST_LENGTH.size :]
+        payload += recv_exactly(connection, length - len(payload))
+        request: dict[str, Any] = json.loads(payload)
+        if request.get("version") != PROTOCOL_VERSION:
+            LOGGER.info("Ignoring a request of another protocol version.")
+            return
+
+        connection.sendall(ACCEPTED)
+        status: int = _run_request(request, fds, execute, pools)
+        connection.sendall(EXIT_STATUS.pack(status))
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+
+def _bind(path: Path) -> socket.socket:
+    """Listen on the socket, replacing a stale one of a crashed daemon."""
+
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    stat: os.stat_result = os.stat(path.parent)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise DaemonError(
+            f"'{path.parent}' must only be accessible by the current user."
+        )
+
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(os.fspath(path))
+            except OSError:
+                LOGGER.info(f"Removing the stale socket '{path}'.")
+                path.unlink()
+            else:
+                raise DaemonError(f"A daemon is already running on '{path}'.")
+
+    listener: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(os.fspath(path))
+        os.chmod(path, 0o600)
+        listener.listen()
+    except OSError:
+        listener.close()
+        raise
+    return listener
+
+
+def _serve(listener: socket.socket, execute: Execute, idle_timeout: float):
+    pools: _Pools = _Pools()
+    listener.settimeout(idle_timeout)
+    try:
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except TimeoutError:
+                LOGGER.info("Exiting after being idle.")
+                return
+            with connection:
+                # Only waiting for new requests is limited by the timeout.
+                connection.settimeout(None)
+                try:
+                    _handle(connection, execute, pools)
+                except (OSError, ValueError) as e:
+                    LOGGER.info(f"Failed to handle a request: {e}")
+    finally:
+        pools.close()
+
+
+def start_daemon(execute: Execute, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+    """Start the daemon in the background and return once it is listening.
+
+    The daemon runs `execute` for every command line forwarded by a client,
+    one at a time. Everything imported, searched for and cached stays loaded
+    between the requests, and plantuml processes keep running. The daemon
+    exits once no request arrived for `idle_timeout` seconds.
+    """
+
+    path: Path = Path(socket_path())
+    # Bound before forking, so commands started right after this returned
+    # already reach the daemon.
+    listener: socket.socket = _bind(path)
+    pid: int = os.fork()
+    if pid != 0:
+        listener.close()
+        print(f"Started the daemon on '{path}' with pid {pid}.")
+        return
+
+    import signal
+
+    os.setsid()
+    # Stopping the daemon with `kill` removes its socket, like idling does.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    devnull: int = os.open(os.devnull, os.O_RDWR)
+    for fd in CLIENT_FDS:
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+    status: int = 0
+    try:
+        _serve(listener, execute, idle_timeout)
+    except BaseException:
+        status = 1
+    finally:
+        path.unlink(missing_ok=True)
+        listener.close()
+        # Never return into the command line of the parent process.
+        os._exit(status)
@@ -0,0 +1,203 @@
+from html import escape
+from functools import lru_cache
+from typing import Callable, Final, Iterable
+
+from utxterm import _timings
+from utxterm._colors import (
+    Colors,
+    ColorDepth,
+    ansi256_to_rgb,
+    rgb_to_hex,
+)
+from utxterm._replace_formatting import ReplaceMode, format_spans
+from utxterm._sgr import (
+    DEFAULT_STYLE,
+    ATTRIBUTE_PARAMS,
+    Span,
+    Style,
+    spans_to_ansi,
+)
+
+
+#: Writes the styled spans of every line in some format.
+Emitter = Callable[[list[list[Span]]], str]
+
+
+class UnknownEmitter(Exception):
+    pass
+
+
+def emit_ansi(lines: list[list[Span]]) -> str:
+    """Text with SGR escape sequences, like `replace_formatting` returns."""
+    return "\n".join([spans_to_ansi(spans) for spans in lines])
+
+
+def emit_plain(lines: list[list[Span]]) -> str:
+    """The text of `emit_ansi`, without any escape sequences."""
+    return "\n".join(["".join([text for text, _ in spans]) for spans in lines])
+
+
+def _palette_index(code: int) -> int:
+    """Index in the 256 color palette of an SGR foreground color code."""
+    return code - 30 if code < 90 else code - 90 + 8
+
+
+def _html_color(params: str, kind: str) -> tuple[str | None, str | None]:
+    """Return the CSS class or the hex color of SGR color parameters.
+
+    The 16 named colors get a class, so the stylesheet can adapt them to the
+    page. All others are given as `#rrggbb`.
+    """
+
+    match params.split(";"):
+        case [_, "2", red, green, blue]:
+            return None, rgb_to_hex(int(red), int(green), int(blue))
+        case [_, "5", index]:
+            return None, rgb_to_hex(*ansi256_to_rgb(int(index)))
+        case [code]:
+            foreground_code: int = int(code) - (10 if kind == "bg" else 0)
+            return f"utx-{kind}-{Colors(foreground_code).name}", None
+        case _:
+            raise ValueError(f"'{params}' are no SGR color parameters.")
+
+
+@lru_cache(maxsize=1024)
+def _html_open(style: Style) -> str:
+    """Return the `<span>` tag showing text in the style."""
+
+    classes: list[str] = [
+        f"utx-{name}" for name in ATTRIBUTE_PARAMS if getattr(style, name)
+    ]
+    declarations: list[str] = []
+    for kind, params, css_property in (
+        ("fg", style.foreground, "color"),
+        ("bg", style.background, "background-color"),
+    ):
+        if params is None:
+            continue
+        color_class, hex_color = _html_color(params, kind)
+        if color_class is not None:
+            classes.append(color_class)
+        else:
+            declarations.append(f"{css_property}:{hex_color}")
+
+    attributes: str = ""
+    if len(classes) != 0:
+        attributes += f' class="{" ".join(classes)}"'
+    if len(declarations) != 0:
+        attributes += f' style="{";".join(declarations)}"'
+    return f"<span{attributes}>"
+
+
+def emit_html(lines: list[list[Span]]) -> str:
+    """A `<pre>` element with a `<span>` around every styled piece of text.
+
+    Attributes and the 16 named colors are set with the classes of
+    `HTML_STYLESHEET`, all other colors with inline styles.
+    """
+
+    parts: list[str] = ['<pre class="utx">']
+    for index, spans in enumerate(lines):
+        if index != 0:
+            parts.append("\n")
+        for text, style in spans:
+            if style is DEFAULT_STYLE or style == DEFAULT_STYLE:
+                parts.append(escape(text, quote=False))
+            else:
+                parts.append(_html_open(style))
+                parts.append(escape(text, quote=False))
+                parts.append("</span>")
+    parts.append("</pre>")
+    return "".join(parts)
+
+
+def _stylesheet() -> str:
+    rules: list[str] = [
+        ".utx-bold { font-weight: bold; }",
+        ".utx-italic { font-style: italic; }",
+        ".utx-underline { text-decoration-line: underline; }",
+        ".utx-strikethrough { text-decoration-line: line-through; }",
+        ".utx-underline.utx-strikethrough "
+        "{ text-decoration-line: underline line-through; }",
+    ]
+    for color in Colors:
+        hex_color: str = rgb_to_hex(
+            *ansi256_to_rgb(_palette_index(color.value))
+        )
+        rules.append(f".utx-fg-{color.name} {{ color: {hex_color}; }}")
+        rules.append(
+            f".utx-bg-{color.name} {{ background-color: {hex_color}; }}"
+        )
+    return "\n".join(rules)
+
+
+#: CSS classes used by `emit_html`, with the colors xterm shows.
+HTML_STYLESHEET: Final[str] = _stylesheet()
+
+
+def emit_json(lines: list[list[Span]]) -> str:
+    """A JSON list of lines, each a list of spans.
+
+    Every span is an object with its `text` and all fields of `Style` which
+    are not the default, e.g. `{"text": "a", "bold": true}`. Colors are
+    given as SGR parameters, e.g. `"31"` or `"38;2;210;126;153"`.
+    """
+
+    import json
+
+    return json.dumps(
+        [
+            [
+                {
+                    "text": text,
+                    **{
+                        name: value
+                        for name, value in vars(style).items()
+                        if value != getattr(DEFAULT_STYLE, name)
+                    },
+                }
+                for text, style in spans
+            ]
+            for spans in lines
+        ],
+        ensure_ascii=False,
+    )
+
+
+#: Emitters selected by their name in `emit`.
+EMITTERS: Final[dict[str, Emitter]] = {
+    "ansi": emit_ansi,
+    "plain": emit_plain,
+    "html": emit_html,
+    "json": emit_json,
+}
+
+
+def emit(
+    content: str,
+    targets: Iterable[str | Emitter],
+    mode: ReplaceMode = ReplaceMode.align_left,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> list[str]:
+    """Format utxt content once and write it in every target format.
+
+    Targets are the names of `EMITTERS`, or any function writing the styled
+    spans of every line. The results are returned in the order of the
+    targets.
+    """
+
+    emitters: list[Emitter] = []
+    for target in targets:
+        if not isinstance(target, str):
+            emitters.append(target)
+        elif target in EMITTERS:
+            emitters.append(EMITTERS[target])
+        else:
+            raise UnknownEmitter(
+                f"'{target}' is none of {', '.join(EMITTERS)}."
+            )
+
+    with _timings.phase("format"):
+        lines: list[list[Span]] = format_spans(content, mode, color_depth)
+    with _timings.phase("emit"):
+        return [emitter(lines) for emitter in emitters]
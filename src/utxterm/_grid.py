@@ -0,0 +1,328 @@
+import re
+from array import array
+from itertools import compress, cycle, accumulate
+from dataclasses import dataclass
+from typing import Final
+
+from utxterm._colors import ColorDepth
+from utxterm._boundaries import split_segments
+from utxterm._replace_formatting import ReplaceMode, replace_segment
+
+
+#: Cell classes used to decide which columns can be removed.
+RIGID: Final[int] = 0
+#: Whitespace inside a box between its text and its right border.
+TRAILING: Final[int] = 1
+#: Horizontal line of a box border. At least one cell per run is kept.
+BORDER: Final[int] = 2
+#: Space or horizontal connector outside of boxes. At least one cell is kept
+#: per run, if the run is enclosed by other cells on both sides.
+GAP: Final[int] = 3
+
+HORIZONTAL_BORDER_CHARS: Final[str] = "─┬┴┼"
+VERTICAL_BORDER_CHARS: Final[str] = "│├┤┼"
+CONNECTOR_CHARS: Final[str] = " -=.~─═┄┈"
+
+_TOP_LEFT: Final[str] = "┌"
+_TOP_RIGHT: Final[str] = "┐"
+_BOTTOM_LEFT: Final[str] = "└"
+_BOTTOM_RIGHT: Final[str] = "┘"
+_SEPARATOR_LEFT: Final[str] = "├"
+_SEPARATOR_RIGHT: Final[str] = "┤"
+_HORIZONTAL: Final[str] = "─"
+
+_ANSI_PATTERN: Final[re.Pattern] = re.compile("(\033\\[[0-9;]*m)")
+
+
+@dataclass(frozen=True)
+class Box:
+    top: int
+    left: int
+    bottom: int
+    right: int
+
+
+class CellGrid:
+    """The visible characters of a utxt diagram as a grid of cells.
+
+    All cells are stored row-major in a single array, with every row padded to
+    the same width. ANSI sequences have no width, so they are kept separately
+    as prefixes of the cell they precede.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        self.chars: array = array("w", " " * (width * height))
+        self.row_lengths: array = array("I", [0] * height)
+
+        #: ANSI sequences written before the cell at the given index.
+        self.prefixes: dict[int, str] = {}
+        #: ANSI sequences written after the last cell of the given row.
+        self.suffixes: dict[int, str] = {}
+        #: Marks whitespace in segments whose tags were replaced.
+        self.tag_slack: bytearray = bytearray(width * height)
+
+    def char_at(self, row: int, col: int) -> str:
+        return self.chars[row * self.width + col]
+
+    @staticmethod
+    def from_utxt(
+        content: str, color_depth: ColorDepth = ColorDepth.truecolor
+    ) -> "CellGrid":
+        """Parse the utxt content and replace all formatting tags.
+
+        Tags are replaced as in `ReplaceMode.align_left`, so the width of the
+        removed tags ends up as whitespace at the end of each segment.
+        """
+
+        lines: list[str] = content.split("\n")
+        rows: list[list[tuple[str, str]]] = []
+        slack: list[list[int]] = []
+        suffixes: list[str] = []
+
+        for line in lines:
+            cells: list[tuple[str, str]] = []
+            slack_cols: list[int] = []
+            parts: list[str] = split_segments(line)
+            texts: list[str] = parts[::2]
+            pending: str = ""
+            for index, part in enumerate(texts):
+                if index != 0:
+                    cells.append((pending, parts[2 * index - 1]))
+                    pending = ""
+
+                is_segment: bool = 0 < index < len(texts) - 1
+                replaced: str = part
+                if is_segment:
+                    replaced = replace_segment(
+                        part, ReplaceMode.align_left, color_depth
+                    )
+
+                start: int = len(cells)
+                for token in _ANSI_PATTERN.split(replaced):
+                    if token.startswith("\033"):
+                        pending += token
+                        continue
+                    for char in token:
+                        cells.append((pending, char))
+                        pending = ""
+
+                if is_segment and replaced != part:
+                    col: int = len(cells) - 1
+                    while col >= start and cells[col][1] == " ":
+                        slack_cols.append(col)
+                        col -= 1
+
+            rows.append(cells)
+            slack.append(slack_cols)
+            suffixes.append(pending)
+
+        grid: CellGrid = CellGrid(
+            max((len(cells) for cells in rows), default=0), len(rows)
+        )
+        for row, cells in enumerate(rows):
+            offset: int = row * grid.width
+            grid.row_lengths[row] = len(cells)
+            grid.chars[offset : offset + len(cells)] = array(
+                "w", "".join(char for _, char in cells)
+            )
+            for col, (prefix, _) in enumerate(cells):
+                if prefix:
+                    grid.prefixes[offset + col] = prefix
+            for col in slack[row]:
+                grid.tag_slack[offset + col] = 1
+            if suffixes[row]:
+                grid.suffixes[row] = suffixes[row]
+
+        return grid
+
+    def _trace_box(self, top: int, left: int) -> Box | None:
+        right: int = left + 1
+        while right < self.width and (
+            self.char_at(top, right) in HORIZONTAL_BORDER_CHARS
+        ):
+            right += 1
+        if right >= self.width or self.char_at(top, right) != _TOP_RIGHT:
+            return None
+
+        bottom: int = top + 1
+        while bottom < self.height and (
+            self.char_at(bottom, left) in VERTICAL_BORDER_CHARS
+        ):
+            bottom += 1
+        if bottom >= self.height:
+            return None
+        if self.char_at(bottom, left) != _BOTTOM_LEFT:
+            return None
+        if self.char_at(bottom, right) != _BOTTOM_RIGHT:
+            return None
+
+        return Box(top, left, bottom, right)
+
+    def find_boxes(self) -> list[Box]:
+        """Find all boxes by following their borders from the top left."""
+
+        text: str = self.chars.tounicode()
+        boxes: list[Box] = []
+        index: int = text.find(_TOP_LEFT)
+        while index != -1:
+            box: Box | None = self._trace_box(*divmod(index, self.width))
+            if box is not None:
+                boxes.append(box)
+            index = text.find(_TOP_LEFT, index + 1)
+        return boxes
+
+    def classify_cells(self) -> bytearray:
+        """Return the class of every cell, see `RIGID`, `TRAILING`, etc."""
+
+        width: int = self.width
+        classes: bytearray = bytearray(width * self.height)
+        covered: bytearray = bytearray(width * self.height)
+
+        for box in self.find_boxes():
+            for row in range(box.top, box.bottom + 1):
+                offset: int = row * width
+                covered[offset + box.left : offset + box.right + 1] = bytes(
+                    [1] * (box.right - box.left + 1)
+                )
+
+                is_border_row: bool = row in (box.top, box.bottom) or (
+                    self.chars[offset + box.left] == _SEPARATOR_LEFT
+                    and self.chars[offset + box.right] == _SEPARATOR_RIGHT
+                )
+                if is_border_row:
+                    for col in range(box.left + 1, box.right):
+                        if self.chars[offset + col] == _HORIZONTAL:
+                            classes[offset + col] = BORDER
+                    continue
+
+                col: int = box.right - 1
+                while col > box.left and self.chars[offset + col] == " ":
+                    classes[offset + col] = TRAILING
+                    col -= 1
+
+        for index, char in enumerate(self.chars):
+            if not covered[index] and char in CONNECTOR_CHARS:
+                classes[index] = GAP
+
+        return classes
+
+    def removable_columns(self) -> bytearray:
+        """Return a mask of the columns which can be removed.
+
+        A column is removed if it contains whitespace left behind by a
+        replaced tag, and every other cell in it is whitespace or a
+        horizontal line. Runs of horizontal lines keep at least one cell,
+        so neighbouring boxes and connectors stay separated.
+        """
+
+        width: int = self.width
+        classes: bytearray = self.classify_cells()
+        removable: bytearray = bytearray(width)
+        for col in range(width):
+            removable[col] = int(
+                RIGID not in classes[col::width]
+                and 1 in self.tag_slack[col::width]
+            )
+
+        if 1 not in removable:
+            return removable
+
+        for row in range(self.height):
+            offset: int = row * width
+            col: int = 0
+            while col < width:
+                cell_class: int = classes[offset + col]
+                if cell_class not in (BORDER, GAP):
+                    col += 1
+                    continue
+
+                start: int = col
+                while col < width and classes[offset + col] == cell_class:
+                    col += 1
+
+                is_enclosed: bool = cell_class == BORDER or (
+                    start > 0 and col < self.row_lengths[row]
+                )
+                if is_enclosed and 0 not in removable[start:col]:
+                    removable[col - 1] = 0
+
+        return removable
+
+    def remove_columns(self, removable: bytearray) -> "CellGrid":
+        """Return a new grid without the columns marked in `removable`.
+
+        ANSI sequences of removed cells are moved to the next kept cell of
+        the same row.
+        """
+
+        keep: list[bool] = [not remove for remove in removable]
+        # `kept_before[col]` is the new index of the column, or of the next
+        # kept column if it is removed.
+        kept_before: list[int] = [0, *accumulate(keep)]
+        new_width: int = kept_before[-1]
+
+        grid: CellGrid = CellGrid(0, self.height)
+        grid.width = new_width
+        grid.chars = array("w", compress(self.chars, cycle(keep)))
+        grid.tag_slack = bytearray(compress(self.tag_slack, cycle(keep)))
+        grid.row_lengths = array(
+            "I", [kept_before[length] for length in self.row_lengths]
+        )
+        grid.suffixes = dict(self.suffixes)
+
+        for index in sorted(self.prefixes):
+            row, col = divmod(index, self.width)
+            new_col: int = kept_before[col]
+            if new_col >= grid.row_lengths[row]:
+                suffix: str = grid.suffixes.get(row, "")
+                grid.suffixes[row] = self.prefixes[index] + suffix
+                continue
+            new_index: int = row * new_width + new_col
+            grid.prefixes[new_index] = (
+                grid.prefixes.get(new_index, "") + self.prefixes[index]
+            )
+
+        return grid
+
+    def to_utxt(self) -> str:
+        text: str = self.chars.tounicode()
+        prefixes: list[int] = sorted(self.prefixes)
+        prefix_index: int = 0
+
+        lines: list[str] = []
+        for row in range(self.height):
+            start: int = row * self.width
+            end: int = start + self.row_lengths[row]
+            parts: list[str] = []
+            position: int = start
+            while prefix_index < len(prefixes) and prefixes[prefix_index] < end:
+                index: int = prefixes[prefix_index]
+                if index >= start:
+                    parts.append(text[position:index])
+                    parts.append(self.prefixes[index])
+                    position = index
+                prefix_index += 1
+            parts.append(text[position:end])
+            parts.append(self.suffixes.get(row, ""))
+            lines.append("".join(parts))
+
+        return "\n".join(lines)
+
+
+def reflow_formatting(
+    content: str,
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> str:
+    """Replace all formatting tags and shrink the boxes to the visible text.
+
+    Columns are removed from the whole diagram, see `removable_columns`, so
+    a box stays wider than its text where other boxes in the same columns
+    need them. The `mode` is ignored, since no replacement whitespace is
+    left which could be distributed. The text is always aligned to the left.
+    """
+
+    grid: CellGrid = CellGrid.from_utxt(content, color_depth)
+    return grid.remove_columns(grid.removable_columns()).to_utxt()
@@ -0,0 +1,441 @@
+import os
+import re
+import sys
+import mmap
+import select
+import logging
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Final, Generator
+
+from utxterm._validate import Config, is_puml
+from utxterm._read_file import STDIN_PATH
+from utxterm._replace_formatting import replace_line
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Number of formatted lines kept in memory.
+LINE_CACHE_SIZE: Final[int] = 1024
+#: Columns moved by a single horizontal scroll.
+HORIZONTAL_STEP: Final[int] = 8
+
+_ANSI_PATTERN: Final[re.Pattern] = re.compile("\033\\[[0-9;]*m")
+_NEWLINE_PATTERN: Final[re.Pattern] = re.compile(b"\n")
+
+_ENTER_ALT_SCREEN: Final[str] = "\033[?1049h\033[?7l\033[?25l\033[2J"
+_LEAVE_ALT_SCREEN: Final[str] = "\033[?25h\033[?7h\033[?1049l"
+
+_KEYS: Final[dict[bytes, str]] = {
+    b"\033[A": "up",
+    b"\033[B": "down",
+    b"\033[C": "right",
+    b"\033[D": "left",
+    b"\033[5~": "page_up",
+    b"\033[6~": "page_down",
+    b"\033[H": "home",
+    b"\033[F": "end",
+    b"k": "up",
+    b"j": "down",
+    b"\r": "down",
+    b"\n": "down",
+    b"l": "right",
+    b"h": "left",
+    b"b": "page_up",
+    b" ": "page_down",
+    b"f": "page_down",
+    b"g": "home",
+    b"G": "end",
+    b"/": "search",
+    b"n": "next",
+    b"N": "previous",
+    b"q": "quit",
+}
+
+
+class LineIndex:
+    """Start offsets of the lines in a buffer, built on demand.
+
+    The buffer is only scanned as far as the lines accessed so far, so the
+    first lines of a huge file are available immediately.
+    """
+
+    def __init__(self, buffer: mmap.mmap | bytes, encoding: str = "utf-8"):
+        self.buffer: mmap.mmap | bytes = buffer
+        #: Encoding of the buffer. Must encode `\n` as a single byte.
+        self.encoding: str = encoding
+        self.starts: array = array("q", [0])
+        self.complete: bool = len(buffer) == 0
+
+    def _scan_next(self):
+        position: int = self.buffer.find(b"\n", self.starts[-1])
+        if position == -1 or position + 1 == len(self.buffer):
+            self.complete = True
+            return
+        self.starts.append(position + 1)
+
+    def has_line(self, row: int) -> bool:
+        if len(self.buffer) == 0:
+            return False
+        while len(self.starts) <= row and not self.complete:
+            self._scan_next()
+        return row < len(self.starts)
+
+    def num_lines(self) -> int:
+        """Number of lines, which requires scanning the whole buffer."""
+
+        if not self.complete:
+            self.starts.extend(
+                match.end()
+                for match in _NEWLINE_PATTERN.finditer(
+                    self.buffer, self.starts[-1]
+                )
+            )
+            if self.starts[-1] == len(self.buffer):
+                # A newline at the very end does not start another line.
+                self.starts.pop()
+            self.complete = True
+        return len(self.starts) if len(self.buffer) != 0 else 0
+
+    def known_lines(self) -> int | None:
+        """Number of lines if already known without further scanning."""
+        return self.num_lines() if self.complete else None
+
+    def row_of(self, offset: int) -> int:
+        while not self.complete and self.starts[-1] <= offset:
+            self._scan_next()
+        return bisect_right(self.starts, offset) - 1
+
+    def line(self, row: int) -> str:
+        if not self.has_line(row + 1):
+            end: int = self.buffer.find(b"\n", self.starts[row])
+            if end == -1:
+                end = len(self.buffer)
+        else:
+            end = self.starts[row + 1] - 1
+        raw: bytes = self.buffer[self.starts[row] : end]
+        return raw.decode(self.encoding, "replace").rstrip("\r")
+
+
+@dataclass
+class FormattedLine:
+    """A formatted line split into its visible text and escape sequences."""
+
+    text: str
+    #: Index of the character in `text` each sequence is written before.
+    code_positions: list[int]
+    codes: list[str]
+
+    @staticmethod
+    def parse(formatted: str) -> "FormattedLine":
+        text_parts: list[str] = []
+        positions: list[int] = []
+        codes: list[str] = []
+        length: int = 0
+        previous_end: int = 0
+        for match in _ANSI_PATTERN.finditer(formatted):
+            text: str = formatted[previous_end : match.start()]
+            text_parts.append(text)
+            length += len(text)
+            positions.append(length)
+            codes.append(match.group())
+            previous_end = match.end()
+        text_parts.append(formatted[previous_end:])
+        return FormattedLine("".join(text_parts), positions, codes)
+
+    def window(self, start: int, width: int) -> str:
+        """Return the visible columns `[start, start + width)`.
+
+        All escape sequences to the left of the window are written before its
+        first column, so it starts in the correct style.
+        """
+
+        end: int = start + width
+        first: int = bisect_right(self.code_positions, start)
+        parts: list[str] = self.codes[:first]
+        position: int = start
+        index: int = first
+        while index < len(self.codes) and self.code_positions[index] < end:
+            code_position: int = self.code_positions[index]
+            parts.append(self.text[position:code_position])
+            parts.append(self.codes[index])
+            position = code_position
+            index += 1
+        parts.append(self.text[position:end])
+        return "".join(parts)
+
+
+class Pager:
+    """State of the pager, independent of the actual terminal."""
+
+    def __init__(self, index: LineIndex, config: Config, name: str):
+        self.index: LineIndex = index
+        self.config: Config = config
+        self.name: str = name
+
+        self.top: int = 0
+        self.left: int = 0
+        self.width: int = 80
+        #: Number of rows for the content, without the status line.
+        self.height: int = 23
+        self.message: str = ""
+        self.last_search: bytes | None = None
+
+        self._lines: OrderedDict[int, FormattedLine] = OrderedDict()
+
+    def resize(self, columns: int, lines: int):
+        self.width = max(1, columns)
+        self.height = max(1, lines - 1)
+
+    def formatted_line(self, row: int) -> FormattedLine:
+        formatted: FormattedLine | None = self._lines.get(row)
+        if formatted is not None:
+            self._lines.move_to_end(row)
+            return formatted
+
+        formatted = FormattedLine.parse(
+            replace_line(
+                self.index.line(row),
+                self.config.mode,
+                self.config.color_depth,
+            )
+        )
+        self._lines[row] = formatted
+        if len(self._lines) > LINE_CACHE_SIZE:
+            self._lines.popitem(last=False)
+        return formatted
+
+    def _max_top(self) -> int:
+        return max(0, self.index.num_lines() - self.height)
+
+    def scroll(self, rows: int):
+        if rows < 0:
+            self.top = max(0, self.top + rows)
+            return
+        # Only scan as far as needed to know whether the rows exist.
+        target: int = self.top + rows
+        if self.index.has_line(target + self.height - 1):
+            self.top = target
+        else:
+            self.top = self._max_top()
+
+    def scroll_horizontal(self, columns: int):
+        self.left = max(0, self.left + columns)
+
+    def search(self, pattern: bytes, backwards: bool = False) -> bool:
+        """Move to the next line containing `pattern` in the raw utxt.
+
+        The pattern is typed in the terminal, so it is always UTF-8.
+        """
+
+        self.last_search = pattern
+        needle: bytes = pattern
+        if self.index.encoding != "utf-8":
+            needle = pattern.decode("utf-8", "replace").encode(
+                self.index.encoding, "replace"
+            )
+        buffer: mmap.mmap | bytes = self.index.buffer
+        start: int = self.index.starts[self.top]
+        offset: int
+        if backwards:
+            offset = buffer.rfind(needle, 0, max(0, start - 1))
+        else:
+            if self.index.has_line(self.top + 1):
+                start = self.index.starts[self.top + 1]
+            else:
+                start = len(buffer)
+            offset = buffer.find(needle, start)
+
+        if offset == -1:
+            # The pattern may end within a character still being typed.
+            text: str = pattern.decode("utf-8", "replace")
+            self.message = f"Pattern not found: {text}"
+            return False
+
+        row: int = self.index.row_of(offset)
+        self.top = row
+        line_start: int = self.index.starts[row]
+        column: int = len(
+            buffer[line_start:offset].decode(self.index.encoding, "ignore")
+        )
+        if not self.left <= column < self.left + self.width:
+            self.left = max(0, column - self.width // 2)
+        self.message = ""
+        return True
+
+    def handle(self, action: str) -> bool:
+        """Apply the action of a key. Returns `False` to quit."""
+
+        self.message = ""
+        match action:
+            case "up":
+                self.scroll(-1)
+            case "down":
+                self.scroll(1)
+            case "page_up":
+                self.scroll(-self.height)
+            case "page_down":
+                self.scroll(self.height)
+            case "home":
+                self.top = 0
+            case "end":
+                self.top = self._max_top()
+            case "left":
+                self.scroll_horizontal(-HORIZONTAL_STEP)
+            case "right":
+                self.scroll_horizontal(HORIZONTAL_STEP)
+            case "next" | "previous" if self.last_search is not None:
+                self.search(self.last_search, backwards=action == "previous")
+            case "quit":
+                return False
+        return True
+
+    def status(self) -> str:
+        total: int | None = self.index.known_lines()
+        total_str: str = str(total) if total is not None else "?"
+        status: str = (
+            f" {self.name}  line {self.top + 1}/{total_str}  "
+            f"col {self.left + 1}"
+        )
+        if self.message:
+            status = f"{status}  {self.message}"
+        return status[: self.width]
+
+    def render(self) -> str:
+        """Return the escape sequences drawing the whole screen."""
+
+        parts: list[str] = []
+        for screen_row in range(self.height):
+            row: int = self.top + screen_row
+            parts.append(f"\033[{screen_row + 1};1H")
+            if self.index.has_line(row):
+                line: FormattedLine = self.formatted_line(row)
+                parts.append(line.window(self.left, self.width))
+            else:
+                parts.append("~")
+            parts.append("\033[0m\033[K")
+        parts.append(f"\033[{self.height + 1};1H\033[7m{self.status()}")
+        parts.append("\033[0m\033[K")
+        return "".join(parts)
+
+
+@contextmanager
+def _open_buffer(
+    config: Config,
+) -> Generator[mmap.mmap | bytes, None, None]:
+    """Memory map the utxt file, or render it if it is a `.puml` file."""
+
+    filepath: Path = config.filepaths[0]
+    if filepath == STDIN_PATH:
+        yield sys.stdin.buffer.read()
+        return
+
+    if is_puml(filepath):
+        from utxterm._batch import load_utxt_contents
+
+        content: str = load_utxt_contents(replace(config, jobs=1))[0]
+        yield content.encode("utf-8")
+        return
+
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be memory mapped.
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def _read_key(fd: int) -> bytes:
+    key: bytes = os.read(fd, 1)
+    if key != b"\033":
+        return key
+    # Escape sequences of special keys arrive at once.
+    while select.select([fd], [], [], 0.01)[0]:
+        key += os.read(fd, 1)
+        if key[-1:].isalpha() or key.endswith(b"~"):
+            break
+    return key
+
+
+def _prompt(fd: int, out: int, pager: Pager) -> bytes | None:
+    """Read a search pattern in the status line. `None` if cancelled."""
+
+    pattern: bytes = b""
+    while True:
+        os.write(
+            out,
+            f"\033[{pager.height + 1};1H\033[K/".encode("utf-8") + pattern,
+        )
+        key: bytes = _read_key(fd)
+        if key in (b"\r", b"\n"):
+            return pattern if pattern else pager.last_search
+        if key.startswith(b"\033"):
+            return None
+        if key in (b"\x7f", b"\x08"):
+            pattern = pattern[:-1]
+            continue
+        pattern += key
+
+
+def page(config: Config):
+    """Show the single input file in an interactive pager.
+
+    Lines are only read and formatted once they are visible, so even huge
+    files open immediately. Keys are read from the controlling terminal, so
+    the content itself can come from stdin.
+    """
+
+    if len(config.filepaths) != 1:
+        raise ValueError("The pager can only show a single file.")
+
+    import tty
+    import termios
+
+    # Rendered `.puml` files are always UTF-8.
+    encoding: str = "utf-8" if is_puml(config.filepaths[0]) else config.encoding
+    with _open_buffer(config) as buffer:
+        pager: Pager = Pager(
+            LineIndex(buffer, encoding),
+            config,
+            config.filepaths[0].name or "stdin",
+        )
+        fd: int = os.open("/dev/tty", os.O_RDWR)
+        saved: list = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            os.write(fd, _ENTER_ALT_SCREEN.encode("utf-8"))
+            running: bool = True
+            redraw: bool = True
+            last_size: os.terminal_size | None = None
+            while running:
+                size: os.terminal_size = os.get_terminal_size(fd)
+                if redraw or size != last_size:
+                    pager.resize(size.columns, size.lines)
+                    os.write(fd, pager.render().encode("utf-8"))
+                    last_size = size
+                    redraw = False
+
+                # Wake up periodically, so resizing the terminal is noticed.
+                if not select.select([fd], [], [], 0.25)[0]:
+                    continue
+                redraw = True
+                key: bytes = _read_key(fd)
+                action: str | None = _KEYS.get(key)
+                if action == "search":
+                    pattern: bytes | None = _prompt(fd, fd, pager)
+                    if pattern:
+                        pager.search(pattern)
+                    continue
+                if action is not None:
+                    running = pager.handle(action)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.write(fd, _LEAVE_ALT_SCREEN.encode("utf-8"))
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+            os.close(fd)
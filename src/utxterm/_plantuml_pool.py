@@ -0,0 +1,235 @@
+from __future__ import annotations
+import time
+import queue
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from typing import Final, IO, Self
+
+from utxterm._pumlcallable import PlantumlCallable, PlantUmlRenderError
+from utxterm._render_puml import (
+    PIPE_DELIMITER,
+    pipe_command,
+    split_diagrams,
+    join_diagrams,
+)
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE: Final[int] = 2
+DEFAULT_TIMEOUT: Final[float] = 30.0
+
+
+class PlantUmlWorkerError(Exception):
+    pass
+
+
+class PlantUmlRenderTimeout(PlantUmlWorkerError):
+    pass
+
+
+class PlantumlWorker:
+    """A long-lived plantuml process rendering diagrams in `-pipe` mode.
+
+    Diagram sources are written to the stdin of the process. The rendered
+    unicode output is read back from stdout until the `PIPE_DELIMITER` line.
+    A background thread reads stdout, so reads can time out. Relative
+    includes are resolved within `directory`, the working directory by
+    default.
+    """
+
+    def __init__(self, cmd: list[str], directory: Path | None = None):
+        self.cmd: list[str] = cmd
+        LOGGER.info(f"Starting plantuml worker: '{' '.join(self.cmd)}'")
+
+        self._process: subprocess.Popen = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf-8",
+            cwd=directory,
+        )
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        self._reader: threading.Thread = threading.Thread(
+            target=self._read_stdout, daemon=True
+        )
+        self._reader.start()
+
+    def _read_stdout(self):
+        stdout: IO[str] | None = self._process.stdout
+        assert stdout is not None
+        for line in stdout:
+            self._lines.put(line)
+        # Signals that the process closed its output.
+        self._lines.put(None)
+
+    def is_alive(self) -> bool:
+        return self._process.poll() is None
+
+    def render(self, source: str, timeout: float) -> str:
+        """Render all diagrams of the plantuml source.
+
+        Raises `PlantUmlRenderTimeout` if not all diagrams were returned
+        within `timeout` seconds, and `PlantUmlWorkerError` if the process
+        died. In both cases the worker is unusable afterwards.
+        """
+
+        diagrams: list[str] = split_diagrams(source)
+        if len(diagrams) == 0:
+            raise PlantUmlRenderError("The source contains no diagram.")
+
+        stdin: IO[str] | None = self._process.stdin
+        assert stdin is not None
+
+        try:
+            stdin.write("".join(diagrams))
+            stdin.flush()
+        except OSError as e:
+            self.kill()
+            raise PlantUmlWorkerError(
+                "Could not send the diagram to the plantuml worker."
+            ) from e
+
+        deadline: float = time.monotonic() + timeout
+        rendered: list[str] = []
+        lines: list[str] = []
+        while len(rendered) != len(diagrams):
+            try:
+                line: str | None = self._lines.get(
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+            except queue.Empty as e:
+                self.kill()
+                raise PlantUmlRenderTimeout(
+                    f"The plantuml worker did not respond within {timeout}s."
+                ) from e
+
+            if line is None:
+                self.kill()
+                raise PlantUmlWorkerError(
+                    "The plantuml worker exited while rendering "
+                    f"(exit code {self._process.returncode})."
+                )
+            if line.rstrip("\r\n") == PIPE_DELIMITER:
+                rendered.append("".join(lines))
+                lines = []
+                continue
+            lines.append(line)
+
+        return join_diagrams(rendered)
+
+    def kill(self):
+        if self.is_alive():
+            self._process.kill()
+        self._process.wait()
+
+    def close(self):
+        """Close stdin so plantuml exits on its own, then wait for it."""
+        if self._process.stdin is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self._process.wait(timeout=DEFAULT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+
+class PlantumlPool:
+    """A fixed number of persistent plantuml workers.
+
+    Workers are started lazily on first use, so the JVM startup is only paid
+    once per worker instead of once per diagram. Crashed or timed out
+    workers are replaced on the next render. The pool can be used from
+    multiple threads at once. All workers run in `directory`, see
+    `PlantumlWorker`.
+    """
+
+    def __init__(
+        self,
+        puml_callable: PlantumlCallable,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        directory: Path | None = None,
+    ):
+        if size < 1:
+            raise ValueError("The plantuml pool needs at least one worker.")
+
+        self.cmd: list[str] = pipe_command(puml_callable)
+        self.size: int = size
+        self.timeout: float = timeout
+        self.directory: Path | None = directory
+
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+        self._workers: list[PlantumlWorker] = []
+        self._idle: queue.Queue[PlantumlWorker | None] = queue.Queue()
+        for _ in range(size):
+            # `None` marks a slot without a running worker.
+            self._idle.put(None)
+
+    def _acquire(self) -> PlantumlWorker:
+        worker: PlantumlWorker | None = self._idle.get()
+        if worker is not None and worker.is_alive():
+            return worker
+
+        if worker is not None:
+            LOGGER.info("Restarting a crashed plantuml worker.")
+            self._forget(worker)
+
+        try:
+            worker = PlantumlWorker(self.cmd, self.directory)
+        except OSError:
+            self._idle.put(None)
+            raise
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _forget(self, worker: PlantumlWorker):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def render(self, source: str) -> str:
+        if self._closed:
+            raise PlantUmlWorkerError("The plantuml pool is already closed.")
+
+        worker: PlantumlWorker = self._acquire()
+        try:
+            content: str = worker.render(source, self.timeout)
+        except PlantUmlRenderError:
+            # Raised before anything was sent, the worker is still usable.
+            self._idle.put(worker)
+            raise
+        except PlantUmlWorkerError:
+            self._forget(worker)
+            self._idle.put(None)
+            raise
+        except BaseException:
+            # The state of the pipe is unknown, so the worker is discarded.
+            worker.kill()
+            self._forget(worker)
+            self._idle.put(None)
+            raise
+
+        self._idle.put(worker)
+        return content
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            workers: list[PlantumlWorker] = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -23,3 +23,7 @@ PlantumlCallable = Union[NotAvailable, JarInWorkDir, InPath, CustomJarPath]
 
 class PlantUmlNotAvailable(Exception):
     pass
+
+
+class PlantUmlRenderError(Exception):
+    pass
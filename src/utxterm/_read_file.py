@@ -1,37 +1,103 @@
+from __future__ import annotations
+import io
+import sys
 import logging
 from pathlib import Path
-from typing import assert_never
+from typing import TYPE_CHECKING, BinaryIO, Final, Iterator, assert_never
 
-from utxterm._render_puml import UtxtPath, TempDirRenderedUtxt
+if TYPE_CHECKING:
+    from utxterm._render_puml import UtxtPath
 
 
 LOGGER: logging.Logger = logging.getLogger(__name__)
 
+#: Filepath used on the command line to read from stdin.
+STDIN_PATH: Final[Path] = Path("-")
 
-def read_utxt_content(utxt_path: UtxtPath) -> str:
-    """Read the content of the given path.
+#: Size of the buffer blocks of the input are read into.
+READ_BUFFER_SIZE: Final[int] = 1024 * 1024
+
+
+def _open_stdin(encoding: str) -> io.TextIOWrapper:
+    return open(sys.stdin.fileno(), "r", encoding=encoding, closefd=False)
 
-    Will delete the temporary directory if `utxt_path` is of type
-    `TempDirRenderedUtxt`.
+
+def read_utxt_content(utxt_path: UtxtPath, encoding: str = "utf-8") -> str:
+    """Read the content of the given path.
 
     No validation on the existance of the files are done.
     It is assumed to exist and be validated.
     """
 
+    # Only needed for rendered plantuml files, so streaming a `.utxt` file
+    # does not import the plantuml rendering.
+    from utxterm._render_puml import RenderedUtxtContent
+
     content: str
     match utxt_path:
-        case Path() as filepath:
-            with open(filepath, "r") as f:
+        case Path() as filepath if filepath == STDIN_PATH:
+            with _open_stdin(encoding) as f:
                 content = f.read()
-        case TempDirRenderedUtxt():
-            with open(utxt_path.filepath, "r") as f:
+        case Path() as filepath:
+            with open(filepath, "r", encoding=encoding) as f:
                 content = f.read()
-            utxt_path.cleanup()
-            LOGGER.info(
-                "Deleted the temporary directory after "
-                "reading the file content."
-            )
+        case RenderedUtxtContent():
+            content = utxt_path.content
         case _:
             assert_never(utxt_path)
 
     return content
+
+
+def iter_utxt_lines(filepath: Path, encoding: str = "utf-8") -> Iterator[str]:
+    """Yield the lines of the given file one at a time.
+
+    Reads from stdin if `filepath` is `STDIN_PATH`. The lines keep their line
+    endings.
+    """
+
+    if filepath == STDIN_PATH:
+        with _open_stdin(encoding) as f:
+            yield from f
+        return
+
+    with open(filepath, "r", encoding=encoding) as f:
+        yield from f
+
+
+def _read_blocks(stream: BinaryIO) -> Iterator[bytes]:
+    # Both stdin and opened files are buffered, which `readinto1` needs to
+    # return what is available without waiting for a full buffer.
+    assert isinstance(stream, io.BufferedReader)
+    buffer: bytearray = bytearray(READ_BUFFER_SIZE)
+    view: memoryview = memoryview(buffer)
+    partial: bytes = b""
+    while True:
+        size: int = stream.readinto1(view)
+        if size == 0:
+            break
+        end: int = buffer.rfind(b"\n", 0, size) + 1
+        if end == 0:
+            partial += view[:size]
+            continue
+        yield partial + view[:end]
+        partial = bytes(view[end:size])
+    if len(partial) != 0:
+        yield partial
+
+
+def iter_utxt_blocks(filepath: Path) -> Iterator[bytes]:
+    """Yield the raw content of the given file in blocks of whole lines.
+
+    The file is read into a single buffer which is reused for every block.
+    Every read only returns what is available, so input from a pipe is
+    yielded as soon as a line is complete. Reads from stdin if `filepath` is
+    `STDIN_PATH`.
+    """
+
+    if filepath == STDIN_PATH:
+        yield from _read_blocks(sys.stdin.buffer)
+        return
+
+    with open(filepath, "rb") as f:
+        yield from _read_blocks(f)
@@ -1,11 +1,11 @@
+from __future__ import annotations
+import re
 import logging
-import subprocess
-from shutil import rmtree
 from pathlib import Path
 from dataclasses import dataclass
-from typing import assert_never, cast, Union, Self
-from tempfile import mkdtemp
+from typing import Final, assert_never, cast, Union, TYPE_CHECKING
 
+from utxterm import _timings
 from utxterm._pumlcallable import (
     PlantumlCallable,
     NotAvailable,
@@ -13,72 +13,194 @@ from utxterm._pumlcallable import (
     InPath,
     CustomJarPath,
     PlantUmlNotAvailable,
+    PlantUmlRenderError,
 )
 
+if TYPE_CHECKING:
+    from utxterm._plantuml_pool import PlantumlPool
+
 
 LOGGER: logging.Logger = logging.getLogger(__name__)
 
+#: Line written by plantuml after every diagram rendered in `-pipe` mode.
+PIPE_DELIMITER: Final[str] = "__UTXTERM_END_OF_DIAGRAM__"
 
-@dataclass
-class TempDirRenderedUtxt:
-    temp_dir: str
-    filepath: Path
+#: Directives of plantuml reading other files, resolved relative to the
+#: working directory of plantuml. Includes of the standard library, e.g.
+#: `!include <C4/C4>`, are part of plantuml itself.
+_INCLUDE_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"^[ \t]*!(?:include\w*|import)[ \t]+(?!<)", re.MULTILINE
+)
 
-    def cleanup(self):
-        rmtree(self.temp_dir, ignore_errors=True)
 
+@dataclass
+class RenderedUtxtContent:
+    content: str
 
-UtxtPath = Union[Path, TempDirRenderedUtxt]
 
+UtxtPath = Union[Path, RenderedUtxtContent]
 
-def render_puml(filepath: Path, puml_callable: PlantumlCallable) -> UtxtPath:
-    """Render a `.puml` file to a temporary directory.
 
-    This function does not check whether the `filepath` is actually
-    a `.puml` file. It is assumed to be validated already.
+def plantuml_base_command(puml_callable: PlantumlCallable) -> list[str]:
+    """Return the command arguments used to call plantuml.
+
+    Raises `PlantUmlNotAvailable` if no plantuml executable was found.
     """
 
-    base_render_cmd: str
     match puml_callable:
         case NotAvailable():
             raise PlantUmlNotAvailable(
                 "Cannot render the given `*.puml` file. "
                 "Did not find a valid plantuml jar or command."
             )
-        case JarInWorkDir(path) | CustomJarPath(path):
-            # The cast below is only necessary because `ty` still fails to
-            # to infer the type of values unpacked in a match statement.
-            path: Path = cast(Path, path)
-            base_render_cmd = f"java -jar {path.as_posix()}"
+        case JarInWorkDir() | CustomJarPath():
+            # `Path` defines no `__match_args__`, so the path itself has to be
+            # used instead of unpacking it in the pattern.
+            path: Path = cast(Path, puml_callable)
+            return ["java", "-jar", path.as_posix()]
         case InPath():
-            base_render_cmd = "plantuml"
+            return ["plantuml"]
         case _:
             assert_never(puml_callable)
 
-    temp_dir_str: str = mkdtemp()
-    render_cmd: str = (
-        f"{base_render_cmd} --format utxt --output-dir {temp_dir_str} "
-        f"{filepath.as_posix()}"
-    )
 
-    LOGGER.info(
-        "Calling the following command to render the plantuml file: "
-        f"'{render_cmd}'"
-    )
+def pipe_command(puml_callable: PlantumlCallable) -> list[str]:
+    """Return the command rendering diagrams from stdin to stdout.
 
-    render_cmd_args: list[str] = render_cmd.split(" ")
-    subprocess.check_call(render_cmd_args)
+    Every rendered diagram is followed by a `PIPE_DELIMITER` line.
+    """
 
-    generated_file: Path = Path(temp_dir_str) / f"{filepath.stem}.utxt"
-    temp_dir: TempDirRenderedUtxt = TempDirRenderedUtxt(
-        temp_dir_str, generated_file
-    )
-    if not generated_file.exists():
-        temp_dir.cleanup()
-        raise FileNotFoundError(
-            "Eventhough the plantuml render command successfully completed, "
-            "the generate file could not be found "
-            f"'{generated_file.as_posix()}'."
+    return [
+        *plantuml_base_command(puml_callable),
+        "-pipe",
+        "--format",
+        "utxt",
+        "-charset",
+        "UTF-8",
+        "-pipedelimitor",
+        PIPE_DELIMITER,
+    ]
+
+
+def split_diagrams(source: str) -> list[str]:
+    """Split a plantuml source into its `@start...`/`@end...` blocks.
+
+    plantuml ignores everything outside of these blocks, so it is dropped.
+    """
+
+    diagrams: list[str] = []
+    block: list[str] | None = None
+    for line in source.splitlines(keepends=True):
+        keyword: str = line.strip().lower()
+        if block is None:
+            if keyword.startswith("@start"):
+                block = [line]
+            continue
+        block.append(line)
+        if keyword.startswith("@end"):
+            diagram: str = "".join(block)
+            if not diagram.endswith("\n"):
+                diagram += "\n"
+            diagrams.append(diagram)
+            block = None
+    return diagrams
+
+
+def has_includes(diagram: str) -> bool:
+    """Whether the diagram reads other files, e.g. with `!include`.
+
+    Such diagrams have to be rendered in the directory of their file, and
+    their output changes even if their source does not.
+    """
+
+    return _INCLUDE_PATTERN.search(diagram) is not None
+
+
+def split_pipe_output(output: str) -> list[str]:
+    """Split the output of `pipe_command` into the individual diagrams."""
+
+    diagrams: list[str] = []
+    lines: list[str] = []
+    for line in output.splitlines(keepends=True):
+        if line.rstrip("\r\n") == PIPE_DELIMITER:
+            diagrams.append("".join(lines))
+            lines = []
+            continue
+        lines.append(line)
+    return diagrams
+
+
+def join_diagrams(diagrams: list[str]) -> str:
+    """Combine rendered diagrams, separated by an empty line."""
+
+    return "\n".join(diagrams)
+
+
+def render_diagrams(
+    diagrams: list[str],
+    puml_callable: PlantumlCallable,
+    directory: Path | None = None,
+) -> list[str]:
+    """Render every diagram with a single plantuml call.
+
+    The sources are sent to plantuml over stdin, and the utxt content of every
+    diagram is read from stdout, in the same order. plantuml runs in
+    `directory`, so relative includes are resolved within it.
+    """
+
+    if len(diagrams) == 0:
+        return []
+
+    # Imported here, since `.utxt` inputs never need it and importing it is a
+    # noticeable part of the startup time.
+    import subprocess
+
+    cmd: list[str] = pipe_command(puml_callable)
+    LOGGER.info(f"Rendering {len(diagrams)} diagram(s) with: '{' '.join(cmd)}'")
+    _timings.count("plantuml.calls")
+    with _timings.phase("plantuml.subprocess"):
+        completed: subprocess.CompletedProcess = subprocess.run(
+            cmd,
+            input="".join(diagrams),
+            stdout=subprocess.PIPE,
+            encoding="utf-8",
+            check=True,
+            cwd=directory,
+        )
+
+    rendered: list[str] = split_pipe_output(completed.stdout)
+    if len(rendered) != len(diagrams):
+        raise PlantUmlRenderError(
+            f"plantuml returned {len(rendered)} diagram(s) instead of "
+            f"{len(diagrams)}."
         )
+    return rendered
 
-    return temp_dir
+
+def render_puml(
+    filepath: Path,
+    puml_callable: PlantumlCallable,
+    pool: PlantumlPool | None = None,
+    encoding: str = "utf-8",
+) -> UtxtPath:
+    """Render all diagrams of a `.puml` file, read with the `encoding`.
+
+    If a `pool` is given, the file is rendered by one of its persistent
+    plantuml processes instead of starting a new one.
+
+    This function does not check whether the `filepath` is actually
+    a `.puml` file. It is assumed to be validated already.
+    """
+
+    with open(filepath, "r", encoding=encoding) as f:
+        source: str = f.read()
+
+    if pool is not None:
+        LOGGER.info("Rendering the plantuml file with the worker pool.")
+        with _timings.phase("plantuml.pipe"):
+            return RenderedUtxtContent(pool.render(source))
+
+    diagrams: list[str] = render_diagrams(
+        split_diagrams(source), puml_callable, filepath.parent
+    )
+    return RenderedUtxtContent(join_diagrams(diagrams))
@@ -0,0 +1,159 @@
+from __future__ import annotations
+import logging
+import threading
+from typing import TYPE_CHECKING, Self, overload
+
+from utxterm._colors import ColorDepth, detect_color_depth
+from utxterm._pumlcallable import PlantumlCallable
+from utxterm._replace_formatting import (
+    ReplaceMode,
+    replace_block,
+    replace_formatting,
+)
+
+if TYPE_CHECKING:
+    from utxterm._plantuml_pool import PlantumlPool
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class Renderer:
+    """Format utxt content and render plantuml sources without the CLI.
+
+    Meant to be constructed once and reused, e.g. by a long-running service.
+    The color depth is detected and plantuml is searched for only once, and
+    the plantuml processes are kept running between renders. All methods can
+    be called from multiple threads at once.
+
+    ```python
+    with Renderer(color_depth=ColorDepth.color256) as renderer:
+        print(renderer.render_puml("@startuml\\nA -> B\\n@enduml"))
+    ```
+    """
+
+    def __init__(
+        self,
+        mode: ReplaceMode = ReplaceMode.align_left,
+        color_depth: ColorDepth | None = None,
+        plantuml: PlantumlCallable | None = None,
+        reflow: bool = False,
+        pool_size: int | None = None,
+        timeout: float | None = None,
+    ):
+        """Create a renderer.
+
+        If no `color_depth` is given, it is detected from the environment.
+        If no `plantuml` executable is given, it is searched for on the first
+        call of `render_puml`. `pool_size` and `timeout` configure the
+        persistent plantuml processes, see `PlantumlPool`.
+        """
+
+        self.mode: ReplaceMode = mode
+        self.color_depth: ColorDepth = (
+            color_depth if color_depth is not None else detect_color_depth()
+        )
+        self.reflow: bool = reflow
+
+        self._plantuml: PlantumlCallable | None = plantuml
+        self._pool_size: int | None = pool_size
+        self._timeout: float | None = timeout
+        self._pool: PlantumlPool | None = None
+        self._pool_lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+
+    @property
+    def plantuml(self) -> PlantumlCallable:
+        """The plantuml executable, searched for on first access."""
+
+        with self._pool_lock:
+            if self._plantuml is None:
+                from utxterm._validate import discover_plantuml
+
+                self._plantuml = discover_plantuml()
+            return self._plantuml
+
+    def _get_pool(self) -> PlantumlPool:
+        puml_callable: PlantumlCallable = self.plantuml
+        with self._pool_lock:
+            if self._closed:
+                raise RuntimeError("The renderer is already closed.")
+            if self._pool is not None:
+                return self._pool
+
+            from utxterm._plantuml_pool import (
+                PlantumlPool,
+                DEFAULT_POOL_SIZE,
+                DEFAULT_TIMEOUT,
+            )
+
+            LOGGER.info("Starting the plantuml pool of the renderer.")
+            self._pool = PlantumlPool(
+                puml_callable,
+                size=self._pool_size or DEFAULT_POOL_SIZE,
+                timeout=self._timeout or DEFAULT_TIMEOUT,
+            )
+            return self._pool
+
+    def _format(self, content: str) -> str:
+        if self.reflow:
+            from utxterm._grid import reflow_formatting
+
+            return reflow_formatting(content, self.mode, self.color_depth)
+        return replace_formatting(content, self.mode, self.color_depth)
+
+    @overload
+    def render_utxt(self, content: str) -> str: ...
+
+    @overload
+    def render_utxt(self, content: bytes) -> bytes: ...
+
+    def render_utxt(self, content: str | bytes) -> str | bytes:
+        """Replace the formatting tags of the utxt content.
+
+        UTF-8 encoded `bytes` are returned as `bytes` again. Only their lines
+        with tags are decoded, unless `reflow` is set.
+        """
+
+        if isinstance(content, bytes):
+            if not self.reflow:
+                # Only decodes the lines which have tags.
+                return replace_block(content, self.mode, self.color_depth)
+            return self._format(content.decode("utf-8")).encode("utf-8")
+        return self._format(content)
+
+    @overload
+    def render_puml(self, source: str) -> str: ...
+
+    @overload
+    def render_puml(self, source: bytes) -> bytes: ...
+
+    def render_puml(self, source: str | bytes) -> str | bytes:
+        """Render the plantuml source to utxt and replace its tags.
+
+        Raises `PlantUmlNotAvailable` if no plantuml executable was found,
+        `PlantUmlRenderError` if the source contains no diagram, and
+        `PlantUmlWorkerError` if plantuml failed or timed out.
+        """
+
+        pool: PlantumlPool = self._get_pool()
+        if isinstance(source, bytes):
+            utxt: str = pool.render(source.decode("utf-8"))
+            return self._format(utxt).encode("utf-8")
+        return self._format(pool.render(source))
+
+    def close(self):
+        """Stop the plantuml processes. Formatting utxt is still possible."""
+
+        with self._pool_lock:
+            self._closed = True
+            pool: PlantumlPool | None = self._pool
+            self._pool = None
+        if pool is not None:
+            pool.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,35 +1,82 @@
 from __future__ import annotations
-import re
-from typing import Callable, assert_never
-from functools import partial
+import logging
+import threading
+from collections import OrderedDict
+from typing import Final, Iterable, Iterator, assert_never
 from enum import StrEnum, auto
-from dataclasses import dataclass
-
-from utxterm._colors import ColorDict, AnsiFormat, InvalidColor
+from functools import lru_cache
+from dataclasses import dataclass, field
+
+from utxterm import _timings
+from utxterm._colors import (
+    ColorDict,
+    ColorDepth,
+    AnsiFormat,
+    InvalidColor,
+    hex_to_rgb,
+    rgb_to_ansi16,
+    rgb_to_ansi256,
+)
+from utxterm._boundaries import (
+    is_aligned,
+    is_aligned_encoded,
+    is_narrow_encoded,
+    split_segments,
+)
+from utxterm._sgr import (
+    DEFAULT_STYLE,
+    Span,
+    Style,
+    StyledWriter,
+    merge_spans,
+    spans_to_ansi,
+)
+from utxterm._tags import Tag, TagHandler, TagMatcher
+from utxterm._width import display_width
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Number of color specs whose SGR parameters are remembered.
+COLOR_CACHE_SIZE: Final[int] = 4096
+#: Number of formatted segments remembered by default. Generated diagrams
+#: repeat the same rows, e.g. stereotypes and status fields, many times.
+SEGMENT_CACHE_SIZE: Final[int] = 4096
 
 
 @dataclass
-class Tag:
-    before: str
-    content: str
-    after: str
-
-    tagname: str
-    tagvalue: str | None
-
-    @staticmethod
-    def get_regex_pattern(tagname: str, boundary_str: str = "\u2502") -> str:
-        return (
-            f"(?<={boundary_str})(?P<before>[^{boundary_str}]*?)"
-            f"<(?P<tagname>{tagname})(:(?P<tagvalue>[^>]*?))?>"
-            f"(?P<content>[^{boundary_str}]*?)"
-            f"</{tagname}>"
-            f"(?P<after>[^{boundary_str}]*?)(?={boundary_str})"
+class _StyleStack:
+    """Currently active styles while walking through a segment.
+
+    Every field of the style has its own stack of the values it had before
+    each open tag. Closing a tag restores the value it had before the
+    matching opening tag, so nested tags of the same kind only end once the
+    outermost one is closed, and closing an inner color restores the outer
+    one.
+    """
+
+    previous: dict[str, list[bool | str | None]] = field(default_factory=dict)
+
+    color_depth: ColorDepth = ColorDepth.truecolor
+
+    def open(self, tag: Tag, style: Style) -> Style:
+        handler: TagHandler = _TAGS.handlers[tag.tagname]
+        if handler.field is None:
+            return style
+        self.previous.setdefault(handler.field, []).append(
+            getattr(style, handler.field)
+        )
+        return style.with_field(
+            handler.field, handler.value(tag.tagvalue, self.color_depth)
         )
 
-    @staticmethod
-    def from_match(match: re.Match):
-        return Tag(**match.groupdict())
+    def close(self, tag: Tag, style: Style) -> Style:
+        handler: TagHandler = _TAGS.handlers[tag.tagname]
+        if handler.field is None:
+            return style
+        return style.with_field(
+            handler.field, self.previous[handler.field].pop()
+        )
 
 
 class ReplaceMode(StrEnum):
@@ -83,180 +130,504 @@ class ReplaceMode(StrEnum):
         return default
 
 
-def get_ansi_color(color_spec: str) -> str:
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def get_color_params(
+    color_spec: str, color_depth: ColorDepth = ColorDepth.truecolor
+) -> str:
+    """Return the SGR parameters selecting the given foreground color.
+
+    Hex colors are converted to the nearest color available in
+    `color_depth`. Named colors are part of every palette.
+    """
+
     color_spec = color_spec.lower()
 
     ansi_color_code: int | None = ColorDict.get(color_spec)
     if ansi_color_code is not None:
-        return AnsiFormat.color(ansi_color_code)
-
-    if color_spec.startswith("#") and len(color_spec) == 7:
-        return AnsiFormat.truecolor(color_spec)
+        return AnsiFormat.color_params(ansi_color_code)
 
-    raise InvalidColor(
-        f"Could not convert the color spec '{color_spec}' to an "
-        "ANSII terminal format."
-    )
+    if not color_spec.startswith("#") or len(color_spec) != 7:
+        raise InvalidColor(
+            f"Could not convert the color spec '{color_spec}' to an "
+            "ANSII terminal format."
+        )
 
+    match color_depth:
+        case ColorDepth.truecolor | ColorDepth.none:
+            # Nothing is written for `none`, the spec is only validated.
+            return AnsiFormat.truecolor_params(color_spec)
+        case ColorDepth.color256:
+            index: int = rgb_to_ansi256(*hex_to_rgb(color_spec))
+            return AnsiFormat.color256_params(index)
+        case ColorDepth.color16:
+            code: int = rgb_to_ansi16(*hex_to_rgb(color_spec))
+            return AnsiFormat.color_params(code)
+        case _:
+            assert_never(color_depth)
 
-def _replace_single_tag(
-    match: re.Match,
-    text_fmt_func: Callable[[str, str|None],str,],
-    mode: ReplaceMode,
-) -> str:  # fmt: skip
-    tag: Tag = Tag.from_match(match)
 
-    content: str = text_fmt_func(tag.content, tag.tagvalue)
+def get_ansi_color(
+    color_spec: str, color_depth: ColorDepth = ColorDepth.truecolor
+) -> str:
+    return AnsiFormat.sgr(get_color_params(color_spec, color_depth))
 
-    match mode:
-        case ReplaceMode.simple:
-            num_left_spaces: int = len("<>") + len(tag.tagname)
-            if tag.tagvalue is not None:
-                num_left_spaces += len(":") + len(tag.tagvalue)
-            left_spaces: str = " " * num_left_spaces
-            right_spaces: str = " " * (len("</>") + len(tag.tagname))
 
-            return (
-                f"{tag.before}{left_spaces}{content}{right_spaces}{tag.after}"
-            )
+def _get_tag_color(color_spec: str | None, color_depth: ColorDepth) -> str:
+    if color_spec is None:
+        raise ValueError("Used color tag without a color value")
+    return get_color_params(color_spec, color_depth)
 
-        case ReplaceMode.align_left:
-            num_spaces: int = len("<></>") + len(tag.tagname) * 2
-            if tag.tagvalue is not None:
-                num_spaces += len(":") + len(tag.tagvalue)
-            spaces: str = " " * num_spaces
-            return f"{tag.before}{content}{tag.after}{spaces}"
 
-        case ReplaceMode.center_ws:
-            num_spaces: int = len("<></>") + len(tag.tagname) * 2
-            if tag.tagvalue is not None:
-                num_spaces += len(":") + len(tag.tagvalue)
-            num_spaces_left: int = num_spaces // 2
-            num_spaces_right: int = num_spaces // 2
+def _get_tag_background(color_spec: str | None, color_depth: ColorDepth) -> str:
+    if color_spec is None:
+        raise ValueError("Used back tag without a color value")
+    return AnsiFormat.background_params(
+        get_color_params(color_spec, color_depth)
+    )
 
-            if num_spaces % 2 == 1:
-                num_spaces_right += 1
 
-            left_spaces: str = " " * num_spaces_left
-            right_spaces: str = " " * num_spaces_right
+#: All tags and creole shorthands, and the style of the text they enclose.
+#: More tags are added by entry points, see `ENTRY_POINT_GROUP`.
+TAG_HANDLERS: Final[tuple[TagHandler, ...]] = (
+    TagHandler("b", "bold"),
+    TagHandler("i", "italic"),
+    TagHandler("u", "underline"),
+    TagHandler("s", "strikethrough"),
+    TagHandler("color", "foreground", _get_tag_color),
+    TagHandler("back", "background", _get_tag_background),
+    # Terminals can neither change the font nor raise or lower text, so
+    # these are only removed.
+    TagHandler("font"),
+    TagHandler("size"),
+    TagHandler("sub"),
+    TagHandler("sup"),
+    TagHandler("**", "bold", shorthand=True),
+    TagHandler("//", "italic", shorthand=True),
+    TagHandler("__", "underline", shorthand=True),
+    TagHandler("--", "strikethrough", shorthand=True),
+)
+
+_TAGS: Final[TagMatcher] = TagMatcher(TAG_HANDLERS)
+
+
+def _find_tags(segment: str) -> list[Tag]:
+    """Find all tags in the segment and pair the balanced ones.
+
+    Each closing tag is paired with the last unpaired opening tag of the same
+    name. Tags left without a partner are treated as plain text.
+    """
+
+    tags: list[Tag] = _TAGS.scan(segment)
+    open_tags: dict[str, list[int]] = {}
+    for index, tag in enumerate(tags):
+        if not tag.is_closing:
+            open_tags.setdefault(tag.tagname, []).append(index)
+            continue
+
+        candidates: list[int] | None = open_tags.get(tag.tagname)
+        if not candidates:
+            continue
+        partner: int = candidates.pop()
+        tag.partner = partner
+        tags[partner].partner = index
+
+    return tags
+
+
+def _pad(spans: list[Span], left: int, right: int) -> list[Span]:
+    """Add spaces in the default style around the spans."""
+
+    if left > 0:
+        spans.insert(0, (" " * left, DEFAULT_STYLE))
+    if right > 0:
+        spans.append((" " * right, DEFAULT_STYLE))
+    return spans
+
+
+def _strip_trailing(spans: list[Span], limit: int | None = None) -> int:
+    """Remove up to `limit` trailing spaces and return how many were removed.
+
+    Only spaces in the default style are removed, since the others are
+    visible, e.g. underlined.
+    """
+
+    removed: int = 0
+    while len(spans) != 0 and spans[-1][1] == DEFAULT_STYLE:
+        text: str = spans[-1][0]
+        kept: int = len(text.rstrip(" "))
+        if limit is not None:
+            kept = max(kept, len(text) - (limit - removed))
+        removed += len(text) - kept
+        if kept != 0:
+            spans[-1] = (text[:kept], DEFAULT_STYLE)
+            break
+        spans.pop()
+    return removed
+
+
+def _strip_leading(spans: list[Span]) -> int:
+    """`_strip_trailing` for all leading spaces."""
+
+    removed: int = 0
+    while len(spans) != 0 and spans[0][1] == DEFAULT_STYLE:
+        text: str = spans[0][0]
+        stripped: str = text.lstrip(" ")
+        removed += len(text) - len(stripped)
+        if len(stripped) != 0:
+            spans[0] = (stripped, DEFAULT_STYLE)
+            break
+        spans.pop(0)
+    return removed
+
+
+def _count_tags(tag_names: tuple[str, ...]):
+    if len(tag_names) == 0 or not _timings.is_enabled():
+        return
+    _timings.count("segments_formatted")
+    for tag_name in tag_names:
+        _timings.count(f"tags.{tag_name}")
+
+
+def _paired_tag_names(tags: list[Tag]) -> tuple[str, ...]:
+    """Names of all tags which are replaced, once per pair."""
+    return tuple(
+        tag.tagname
+        for tag in tags
+        if tag.partner is not None and not tag.is_closing
+    )
 
-            return (
-                f"{tag.before}{left_spaces}{content}{right_spaces}{tag.after}"
-            )
 
-        case ReplaceMode.center_line:
-            num_spaces: int = len("<></>") + len(tag.tagname) * 2
-            if tag.tagvalue is not None:
-                num_spaces += len(":") + len(tag.tagvalue)
+def _format_segment(
+    segment: str, mode: ReplaceMode, color_depth: ColorDepth
+) -> tuple[list[Span], tuple[str, ...]]:
+    """Return the spans of the segment and the names of the tags replaced."""
 
-            trailing_spaces: re.Match | None = re.search(" *$", tag.after)
-            leading_spaces: re.Match | None = re.search("^ *", tag.before)
+    if not _TAGS.has_markup(segment):
+        return [(segment, DEFAULT_STYLE)], ()
 
-            if trailing_spaces is not None:
-                num_spaces += len(trailing_spaces.group(0))
-                tag.after = tag.after.rstrip()
+    tags: list[Tag] = _find_tags(segment)
+    tag_names: tuple[str, ...] = _paired_tag_names(tags)
+    if len(tag_names) == 0:
+        return [(segment, DEFAULT_STYLE)], ()
+    return _format_tags(segment, tags, mode, color_depth), tag_names
 
-            if leading_spaces is not None:
-                num_spaces += len(leading_spaces.group(0))
-                tag.before = tag.before.lstrip()
 
-            num_spaces_left: int = num_spaces // 2
-            num_spaces_right: int = num_spaces // 2
+def format_segment(
+    segment: str,
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> list[Span]:
+    """Split a single boundary segment into spans styled by its tags.
+
+    A segment is the text between two boundary characters. All tags are
+    removed in a single walk over the segment, and the text is laid out
+    within the columns of the segment according to `mode`. The spans keep
+    one column per character, see `fit_display_width`.
+    """
+
+    spans, tag_names = _format_segment(segment, mode, color_depth)
+    _count_tags(tag_names)
+    return spans
+
+
+def _format_tags(
+    segment: str, tags: list[Tag], mode: ReplaceMode, color_depth: ColorDepth
+) -> list[Span]:
+    styles: _StyleStack = _StyleStack(color_depth=color_depth)
+    writer: StyledWriter = StyledWriter(color_depth != ColorDepth.none)
+    position: int = 0
+    total_width: int = 0
+
+    for tag in tags:
+        if tag.partner is None:
+            continue
+        writer.write(segment[position : tag.start])
+        position = tag.end
+
+        # Padding belongs to the text outside of the tag pair, so it is
+        # written before an opening and after a closing tag.
+        padding: str = ""
+        match mode:
+            case ReplaceMode.simple:
+                padding = " " * tag.width
+
+            case ReplaceMode.align_left | ReplaceMode.center_line:
+                total_width += tag.width
+
+            case ReplaceMode.center_ws:
+                pair_width: int = tag.width + tags[tag.partner].width
+                if tag.is_closing:
+                    padding = " " * (pair_width - pair_width // 2)
+                else:
+                    padding = " " * (pair_width // 2)
+
+            case _:
+                assert_never(mode)
+
+        if tag.is_closing:
+            writer.style = styles.close(tag, writer.style)
+            writer.write(padding)
+        else:
+            writer.write(padding)
+            writer.style = styles.open(tag, writer.style)
+
+    writer.write(segment[position:])
+    spans: list[Span] = writer.finish()
 
-            if num_spaces % 2 == 1:
-                num_spaces_right += 1
+    match mode:
+        case ReplaceMode.simple | ReplaceMode.center_ws:
+            return spans
 
-            left_spaces: str = " " * num_spaces_left
-            right_spaces: str = " " * num_spaces_right
+        case ReplaceMode.align_left:
+            return _pad(spans, 0, total_width)
 
-            return (
-                f"{left_spaces}{tag.before}{content}{tag.after}{right_spaces}"
-            )
+        case ReplaceMode.center_line:
+            total_width += _strip_leading(spans) + _strip_trailing(spans)
+            num_spaces_left: int = total_width // 2
+            return _pad(spans, num_spaces_left, total_width - num_spaces_left)
 
         case _:
             assert_never(mode)
 
 
-def _re_sub_single_tag(
-    content: str,
-    tag: str,
-    text_fmt_func: Callable[[str, str|None],str,],
+def replace_segment(
+    segment: str,
     mode: ReplaceMode,
-) -> str:  # fmt: skip
-    replace_fnc = partial(
-        _replace_single_tag, text_fmt_func=text_fmt_func, mode=mode
-    )
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> str:
+    """Replace all formatting tags within a single boundary segment."""
 
-    pattern: str = Tag.get_regex_pattern(tagname=tag)
-    content = re.sub(pattern, replace_fnc, content)
-    return content
+    if not _TAGS.has_markup(segment):
+        return segment
+    return spans_to_ansi(format_segment(segment, mode, color_depth))
 
 
-def replace_bold(content: str, mode: ReplaceMode) -> str:
-    return _re_sub_single_tag(
-        content=content,
-        tag="b",
-        text_fmt_func=AnsiFormat.bold,
-        mode=mode,
-    )
+def fit_display_width(spans: list[Span], segment: str) -> list[Span]:
+    """Pad or trim the formatted segment to the columns plantuml laid out.
 
+    Plantuml reserves one column per character, so wide characters push the
+    closing boundary to the right and zero width ones pull it to the left.
+    The difference is taken from or added to the trailing whitespace.
+    """
 
-def replace_italic(content: str, mode: ReplaceMode) -> str:
-    return _re_sub_single_tag(
-        content=content,
-        tag="i",
-        text_fmt_func=AnsiFormat.italic,
-        mode=mode,
-    )
+    if segment.isascii():
+        return spans
 
+    excess: int = display_width(segment) - len(segment)
+    if excess == 0:
+        return spans
 
-def replace_underline(content: str, mode: ReplaceMode) -> str:
-    return _re_sub_single_tag(
-        content=content,
-        tag="u",
-        text_fmt_func=AnsiFormat.underline,
-        mode=mode,
-    )
+    _timings.count("segments_width_fitted")
+    if excess < 0:
+        return _pad(spans, 0, -excess)
+    _strip_trailing(spans, excess)
+    return spans
 
 
-def replace_strikethrough(content: str, mode: ReplaceMode) -> str:
-    return _re_sub_single_tag(
-        content=content,
-        tag="s",
-        text_fmt_func=AnsiFormat.strikethrough,
-        mode=mode,
-    )
+@dataclass
+class _FormattedSegment:
+    """A segment formatted and fitted to its columns. Never modified."""
 
+    spans: list[Span]
+    ansi: str
+    #: Tags replaced in the segment, counted again on every use.
+    tag_names: tuple[str, ...]
 
-def _replace_color_fmt(content: str, color_spec: str | None):
-    if color_spec is None:
-        raise ValueError("Used color tag without a color value")
-    ansi_code = get_ansi_color(color_spec)
-    return f"{ansi_code}{content}{AnsiFormat.reset_fg}"
+    @staticmethod
+    def format(
+        segment: str, mode: ReplaceMode, color_depth: ColorDepth
+    ) -> _FormattedSegment:
+        spans, tag_names = _format_segment(segment, mode, color_depth)
+        spans = fit_display_width(spans, segment)
+        return _FormattedSegment(spans, spans_to_ansi(spans), tag_names)
+
+
+class _SegmentCache:
+    """Formatted segments, of which the least recently used are dropped.
+
+    Shared by all threads. Segments are formatted outside of the lock, so a
+    segment missing in several threads at once is formatted by each of them.
+    """
+
+    def __init__(self, size: int):
+        self.size: int = size
+        self._entries: OrderedDict[
+            tuple[str, ReplaceMode, ColorDepth], _FormattedSegment
+        ] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(
+        self, segment: str, mode: ReplaceMode, color_depth: ColorDepth
+    ) -> _FormattedSegment:
+        key: tuple[str, ReplaceMode, ColorDepth] = (segment, mode, color_depth)
+        formatted: _FormattedSegment | None
+        with self._lock:
+            formatted = self._entries.get(key)
+            if formatted is not None:
+                self._entries.move_to_end(key)
+        if formatted is not None:
+            if _timings.is_enabled():
+                _timings.count("segment_cache_hits")
+                _count_tags(formatted.tag_names)
+            return formatted
+
+        formatted = _FormattedSegment.format(segment, mode, color_depth)
+        _count_tags(formatted.tag_names)
+        if self.size == 0:
+            return formatted
+        _timings.count("segment_cache_misses")
+        with self._lock:
+            self._entries[key] = formatted
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return formatted
+
+
+_SEGMENTS: _SegmentCache = _SegmentCache(SEGMENT_CACHE_SIZE)
+
+
+def set_segment_cache_size(size: int):
+    """Limit the number of formatted segments remembered, `0` disables it.
+
+    The cache is shared by the whole process. The remembered segments are
+    only dropped if the size changes.
+    """
+
+    global _SEGMENTS
+    if size < 0:
+        raise ValueError("The segment cache size must not be negative.")
+    if size != _SEGMENTS.size:
+        LOGGER.info(f"Remembering up to {size} formatted segments.")
+        _SEGMENTS = _SegmentCache(size)
+
+
+def format_line(
+    line: str,
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> list[Span]:
+    """Split a single line into spans styled by its tags.
+
+    Only text enclosed by two boundary characters, see `BOUNDARIES`, is
+    considered. Text to the left of the first or to the right of the last
+    boundary is kept as is. Segments with wide or zero width characters are
+    fitted to the columns plantuml reserved for them.
+    """
+
+    if not _TAGS.has_markup(line) and is_aligned(line):
+        return [(line, DEFAULT_STYLE)]
+
+    parts: list[str] = split_segments(line)
+    spans: list[Span] = []
+    for index, part in enumerate(parts):
+        # Boundaries are at odd indices, the text before the first and after
+        # the last boundary is no segment.
+        if (
+            index % 2 == 1
+            or index == 0
+            or index == len(parts) - 1
+            or (part.isascii() and not _TAGS.has_markup(part))
+        ):
+            spans.append((part, DEFAULT_STYLE))
+            continue
+        spans.extend(_SEGMENTS.get(part, mode, color_depth).spans)
+    return merge_spans(spans)
+
+
+def replace_line(
+    line: str,
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> str:
+    """Replace all formatting tags within a single line, see `format_line`."""
+
+    if not _TAGS.has_markup(line) and is_aligned(line):
+        return line
+
+    parts: list[str] = split_segments(line)
+    # Every segment ends in the default style, so the ANSI of every segment
+    # is remembered on its own, without joining the spans of the whole line.
+    for index in range(2, len(parts) - 2, 2):
+        segment: str = parts[index]
+        if segment.isascii() and not _TAGS.has_markup(segment):
+            continue
+        parts[index] = _SEGMENTS.get(segment, mode, color_depth).ansi
+    return "".join(parts)
+
+
+def replace_block(
+    block: bytes,
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> bytes:
+    """Replace all formatting tags within UTF-8 encoded lines.
+
+    Only lines which `replace_line` would change are decoded. All others,
+    usually most of a diagram, are copied without decoding and encoding
+    them. Invalid UTF-8 is kept as is.
+    """
+
+    lines: list[bytes] = block.split(b"\n")
+    num_lines: int = len(lines)
+    if block.endswith(b"\n"):
+        # The empty text after the last newline is not a line.
+        num_lines -= 1
+    _timings.count("lines", num_lines)
+    if not _TAGS.has_markup_encoded(block) and is_narrow_encoded(block):
+        # No line of the block has anything to replace or to fit.
+        return block
+    for index, line in enumerate(lines):
+        if not _TAGS.has_markup_encoded(line) and is_aligned_encoded(line):
+            continue
+        _timings.count("lines_decoded")
+        replaced: str = replace_line(
+            line.decode("utf-8", "surrogateescape"), mode, color_depth
+        )
+        lines[index] = replaced.encode("utf-8", "surrogateescape")
+    return b"\n".join(lines)
 
 
-def replace_color(content: str, mode: ReplaceMode) -> str:
-    return _re_sub_single_tag(
-        content=content,
-        tag="color",
-        text_fmt_func=_replace_color_fmt,
-        mode=mode,
-    )
+def replace_formatting(
+    content: str,
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> str:
+    """Replace all formatting tags with ANSI sequences.
 
+    Tags can never span multiple lines or boundaries, so every line and
+    segment is handled independently in a single pass.
+    """
 
-def replace_single_sweep(content: str, mode: ReplaceMode) -> str:
-    content = replace_bold(content, mode)
-    content = replace_italic(content, mode)
-    content = replace_underline(content, mode)
-    content = replace_strikethrough(content, mode)
-    content = replace_color(content, mode)
-    return content
+    lines: list[str] = content.split("\n")
+    _timings.count("lines", len(lines))
+    return "\n".join([replace_line(line, mode, color_depth) for line in lines])
+
+
+def format_spans(
+    content: str,
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> list[list[Span]]:
+    """Split every line of the content into spans styled by its tags.
+
+    The spans can be written in any format, see `utxterm.emit`.
+    """
+
+    lines: list[str] = content.split("\n")
+    _timings.count("lines", len(lines))
+    return [format_line(line, mode, color_depth) for line in lines]
+
+
+def replace_lines(
+    lines: Iterable[str],
+    mode: ReplaceMode,
+    color_depth: ColorDepth = ColorDepth.truecolor,
+) -> Iterator[str]:
+    """Lazily replace the formatting tags of every line.
 
+    No state is kept between lines, so arbitrarily large inputs can be
+    processed with constant memory.
+    """
 
-def replace_loop(content: str, mode: ReplaceMode) -> str:
-    content_changed: bool = True
-    while content_changed:
-        new_content: str = replace_single_sweep(content, mode)
-        content_changed = content == new_content
-        content = new_content
-    return content
+    for line in lines:
+        yield replace_line(line, mode, color_depth)
@@ -0,0 +1,151 @@
+from functools import lru_cache
+from dataclasses import dataclass, replace
+from typing import Final, Iterable
+
+from utxterm._colors import AnsiFormat
+
+
+#: SGR parameters switching an attribute on and off.
+ATTRIBUTE_PARAMS: Final[dict[str, tuple[str, str]]] = {
+    "bold": ("1", "22"),
+    "italic": ("3", "23"),
+    "underline": ("4", "24"),
+    "strikethrough": ("9", "29"),
+}
+
+#: SGR parameter resetting the foreground color to the terminal default.
+RESET_FOREGROUND: Final[str] = "39"
+#: SGR parameter resetting the background color to the terminal default.
+RESET_BACKGROUND: Final[str] = "49"
+
+
+@dataclass(frozen=True)
+class Style:
+    """The full set of graphic attributes applied to a piece of text."""
+
+    bold: bool = False
+    italic: bool = False
+    underline: bool = False
+    strikethrough: bool = False
+    #: SGR parameters of the foreground color, `None` for the default.
+    foreground: str | None = None
+    #: SGR parameters of the background color, `None` for the default.
+    background: str | None = None
+
+    def with_field(self, name: str, value: bool | str | None) -> "Style":
+        return _with_field(self, name, value)
+
+
+@lru_cache(maxsize=1024)
+def _with_field(style: Style, name: str, value: bool | str | None) -> Style:
+    # Cached, so equal styles usually are the same object and are compared
+    # by identity, and `replace` only runs for new combinations.
+    return replace(style, **{name: value})
+
+
+DEFAULT_STYLE: Final[Style] = Style()
+
+
+@lru_cache(maxsize=1024)
+def sgr_transition(current: Style, target: Style) -> str:
+    """Return the shortest SGR sequence switching from `current` to `target`.
+
+    Only the attributes which actually differ are emitted, combined into a
+    single escape sequence. An empty string is returned if both styles are
+    the same.
+    """
+
+    if current == target:
+        return ""
+
+    params: list[str] = []
+    for name, (on, off) in ATTRIBUTE_PARAMS.items():
+        enabled: bool = getattr(target, name)
+        if getattr(current, name) != enabled:
+            params.append(on if enabled else off)
+
+    if current.foreground != target.foreground:
+        if target.foreground is None:
+            params.append(RESET_FOREGROUND)
+        else:
+            params.append(target.foreground)
+
+    if current.background != target.background:
+        if target.background is None:
+            params.append(RESET_BACKGROUND)
+        else:
+            params.append(target.background)
+
+    return AnsiFormat.sgr(*params)
+
+
+#: A piece of text and the style it is shown in. A plain tuple, since
+#: creating any class is a lot slower and spans are created for every tag.
+Span = tuple[str, Style]
+
+
+class StyledWriter:
+    """Collects text into spans of the style set when it was written.
+
+    Changing the style has no effect until the next piece of text is
+    written, so tags closed and reopened right after each other, empty tags
+    and several tags opened at once never add a span.
+
+    If not `enabled`, all text is written in the default style.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled: bool = enabled
+        self.spans: list[Span] = []
+        #: Style the text written next is supposed to have.
+        self.style: Style = DEFAULT_STYLE
+
+    def write(self, text: str):
+        if len(text) == 0:
+            return
+        self.spans.append((text, self.style if self.enabled else DEFAULT_STYLE))
+
+    def finish(self) -> list[Span]:
+        """Return the spans of everything written.
+
+        Spans next to each other may have the same style, see `merge_spans`.
+        """
+
+        return self.spans
+
+
+def merge_spans(spans: Iterable[Span]) -> list[Span]:
+    """Join all spans next to each other which have the same style."""
+
+    merged: list[Span] = []
+    texts: list[str] = []
+    current: Style = DEFAULT_STYLE
+    for text, style in spans:
+        if style is not current and style != current:
+            if len(texts) != 0:
+                merged.append(("".join(texts), current))
+            texts = []
+            current = style
+        texts.append(text)
+    if len(texts) != 0:
+        merged.append(("".join(texts), current))
+    return merged
+
+
+def spans_to_ansi(spans: Iterable[Span]) -> str:
+    """Join the spans with the SGR sequences switching between their styles.
+
+    The text always ends in the default style.
+    """
+
+    parts: list[str] = []
+    current: Style = DEFAULT_STYLE
+    for text, style in spans:
+        # Comparing the fields of styles is much slower than their identity.
+        if style is not current and style != current:
+            parts.append(sgr_transition(current, style))
+            current = style
+        parts.append(text)
+    if current is not DEFAULT_STYLE and current != DEFAULT_STYLE:
+        parts.append(sgr_transition(current, DEFAULT_STYLE))
+    return "".join(parts)
@@ -0,0 +1,119 @@
+import os
+import sys
+import codecs
+import logging
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from utxterm import _timings
+from utxterm._validate import Config, is_puml
+from utxterm._chunks import should_split
+from utxterm._read_file import STDIN_PATH, iter_utxt_lines, iter_utxt_blocks
+from utxterm._replace_formatting import replace_lines, replace_block
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+def can_stream(config: Config) -> bool:
+    """Whether the input can be formatted line by line while reading it.
+
+    This is the case for a single `.utxt` file or stdin which is printed.
+    Reflowing the boxes requires the whole diagram, so it is never streamed.
+    Large files are formatted in parallel instead, if multiple jobs are
+    allowed.
+    """
+
+    if (
+        config.reflow
+        or len(config.filepaths) != 1
+        or is_puml(config.filepaths[0])
+        or config.output_dir is not None
+    ):
+        return False
+
+    filepath: Path = config.filepaths[0]
+    if filepath == STDIN_PATH:
+        return True
+    return not should_split(os.path.getsize(filepath), config.jobs)
+
+
+def write_lines(lines: Iterable[str], out: BinaryIO, flush_lines: bool):
+    """Encode and write the lines to the binary stream.
+
+    If `flush_lines` is set, the stream is flushed after every line, so
+    interactive use shows each line as soon as it is formatted.
+    """
+
+    encoding: str = sys.stdout.encoding or "utf-8"
+    num_lines: int = 0
+    num_bytes: int = 0
+    try:
+        for line in lines:
+            encoded: bytes = line.encode(encoding)
+            out.write(encoded)
+            num_lines += 1
+            num_bytes += len(encoded)
+            if flush_lines:
+                out.flush()
+        out.flush()
+    finally:
+        _timings.count("lines", num_lines)
+        _timings.count("bytes_out", num_bytes)
+
+
+def _is_utf8(encoding: str | None) -> bool:
+    return encoding is not None and codecs.lookup(encoding).name == "utf-8"
+
+
+def write_blocks(blocks: Iterable[bytes], out: BinaryIO, flush_blocks: bool):
+    """Write the already encoded blocks to the binary stream."""
+
+    num_bytes: int = 0
+    try:
+        for block in blocks:
+            out.write(block)
+            num_bytes += len(block)
+            if flush_blocks:
+                out.flush()
+        out.flush()
+    finally:
+        _timings.count("bytes_out", num_bytes)
+
+
+def stream_file(filepath: Path, config: Config):
+    """Format the file line by line and write it to stdout incrementally.
+
+    If both the input and stdout are UTF-8, the file is read and written as
+    bytes, and only the lines containing tags are decoded.
+    """
+
+    LOGGER.info(f"Streaming '{filepath.as_posix()}'.")
+    interactive: bool = sys.stdout.isatty() or sys.stdin.isatty()
+    try:
+        with _timings.phase("stream"):
+            if _is_utf8(config.encoding) and _is_utf8(sys.stdout.encoding):
+                write_blocks(
+                    (
+                        replace_block(block, config.mode, config.color_depth)
+                        for block in iter_utxt_blocks(filepath)
+                    ),
+                    sys.stdout.buffer,
+                    flush_blocks=interactive,
+                )
+                return
+
+            write_lines(
+                replace_lines(
+                    iter_utxt_lines(filepath, config.encoding),
+                    config.mode,
+                    config.color_depth,
+                ),
+                sys.stdout.buffer,
+                flush_lines=interactive,
+            )
+    except BrokenPipeError:
+        # The reading end was closed (e.g. `| head`). Python would otherwise
+        # complain again when flushing stdout during shutdown.
+        devnull: int = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
@@ -0,0 +1,264 @@
+import re
+import logging
+from dataclasses import dataclass, fields
+from typing import Callable, Final, Iterable
+
+from utxterm._colors import ColorDepth
+from utxterm._sgr import Style
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Entry point group of third-party tags. Every entry point refers to a
+#: `TagHandler` or to an iterable of them.
+ENTRY_POINT_GROUP: Final[str] = "utxterm.tags"
+
+#: Name of a tag, directly following its `<` or `</`.
+_TAG_NAME_PATTERN: Final[re.Pattern[str]] = re.compile(r"\w+")
+#: Start of a tag, up to the `>` or the `:` in front of its value.
+_TAG_START: Final[str] = r"<(/?)(\w+)([>:])"
+
+#: Fields a tag can set.
+_STYLE_FIELDS: Final[frozenset[str]] = frozenset(
+    style_field.name for style_field in fields(Style)
+)
+
+#: Computes the value of a `Style` field from the value of a tag, e.g. the
+#: SGR parameters of `red` for `<color:red>`.
+TagValue = Callable[[str | None, ColorDepth], bool | str | None]
+
+
+class InvalidTagHandler(Exception):
+    pass
+
+
+def enable(value: str | None, color_depth: ColorDepth) -> bool:
+    """Value of tags switching an attribute like `bold` on."""
+    return True
+
+
+@dataclass(frozen=True)
+class TagHandler:
+    """Declares a tag, or a creole shorthand, and how it styles its text.
+
+    Tags are written as `<name>` or `<name:value>` and closed with
+    `</name>`. Shorthands enclose their text with the same marker on both
+    sides, e.g. `**bold**`.
+    """
+
+    #: Name of the tag, e.g. `b`, or the marker of a shorthand, e.g. `**`.
+    name: str
+    #: Field of `Style` set while the tag is open. Tags without a field are
+    #: removed without changing the style.
+    field: str | None = None
+    value: TagValue = enable
+    shorthand: bool = False
+
+
+@dataclass
+class Tag:
+    """A single opening or closing tag inside a segment."""
+
+    tagname: str
+    tagvalue: str | None
+    is_closing: bool
+
+    start: int
+    end: int
+
+    #: Index of the matching opening or closing tag in the token list.
+    #: `None` if the tag is unbalanced and is kept as plain text.
+    partner: int | None = None
+
+    @property
+    def width(self) -> int:
+        return self.end - self.start
+
+
+def load_entry_points() -> list[TagHandler]:
+    """Return the tags of all installed entry points."""
+
+    # Only imported once an unknown tag shows up, since it takes longer to
+    # import than most of utxterm.
+    from importlib.metadata import entry_points
+
+    handlers: list[TagHandler] = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        LOGGER.info(f"Loading the tags of '{entry_point.value}'.")
+        loaded: object = entry_point.load()
+        if isinstance(loaded, TagHandler):
+            handlers.append(loaded)
+        elif isinstance(loaded, Iterable):
+            handlers.extend(loaded)
+        else:
+            raise InvalidTagHandler(
+                f"'{entry_point.value}' is neither a TagHandler nor an "
+                "iterable of them."
+            )
+    return handlers
+
+
+class TagMatcher:
+    """All tags and shorthands, compiled into a single scan of a segment.
+
+    A single pattern finds the start of every tag and shorthand, and the
+    handler is looked up by name, so the scan takes the same time no matter
+    how many tags are declared.
+
+    Third-party tags of entry points are loaded once the first tag which is
+    not declared shows up. Entry points can only add tags, since shorthands
+    have to be known before any line is looked at.
+    """
+
+    def __init__(self, handlers: Iterable[TagHandler]):
+        self.handlers: dict[str, TagHandler] = {}
+        self._entry_points_loaded: bool = False
+
+        for handler in handlers:
+            self._add(handler)
+        markers: list[str] = [
+            handler.name
+            for handler in self.handlers.values()
+            if handler.shorthand
+        ]
+        escaped: list[str] = [re.escape(marker) for marker in markers]
+        self._start_pattern: re.Pattern[str] = re.compile(
+            "|".join([_TAG_START, *escaped])
+        )
+        # Names of tags may contain any letter, so a `<` is enough to not
+        # skip a line without decoding it.
+        self._encoded_start_pattern: re.Pattern[bytes] = re.compile(
+            "|".join(["<", *escaped]).encode("utf-8")
+        )
+        #: First characters of everything which may start a tag. Searching
+        #: for single characters is much faster than running the pattern.
+        self._start_chars: tuple[str, ...] = tuple(
+            dict.fromkeys(["<", *(marker[0] for marker in markers)])
+        )
+        self._encoded_start_chars: tuple[bytes, ...] = tuple(
+            char.encode("utf-8") for char in self._start_chars
+        )
+
+    def _add(self, handler: TagHandler):
+        if handler.shorthand:
+            if len(handler.name) == 0 or any(
+                char.isalnum() or char.isspace() or char == "<"
+                for char in handler.name
+            ):
+                raise InvalidTagHandler(
+                    f"'{handler.name}' is no valid shorthand marker."
+                )
+        elif _TAG_NAME_PATTERN.fullmatch(handler.name) is None:
+            raise InvalidTagHandler(f"'{handler.name}' is no valid tag name.")
+        if handler.field is not None and handler.field not in _STYLE_FIELDS:
+            raise InvalidTagHandler(
+                f"'{handler.field}' of '{handler.name}' is no field of Style."
+            )
+        if handler.name in self.handlers:
+            raise InvalidTagHandler(f"'{handler.name}' is declared twice.")
+        self.handlers[handler.name] = handler
+
+    def _load_entry_points(self):
+        self._entry_points_loaded = True
+        for handler in load_entry_points():
+            if handler.shorthand:
+                raise InvalidTagHandler(
+                    f"The shorthand '{handler.name}' can not be added by an "
+                    "entry point."
+                )
+            self._add(handler)
+
+    def is_declared(self, name: str) -> bool:
+        if name in self.handlers:
+            return True
+        if self._entry_points_loaded:
+            return False
+        self._load_entry_points()
+        return name in self.handlers
+
+    def has_markup(self, text: str) -> bool:
+        """Whether the text contains anything which may start a tag."""
+
+        for char in self._start_chars:
+            if char in text:
+                return self._start_pattern.search(text) is not None
+        return False
+
+    def has_markup_encoded(self, text: bytes) -> bool:
+        """`has_markup` for UTF-8 encoded text, without decoding it."""
+
+        for char in self._encoded_start_chars:
+            if char in text:
+                return self._encoded_start_pattern.search(text) is not None
+        return False
+
+    @staticmethod
+    def _scan_shorthand(
+        segment: str, marker: str, start: int, open_shorthands: set[str]
+    ) -> Tag | None:
+        """Return the shorthand `marker` at `start`, if it opens or closes.
+
+        A shorthand opens if text follows it, and closes an open one of the
+        same kind if it follows text. `--` in `a -- b` or `--->` is kept.
+        """
+
+        end: int = start + len(marker)
+        if marker in open_shorthands:
+            if segment[start - 1].isspace():
+                return None
+            open_shorthands.remove(marker)
+            return Tag(marker, None, True, start, end)
+
+        if end == len(segment):
+            return None
+        follower: str = segment[end]
+        if follower.isspace() or follower == marker[-1]:
+            return None
+        open_shorthands.add(marker)
+        return Tag(marker, None, False, start, end)
+
+    def scan(self, segment: str) -> list[Tag]:
+        """Find all opening and closing tags and shorthands in the segment.
+
+        Runs in time linear in the length of the segment, no matter how many
+        unclosed tags or stray `<` and `>` it contains: every possible start
+        of a tag is inspected once, and the position of the next `>` is only
+        searched for again once the scan passed the previous one.
+        """
+
+        tags: list[Tag] = []
+        open_shorthands: set[str] = set()
+        length: int = len(segment)
+        next_close: int = -1
+
+        match: re.Match[str] | None = self._start_pattern.search(segment)
+        while match is not None:
+            start: int = match.start()
+            tag: Tag | None = None
+            slash, name, follower = match.groups()
+
+            if name is None:
+                tag = self._scan_shorthand(
+                    segment, match.group(), start, open_shorthands
+                )
+            elif name in self.handlers or self.is_declared(name):
+                if follower == ">":
+                    tag = Tag(name, None, slash == "/", start, match.end())
+                elif slash == "":
+                    name_end: int = match.end() - 1
+                    if next_close < name_end:
+                        next_close = segment.find(">", name_end)
+                        if next_close == -1:
+                            # No tag value can ever be closed again.
+                            next_close = length
+                    if next_close < length:
+                        value: str = segment[name_end + 1 : next_close]
+                        tag = Tag(name, value, False, start, next_close + 1)
+
+            if tag is None:
+                match = self._start_pattern.search(segment, start + 1)
+                continue
+            tags.append(tag)
+            match = self._start_pattern.search(segment, tag.end)
+
+        return tags
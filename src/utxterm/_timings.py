@@ -0,0 +1,145 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Generator, Literal
+
+
+@dataclass(frozen=True)
+class TimingEvent:
+    """Emitted to every hook when a phase ends or a counter increases."""
+
+    kind: Literal["phase", "counter"]
+    name: str
+    #: Duration in seconds for phases, the increment for counters.
+    value: float
+
+
+TimingHook = Callable[[TimingEvent], None]
+
+
+@dataclass
+class Timings:
+    """Accumulated phase durations in seconds and counters of one run.
+
+    Threads started by the run record into the same object, see
+    `contextvars.copy_context`.
+    """
+
+    phases: dict[str, float] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def add_phase(self, name: str, seconds: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_count(self, name: str, value: int):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge_counters(self, counters: dict[str, int]):
+        for name, value in counters.items():
+            self.add_count(name, value)
+
+    def format(self, style: Literal["text", "json"]) -> str:
+        if style == "json":
+            import json
+
+            return json.dumps(
+                {"phases": self.phases, "counters": self.counters}, indent=2
+            )
+
+        lines: list[str] = ["Phases:"]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<24} {seconds * 1e3:>10.2f} ms")
+        lines.append("Counters:")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  {name:<24} {value:>10}")
+        return "\n".join(lines)
+
+
+#: Hooks of the whole process. Replaced instead of modified, so other threads
+#: can iterate over them without holding `_hooks_lock`.
+_hooks: tuple[TimingHook, ...] = ()
+_hooks_lock: threading.Lock = threading.Lock()
+#: Recording of the current thread or task, so concurrent runs, e.g. of the
+#: daemon, do not record into each other.
+_active: ContextVar[Timings | None] = ContextVar(
+    "utxterm_timings", default=None
+)
+
+
+def add_timing_hook(hook: TimingHook):
+    """Call `hook` with a `TimingEvent` for every phase and counter.
+
+    Hooks receive the events of all threads.
+    """
+
+    global _hooks
+    with _hooks_lock:
+        _hooks = (*_hooks, hook)
+
+
+def remove_timing_hook(hook: TimingHook):
+    global _hooks
+    with _hooks_lock:
+        hooks: list[TimingHook] = list(_hooks)
+        hooks.remove(hook)
+        _hooks = tuple(hooks)
+
+
+def start_recording() -> Timings:
+    """Collect all following phases and counters of the current thread or
+    task into the returned object.
+    """
+
+    timings: Timings = Timings()
+    _active.set(timings)
+    return timings
+
+
+def stop_recording():
+    _active.set(None)
+
+
+def is_enabled() -> bool:
+    """Whether anything listens. Used to skip collecting costly counters."""
+    return len(_hooks) != 0 or _active.get() is not None
+
+
+def record_phase(name: str, seconds: float):
+    active: Timings | None = _active.get()
+    if active is not None:
+        active.add_phase(name, seconds)
+    for hook in _hooks:
+        hook(TimingEvent("phase", name, seconds))
+
+
+def count(name: str, value: int = 1):
+    active: Timings | None = _active.get()
+    if active is not None:
+        active.add_count(name, value)
+    for hook in _hooks:
+        hook(TimingEvent("counter", name, value))
+
+
+@contextmanager
+def phase(name: str) -> Generator[None, None, None]:
+    """Measure the duration of the enclosed block as the phase `name`.
+
+    Phases with the same name are summed up.
+    """
+
+    if not is_enabled():
+        yield
+        return
+
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
@@ -1,31 +1,63 @@
 import os
 import logging
-from shutil import which
 from pathlib import Path
+from functools import cached_property
 from dataclasses import dataclass
+from typing import Any, Final
 
+from utxterm import _timings
 from utxterm._argparse import CliArgs
 from utxterm._pumlcallable import (
     PlantumlCallable,
     JarInWorkDir,
     NotAvailable,
     InPath,
+    CustomJarPath,
 )
+from utxterm._colors import ColorDepth, detect_color_depth
 from utxterm._replace_formatting import ReplaceMode
+from utxterm._read_file import STDIN_PATH
 
 
 LOGGER: logging.Logger = logging.getLogger(__name__)
 
+#: File in the cache directory storing the result of the plantuml discovery.
+DISCOVERY_STATE_FILE: Final[str] = "plantuml-discovery.json"
+DISCOVERY_STATE_VERSION: Final[int] = 1
+#: Number of working directories whose discovery result is remembered.
+DISCOVERY_STATE_MAX_ENTRIES: Final[int] = 32
+
 
 @dataclass(frozen=True)
 class Config:
-    filepath: Path
-    is_puml: bool
-    plantuml_callable: PlantumlCallable
+    filepaths: list[Path]
     mode: ReplaceMode
+    use_cache: bool
+    jobs: int
+    output_dir: Path | None
+    reflow: bool
+    color_depth: ColorDepth
+    #: Only this diagram (starting at 1) of `.puml` files is shown.
+    diagram: int | None
+    #: Encoding of the input files and stdin.
+    encoding: str
+    #: Number of formatted segments remembered by every process.
+    segment_cache_size: int
+
+    @cached_property
+    def plantuml_callable(self) -> PlantumlCallable:
+        """The plantuml executable, only searched for on first access.
+
+        Inputs which are already `.utxt` never need plantuml, so they do not
+        pay for the discovery.
+        """
+        with _timings.phase("discovery"):
+            return discover_plantuml()
 
 
 def _validate_filepath(filepath: str) -> Path:
+    if filepath == STDIN_PATH.as_posix():
+        return STDIN_PATH
     path: Path = Path(filepath).resolve()
     if not path.exists():
         raise FileNotFoundError(filepath)
@@ -34,7 +66,36 @@ def _validate_filepath(filepath: str) -> Path:
     return path
 
 
-def _is_puml(filepath: Path) -> bool:
+def _has_glob_pattern(filepath: str) -> bool:
+    return any(char in filepath for char in "*?[")
+
+
+def _expand_filepaths(filepaths: list[str]) -> list[Path]:
+    """Validate all filepaths and expand glob patterns.
+
+    Existing files are always used as is, even if their name contains glob
+    characters. Duplicates are removed, keeping the first occurrence.
+    """
+
+    expanded: list[Path] = []
+    for filepath in filepaths:
+        if os.path.exists(filepath) or not _has_glob_pattern(filepath):
+            expanded.append(_validate_filepath(filepath))
+            continue
+
+        import glob
+
+        matches: list[str] = sorted(glob.glob(filepath, recursive=True))
+        matches = [match for match in matches if not os.path.isdir(match)]
+        if len(matches) == 0:
+            raise FileNotFoundError(filepath)
+        LOGGER.info(f"Expanded '{filepath}' to {len(matches)} file(s).")
+        expanded.extend(_validate_filepath(match) for match in matches)
+
+    return list(dict.fromkeys(expanded))
+
+
+def is_puml(filepath: Path) -> bool:
     suffix: str = filepath.suffix
     return suffix == ".puml"
 
@@ -74,6 +135,8 @@ def _is_plantuml_available() -> PlantumlCallable:
 
     LOGGER.info("Checking if the `plantuml` command is available in the path.")
 
+    from shutil import which
+
     which_check: str | None = which("plantuml")
     if which_check is not None:
         LOGGER.info(f"Found the following command: '{which_check}'.")
@@ -83,17 +146,148 @@ def _is_plantuml_available() -> PlantumlCallable:
     return NotAvailable()
 
 
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _discovery_inputs() -> dict[str, Any]:
+    """Everything the result of `_is_plantuml_available` depends on.
+
+    Adding or removing a `plantuml.jar` in the working directory, or a
+    `plantuml` command in any directory of the `PATH`, changes the
+    modification time of the respective directory.
+    """
+
+    path_env: str = os.environ.get("PATH", "")
+    return {
+        "version": DISCOVERY_STATE_VERSION,
+        "cwd": os.getcwd(),
+        "cwd_mtime_ns": _mtime_ns(os.curdir),
+        "path": path_env,
+        "path_mtimes_ns": [
+            _mtime_ns(directory)
+            for directory in path_env.split(os.pathsep)
+            if directory
+        ],
+    }
+
+
+def _serialize_callable(puml_callable: PlantumlCallable) -> dict[str, str]:
+    match puml_callable:
+        case JarInWorkDir():
+            return {"kind": "jar", "path": puml_callable.as_posix()}
+        case InPath():
+            return {"kind": "path"}
+        case NotAvailable() | CustomJarPath():
+            return {"kind": "none"}
+
+
+def _deserialize_callable(data: dict[str, str]) -> PlantumlCallable | None:
+    match data.get("kind"):
+        case "jar":
+            return JarInWorkDir(data["path"])
+        case "path":
+            return InPath()
+        case "none":
+            return NotAvailable()
+        case _:
+            return None
+
+
+def discover_plantuml() -> PlantumlCallable:
+    """Find plantuml, reusing the result of a previous run if possible.
+
+    The result is stored per working directory in the cache directory,
+    together with the modification times of the working directory and all
+    `PATH` directories.
+    A single `stat` per directory replaces listing the working directory
+    and searching the `PATH`.
+    """
+
+    import json
+    from utxterm._cache import default_cache_dir
+
+    state_file: Path = default_cache_dir() / DISCOVERY_STATE_FILE
+    inputs: dict[str, Any] = _discovery_inputs()
+    cwd: str = inputs["cwd"]
+
+    entries: dict[str, Any] = {}
+    try:
+        with open(state_file, "r") as f:
+            entries = json.load(f).get("entries", {})
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    entry: dict[str, Any] = entries.get(cwd, {})
+    if entry.get("inputs") == inputs:
+        cached: PlantumlCallable | None = _deserialize_callable(
+            entry.get("result", {})
+        )
+        if cached is not None:
+            LOGGER.info("Using the plantuml discovery result of a past run.")
+            return cached
+
+    puml_callable: PlantumlCallable = _is_plantuml_available()
+
+    # Re-inserting moves the entry to the end, so the oldest one is dropped.
+    entries.pop(cwd, None)
+    entries[cwd] = {
+        "inputs": inputs,
+        "result": _serialize_callable(puml_callable),
+    }
+    while len(entries) > DISCOVERY_STATE_MAX_ENTRIES:
+        entries.pop(next(iter(entries)))
+
+    temp_file: Path = state_file.with_name(f".{state_file.name}.{os.getpid()}")
+    try:
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_file, "w") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(temp_file, state_file)
+    except OSError as e:
+        LOGGER.info(f"Could not store the plantuml discovery result: {e}")
+        temp_file.unlink(missing_ok=True)
+
+    return puml_callable
+
+
 def generate_config(args: CliArgs) -> Config:
-    LOGGER.info("Validating Filepath.")
-    filepath: Path = _validate_filepath(args.filepath)
-    is_puml: bool = _is_puml(filepath)
-    if is_puml:
-        LOGGER.info("The given filepath is of type `puml`.")
-    plantuml_callable: PlantumlCallable = _is_plantuml_available()
+    LOGGER.info("Validating Filepaths.")
+    filepaths: list[Path] = _expand_filepaths(args.filepaths)
+    num_puml: int = sum(1 for filepath in filepaths if is_puml(filepath))
+    if num_puml != 0:
+        LOGGER.info(f"{num_puml} of the given filepaths are of type `puml`.")
+
+    output_dir: Path | None = None
+    if args.output_dir is not None:
+        output_dir = Path(args.output_dir).resolve()
+        if output_dir.exists() and not output_dir.is_dir():
+            raise NotADirectoryError(args.output_dir)
+
+    jobs: int = (
+        args.jobs if args.jobs is not None else os.process_cpu_count() or 1
+    )
+
+    color_depth: ColorDepth
+    if args.color is not None:
+        color_depth = ColorDepth(args.color)
+    else:
+        color_depth = detect_color_depth()
+        LOGGER.info(f"Detected the color depth '{color_depth.value}'.")
+
     config: Config = Config(
-        filepath=filepath,
-        is_puml=is_puml,
-        plantuml_callable=plantuml_callable,
+        filepaths=filepaths,
         mode=args.mode,
+        use_cache=not args.no_cache,
+        jobs=jobs,
+        output_dir=output_dir,
+        reflow=args.reflow,
+        color_depth=color_depth,
+        diagram=args.diagram,
+        encoding=args.encoding,
+        segment_cache_size=args.segment_cache_size,
     )
     return config
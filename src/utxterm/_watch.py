@@ -0,0 +1,233 @@
+import os
+import sys
+import time
+import select
+import struct
+import hashlib
+import logging
+import ctypes
+import ctypes.util
+from pathlib import Path
+from dataclasses import replace
+from typing import Final, Protocol
+
+from utxterm._validate import Config
+from utxterm._batch import load_utxt_contents, format_contents
+
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+#: Time in seconds without further changes before a save is considered done.
+DEBOUNCE_INTERVAL: Final[float] = 0.1
+POLL_INTERVAL: Final[float] = 0.25
+
+_IN_MODIFY: Final[int] = 0x002
+_IN_ATTRIB: Final[int] = 0x004
+_IN_CLOSE_WRITE: Final[int] = 0x008
+_IN_MOVED_TO: Final[int] = 0x080
+_IN_CREATE: Final[int] = 0x100
+_IN_EVENT_HEADER: Final[struct.Struct] = struct.Struct("iIII")
+
+_ENTER_ALT_SCREEN: Final[str] = "\033[?1049h\033[?7l\033[2J"
+_LEAVE_ALT_SCREEN: Final[str] = "\033[?7h\033[?1049l"
+
+
+class FileWatcher(Protocol):
+    def wait_for_change(self, timeout: float | None) -> bool:
+        """Block until the file changed or `timeout` seconds passed.
+
+        Returns whether the file changed. `None` waits indefinitely.
+        """
+        ...
+
+    def close(self): ...
+
+
+class PollingWatcher:
+    """Detects changes by periodically comparing the `stat` of the file."""
+
+    def __init__(self, filepath: Path):
+        self.filepath: Path = filepath
+        self._signature: tuple[int, int] | None = self._stat_signature()
+
+    def _stat_signature(self) -> tuple[int, int] | None:
+        try:
+            stat: os.stat_result = os.stat(self.filepath)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def wait_for_change(self, timeout: float | None) -> bool:
+        deadline: float | None = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            signature = self._stat_signature()
+            if signature != self._signature:
+                self._signature = signature
+                return True
+
+            sleep_time: float = POLL_INTERVAL
+            if deadline is not None:
+                sleep_time = min(sleep_time, deadline - time.monotonic())
+                if sleep_time <= 0:
+                    return False
+            time.sleep(sleep_time)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Detects changes with the inotify API of linux.
+
+    The parent directory is watched instead of the file itself, since many
+    editors save by writing a new file and renaming it over the old one.
+    """
+
+    def __init__(self, filepath: Path):
+        self.filepath: Path = filepath
+
+        libc_name: str | None = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name or "libc.so.6", use_errno=True)
+        self._fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask: int = (
+            _IN_MODIFY
+            | _IN_ATTRIB
+            | _IN_CLOSE_WRITE
+            | _IN_MOVED_TO
+            | _IN_CREATE
+        )
+        watch: int = libc.inotify_add_watch(
+            self._fd, os.fsencode(filepath.parent), mask
+        )
+        if watch < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def _read_events(self) -> bool:
+        try:
+            buffer: bytes = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        filename: bytes = os.fsencode(self.filepath.name)
+        changed: bool = False
+        offset: int = 0
+        while offset < len(buffer):
+            _, _, _, name_len = _IN_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _IN_EVENT_HEADER.size
+            name: bytes = buffer[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+            changed = changed or name == filename
+        return changed
+
+    def wait_for_change(self, timeout: float | None) -> bool:
+        deadline: float | None = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            remaining: float | None = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if len(readable) == 0:
+                return False
+            if self._read_events():
+                return True
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_watcher(filepath: Path) -> FileWatcher:
+    """Use inotify where available and fall back to polling otherwise."""
+
+    if sys.platform.startswith("linux"):
+        try:
+            watcher: FileWatcher = InotifyWatcher(filepath)
+            LOGGER.info("Watching the file with inotify.")
+            return watcher
+        except (OSError, AttributeError) as e:
+            LOGGER.info(f"inotify is not available: {e}")
+
+    LOGGER.info("Watching the file by polling.")
+    return PollingWatcher(filepath)
+
+
+class TerminalPainter:
+    """Repaints only the lines which changed since the last paint."""
+
+    def __init__(self):
+        self._lines: list[str] = []
+
+    def paint(self, content: str) -> str:
+        """Return the escape sequences updating the screen to `content`."""
+
+        lines: list[str] = content.rstrip("\n").split("\n")
+        parts: list[str] = []
+        for row, line in enumerate(lines):
+            if row < len(self._lines) and self._lines[row] == line:
+                continue
+            parts.append(f"\033[{row + 1};1H{line}\033[0m\033[K")
+        for row in range(len(lines), len(self._lines)):
+            parts.append(f"\033[{row + 1};1H\033[K")
+        parts.append(f"\033[{len(lines) + 1};1H")
+
+        self._lines = lines
+        return "".join(parts)
+
+
+def _hash_file(filepath: Path) -> str | None:
+    try:
+        with open(filepath, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def watch(config: Config):
+    """Render the file and re-render it every time its content changes.
+
+    Runs until interrupted with `Ctrl+C`.
+    """
+
+    if len(config.filepaths) != 1:
+        raise ValueError("Watching is only possible for a single file.")
+    filepath: Path = config.filepaths[0]
+    # Formatting a single file in another process only adds overhead.
+    config = replace(config, jobs=1)
+
+    watcher: FileWatcher = create_watcher(filepath)
+    painter: TerminalPainter = TerminalPainter()
+    last_hash: str | None = None
+
+    sys.stdout.write(_ENTER_ALT_SCREEN)
+    try:
+        while True:
+            content_hash: str | None = _hash_file(filepath)
+            if content_hash is not None and content_hash != last_hash:
+                LOGGER.info("The file changed, rendering it again.")
+                last_hash = content_hash
+                try:
+                    utxt_content: str = load_utxt_contents(config)[0]
+                    formatted: str = format_contents([utxt_content], config)[0]
+                except Exception as e:
+                    formatted = f"Could not render the file: {e}\n"
+                sys.stdout.write(painter.paint(formatted))
+                sys.stdout.flush()
+
+            watcher.wait_for_change(None)
+            while watcher.wait_for_change(DEBOUNCE_INTERVAL):
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        sys.stdout.write(_LEAVE_ALT_SCREEN)
+        sys.stdout.flush()
@@ -0,0 +1,70 @@
+from bisect import bisect_right
+from functools import cache
+from typing import Final
+
+
+#: Code points below this are all one column wide, except for the zero width
+#: ones listed in the tables.
+_BMP_END: Final[int] = 0x10000
+
+
+@cache
+def _tables() -> tuple[tuple[int, ...], tuple[tuple[int, int], ...], bytes]:
+    """The range tables and the width of every character of the BMP.
+
+    The tables are imported on first use, so pure ASCII input never pays for
+    loading them.
+    """
+
+    from utxterm._width_table import WIDE, ZERO_WIDTH
+
+    ranges: list[tuple[int, int, int]] = sorted(
+        [(first, last, 2) for first, last in WIDE]
+        + [(first, last, 0) for first, last in ZERO_WIDTH]
+    )
+    bmp_widths: bytearray = bytearray(b"\x01" * _BMP_END)
+    for first, last, width in ranges:
+        if first >= _BMP_END:
+            break
+        last = min(last, _BMP_END - 1)
+        bmp_widths[first : last + 1] = bytes([width]) * (last - first + 1)
+
+    firsts: tuple[int, ...] = tuple(first for first, _, _ in ranges)
+    bounds: tuple[tuple[int, int], ...] = tuple(
+        (last, width) for _, last, width in ranges
+    )
+    return firsts, bounds, bytes(bmp_widths)
+
+
+def char_width(char: str) -> int:
+    """Return the number of terminal columns taken by a single character."""
+
+    code_point: int = ord(char)
+    if code_point < 0x80:
+        return 1
+
+    firsts, bounds, bmp_widths = _tables()
+    if code_point < _BMP_END:
+        return bmp_widths[code_point]
+
+    index: int = bisect_right(firsts, code_point) - 1
+    if index >= 0 and code_point <= bounds[index][0]:
+        return bounds[index][1]
+    return 1
+
+
+def display_width(text: str) -> int:
+    """Return the number of terminal columns the text takes.
+
+    East Asian wide and fullwidth characters take two columns, combining
+    marks and other zero width characters none. ASCII text is not inspected
+    character by character.
+    """
+
+    if text.isascii():
+        return len(text)
+
+    bmp_widths: bytes = _tables()[2]
+    if max(text) < "\U00010000":
+        return sum(map(bmp_widths.__getitem__, map(ord, text)))
+    return sum(map(char_width, text))
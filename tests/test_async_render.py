@@ -0,0 +1,96 @@
+import os
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from benchmarks._fake_plantuml import install_fake_plantuml
+from utxterm._pumlcallable import InPath
+from utxterm._async_render import AsyncRenderer
+from utxterm._plantuml_pool import PlantUmlRenderTimeout
+
+#: Seconds a render may take in the tests.
+TIMEOUT: float = 0.5
+
+
+def _diagram(*lines: str) -> str:
+    return "\n".join(["@startuml", *lines, "@enduml", ""])
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            # The state follows the command in parentheses.
+            state: str = f.read().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return False
+    return state not in ("Z", "X")
+
+
+@pytest.fixture
+def pid_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Put a wrapper script starting the fake in the background as the
+    `plantuml` command in front of the `PATH`, like the wrapper scripts
+    starting a JVM. The wrapper writes the process id of the fake to the
+    returned file.
+    """
+
+    fake_dir: Path = tmp_path / "fake"
+    fake_dir.mkdir()
+    fake: Path = install_fake_plantuml(fake_dir)
+    pid_file: Path = tmp_path / "fake.pid"
+    executable: Path = tmp_path / "plantuml"
+    executable.write_text(
+        "#!/bin/sh\n"
+        # Background commands read `/dev/null` instead of stdin otherwise.
+        "exec 3<&0\n"
+        f'{str(fake)!r} "$@" <&3 &\n'
+        f"echo $! > {str(pid_file)!r}\n"
+        "wait\n",
+        encoding="utf-8",
+    )
+    executable.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return pid_file
+
+
+@pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="no /proc")
+def test_timeout_kills_processes_started_by_plantuml(pid_file: Path):
+    async def render():
+        async with AsyncRenderer(
+            plantuml=InPath(), timeout=TIMEOUT
+        ) as renderer:
+            await renderer.render_unformatted(_diagram("hang"))
+
+    with pytest.raises(PlantUmlRenderTimeout):
+        asyncio.run(render())
+
+    pid: int = int(pid_file.read_text(encoding="utf-8"))
+    deadline: float = time.monotonic() + 5
+    while _is_running(pid) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not _is_running(pid)
+
+
+def test_plantuml_is_searched_outside_of_the_event_loop(
+    pid_file: Path, monkeypatch: pytest.MonkeyPatch
+):
+    import threading
+    from utxterm import _validate
+
+    searched_in: list[threading.Thread] = []
+
+    def discover_plantuml() -> InPath:
+        searched_in.append(threading.current_thread())
+        return InPath()
+
+    monkeypatch.setattr(_validate, "discover_plantuml", discover_plantuml)
+
+    async def render() -> str:
+        async with AsyncRenderer(timeout=10) as renderer:
+            return await renderer.render_unformatted(_diagram("a"))
+
+    assert asyncio.run(render()).startswith("│")
+    assert searched_in != [threading.main_thread()]
+    assert len(searched_in) == 1
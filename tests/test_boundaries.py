@@ -0,0 +1,38 @@
+import pytest
+
+from utxterm._boundaries import split_segments
+from utxterm._replace_formatting import ReplaceMode, replace_line
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        ("│ a │ b ║ c ┃", ["", "│", " a ", "│", " b ", "║", " c ", "┃", ""]),
+        ("| a | b |", ["", "|", " a ", "|", " b ", "|", ""]),
+        ("│ str | None │", ["", "│", " str | None ", "│", ""]),
+        ("┌──┐ a | b | c", ["┌──┐ a | b | c"]),
+    ],
+)
+def test_split_segments(line: str, expected: list[str]):
+    assert split_segments(line) == expected
+
+
+def test_pipe_inside_unicode_box():
+    line: str = "│<b>name</b>: str | None      │"
+    assert replace_line(line, ReplaceMode.align_left) == (
+        "│\033[1mname\033[22m: str | None             │"
+    )
+
+
+def test_tags_around_pipe_inside_unicode_box():
+    line: str = "│<color:red>a|b</color>         │"
+    assert replace_line(line, ReplaceMode.align_left) == (
+        "│\033[31ma|b\033[39m                            │"
+    )
+
+
+def test_pipe_is_boundary_of_ascii_diagrams():
+    line: str = "|<b>x</b> | y |"
+    assert replace_line(line, ReplaceMode.align_left) == (
+        "|\033[1mx\033[22m        | y |"
+    )
@@ -0,0 +1,49 @@
+import os
+import time
+from pathlib import Path
+
+from utxterm._cache import RenderCache, STALE_TEMP_AGE, TEMP_PREFIX
+
+
+def _age(path: Path, seconds: float):
+    mtime: float = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_writing_does_not_evict(tmp_path: Path):
+    cache: RenderCache = RenderCache(tmp_path, max_size=1)
+    cache.put(RenderCache.key("a", "identity"), "content a")
+    cache.put(RenderCache.key("b", "identity"), "content b")
+    assert cache.stats().num_entries == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path):
+    cache: RenderCache = RenderCache(tmp_path, max_size=len("content b"))
+    old: str = RenderCache.key("a", "identity")
+    new: str = RenderCache.key("b", "identity")
+    cache.put(old, "content a")
+    _age(tmp_path / f"{old}.utxt", 60)
+    cache.put(new, "content b")
+
+    cache.evict()
+
+    assert cache.get(old) is None
+    assert cache.get(new) == "content b"
+
+
+def test_stale_temporary_files_are_removed(tmp_path: Path):
+    stale: Path = tmp_path / f"{TEMP_PREFIX}stale.utxt"
+    stale.write_text("partial", encoding="utf-8")
+    _age(stale, 2 * STALE_TEMP_AGE)
+    # Might still be written by another process.
+    recent: Path = tmp_path / f"{TEMP_PREFIX}recent.utxt"
+    recent.write_text("partial", encoding="utf-8")
+
+    RenderCache(tmp_path).evict()
+
+    assert not stale.exists()
+    assert recent.exists()
+
+
+def test_key_depends_on_the_plantuml_identity():
+    assert RenderCache.key("a", "one") != RenderCache.key("a", "two")
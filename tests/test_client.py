@@ -0,0 +1,31 @@
+import pytest
+
+from utxterm._client import can_forward
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["diagram.puml"],
+        ["--color", "none", "a.utxt", "b.utxt"],
+        ["--mode", "center_ws", "--", "-file.utxt"],
+    ],
+)
+def test_forwarded(argv: list[str]):
+    assert can_forward(argv)
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--watch", "diagram.puml"],
+        ["--verb", "diagram.puml"],
+        ["-vo", "out", "diagram.puml"],
+        # Reading stdin would block the daemon for every other client.
+        ["-"],
+        ["--color", "none", "-"],
+        ["--", "-"],
+    ],
+)
+def test_run_locally(argv: list[str]):
+    assert not can_forward(argv)
@@ -0,0 +1,20 @@
+import pytest
+
+from utxterm._colors import ColorDepth, detect_color_depth
+
+
+@pytest.mark.parametrize(
+    ("environ", "expected"),
+    [
+        ({}, ColorDepth.color256),
+        ({"TERM": ""}, ColorDepth.color256),
+        ({"TERM": "xterm"}, ColorDepth.color16),
+        ({"TERM": "xterm-256color"}, ColorDepth.color256),
+        ({"TERM": "dumb"}, ColorDepth.none),
+        ({"TERM": "xterm", "COLORTERM": "truecolor"}, ColorDepth.truecolor),
+        ({"COLORTERM": "24bit"}, ColorDepth.truecolor),
+        ({"TERM": "xterm-256color", "NO_COLOR": "1"}, ColorDepth.none),
+    ],
+)
+def test_detect_color_depth(environ: dict[str, str], expected: ColorDepth):
+    assert detect_color_depth(environ) == expected
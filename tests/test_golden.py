@@ -0,0 +1,92 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from utxterm._colors import ColorDepth
+from utxterm._replace_formatting import ReplaceMode, replace_formatting
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+#: Expected outputs, named `<input>.<mode>.txt`. Written by utxterm 0.2.0,
+#: which used a separate SGR sequence for every tag, so the outputs are
+#: compared by their styled characters instead of their bytes.
+GOLDEN: Path = ROOT / "tests" / "golden"
+
+INPUTS: list[Path] = [ROOT / "example" / "diagram.utxt", GOLDEN / "tagged.utxt"]
+
+_SGR_PATTERN: re.Pattern[str] = re.compile(r"\033\[([0-9;]*)m")
+
+#: SGR parameters ending each attribute, by the attribute.
+_RESETS: dict[str, str] = {
+    "bold": "22",
+    "italic": "23",
+    "underline": "24",
+    "strikethrough": "29",
+    "foreground": "39",
+    "background": "49",
+}
+_ATTRIBUTES: dict[str, str] = {
+    "1": "bold",
+    "3": "italic",
+    "4": "underline",
+    "9": "strikethrough",
+}
+
+
+def _apply(style: dict[str, str], params: list[str]):
+    while len(params) != 0:
+        param: str = params.pop(0)
+        if param in ("", "0"):
+            style.clear()
+        elif param in _ATTRIBUTES:
+            style[_ATTRIBUTES[param]] = param
+        elif param in _RESETS.values():
+            name: str = next(k for k, v in _RESETS.items() if v == param)
+            style.pop(name, None)
+        elif param in ("38", "48"):
+            # `5;<index>` or `2;<red>;<green>;<blue>`.
+            length: int = 2 if params[0] == "5" else 4
+            color: str = ";".join([param, *params[:length]])
+            del params[:length]
+            name = "foreground" if param == "38" else "background"
+            style[name] = color
+        else:
+            value: int = int(param)
+            if 30 <= value <= 37 or 90 <= value <= 97:
+                style["foreground"] = param
+            elif 40 <= value <= 47 or 100 <= value <= 107:
+                style["background"] = param
+            else:
+                raise ValueError(f"Unexpected SGR parameter '{param}'.")
+
+
+def _styled_chars(text: str) -> list[tuple[str, tuple[tuple[str, str], ...]]]:
+    """Return every character shown with the style it is shown in."""
+
+    style: dict[str, str] = {}
+    chars: list[tuple[str, tuple[tuple[str, str], ...]]] = []
+    position: int = 0
+    for match in _SGR_PATTERN.finditer(text):
+        current: tuple[tuple[str, str], ...] = tuple(sorted(style.items()))
+        chars.extend((char, current) for char in text[position : match.start()])
+        _apply(style, match.group(1).split(";"))
+        position = match.end()
+    current = tuple(sorted(style.items()))
+    chars.extend((char, current) for char in text[position:])
+    return chars
+
+
+@pytest.mark.parametrize("mode", list(ReplaceMode))
+@pytest.mark.parametrize("source", INPUTS, ids=lambda path: path.stem)
+def test_output_matches_golden(source: Path, mode: ReplaceMode):
+    content: str = source.read_text(encoding="utf-8")
+    expected: str = (GOLDEN / f"{source.stem}.{mode}.txt").read_text(
+        encoding="utf-8"
+    )
+
+    output: str = replace_formatting(content, mode, ColorDepth.truecolor)
+
+    assert _styled_chars(output) == _styled_chars(expected)
+    # Every style ends within its line.
+    for line in output.split("\n"):
+        assert _styled_chars(line + "x")[-1][1] == ()
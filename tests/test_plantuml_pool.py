@@ -0,0 +1,73 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from benchmarks._fake_plantuml import install_fake_plantuml
+from utxterm._pumlcallable import InPath
+from utxterm._plantuml_pool import (
+    PlantumlPool,
+    PlantUmlWorkerError,
+    PlantUmlRenderTimeout,
+)
+
+#: Seconds a worker may take for a render in the tests.
+TIMEOUT: float = 0.5
+
+
+def _diagram(*lines: str) -> str:
+    return "\n".join(["@startuml", *lines, "@enduml", ""])
+
+
+@pytest.fixture(autouse=True)
+def fake_plantuml(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Put the fake as the `plantuml` command in front of the `PATH`."""
+
+    install_fake_plantuml(tmp_path)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.fixture
+def pool():
+    with PlantumlPool(InPath(), size=1, timeout=TIMEOUT) as pool:
+        yield pool
+
+
+def test_worker_is_reused(pool: PlantumlPool):
+    first: str = pool.render(_diagram("a"))
+    second: str = pool.render(_diagram("b"))
+    assert first == second
+
+
+def test_all_diagrams_of_a_source_are_rendered(pool: PlantumlPool):
+    rendered: str = pool.render(_diagram("a") + _diagram("b"))
+    assert rendered.count("│") == 4
+
+
+def test_crashed_worker_is_restarted(pool: PlantumlPool):
+    before: str = pool.render(_diagram("a"))
+    with pytest.raises(PlantUmlWorkerError):
+        pool.render(_diagram("crash"))
+    after: str = pool.render(_diagram("a"))
+    assert before != after
+
+
+def test_hanging_worker_times_out(pool: PlantumlPool):
+    start: float = time.monotonic()
+    with pytest.raises(PlantUmlRenderTimeout):
+        pool.render(_diagram("hang"))
+    assert time.monotonic() - start < 10 * TIMEOUT
+    # The killed worker is replaced.
+    assert pool.render(_diagram("a")).startswith("│")
+
+
+def test_timeout_is_for_the_whole_render(pool: PlantumlPool):
+    """Every line arrives within the timeout, but all of them take twice
+    as long, which has to time out.
+    """
+
+    start: float = time.monotonic()
+    with pytest.raises(PlantUmlRenderTimeout):
+        pool.render(_diagram("drip"))
+    assert time.monotonic() - start < 2 * TIMEOUT
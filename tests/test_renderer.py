@@ -0,0 +1,44 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from utxterm._colors import ColorDepth
+from utxterm._renderer import Renderer
+from utxterm._replace_formatting import (
+    SEGMENT_CACHE_SIZE,
+    ReplaceMode,
+    set_segment_cache_size,
+)
+
+EXAMPLE: Path = (
+    Path(__file__).resolve().parent.parent / "example" / "diagram.utxt"
+)
+
+
+def test_bytes_are_rendered_like_str():
+    content: str = EXAMPLE.read_text(encoding="utf-8")
+    with Renderer(color_depth=ColorDepth.color256) as renderer:
+        rendered: bytes = renderer.render_utxt(content.encode("utf-8"))
+        assert rendered.decode("utf-8") == renderer.render_utxt(content)
+
+
+def test_threads_share_the_segment_cache():
+    # Lines with distinct segments, more than fit into the cache, so
+    # entries are added and dropped by all threads at once.
+    lines: list[str] = [f"│<b>{index}</b>│" for index in range(2_000)]
+    set_segment_cache_size(100)
+    try:
+        with Renderer(mode=ReplaceMode.align_left) as renderer:
+            expected: list[str] = [renderer.render_utxt(line) for line in lines]
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results: list[list[str]] = list(
+                    executor.map(
+                        lambda _: [
+                            renderer.render_utxt(line) for line in lines
+                        ],
+                        range(8),
+                    )
+                )
+    finally:
+        set_segment_cache_size(SEGMENT_CACHE_SIZE)
+
+    assert all(result == expected for result in results)
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+from utxterm import _timings
+from utxterm._replace_formatting import (
+    SEGMENT_CACHE_SIZE,
+    ReplaceMode,
+    replace_block,
+    replace_formatting,
+    replace_line,
+    set_segment_cache_size,
+)
+
+EXAMPLE: Path = (
+    Path(__file__).resolve().parent.parent / "example" / "diagram.utxt"
+)
+
+
+@pytest.fixture
+def segment_cache():
+    """Restore the default size of the segment cache after the test."""
+
+    yield
+    set_segment_cache_size(SEGMENT_CACHE_SIZE)
+
+
+@pytest.mark.parametrize("mode", list(ReplaceMode))
+def test_block_is_replaced_like_the_decoded_content(mode: ReplaceMode):
+    content: str = EXAMPLE.read_text(encoding="utf-8") + (
+        "│<b>日本</b>    │\n│plain│\n│<i>a</i>│ tail\n"
+    )
+
+    replaced: bytes = replace_block(content.encode("utf-8"), mode)
+
+    assert replaced.decode("utf-8") == replace_formatting(content, mode)
+
+
+def test_block_keeps_invalid_utf8():
+    block: bytes = b"\xff plain\n\xfe\xff <b>x</b>\n"
+    replaced: bytes = replace_block(block, ReplaceMode.simple)
+    assert replaced.startswith(b"\xff plain\n\xfe\xff ")
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        # Nested tags are opened and closed with a single sequence.
+        ("│<b><u>x</u></b>      │", "│\033[1;4mx\033[22;24m"),
+        # Closing the inner tag only resets its own attribute.
+        ("│<b>a <i>b</i> c</b>│", "│\033[1ma \033[3mb\033[23m c\033[22m"),
+        ("│<color:red>r <b>b</b></color>│", "│\033[31mr \033[1mb\033[22;39m"),
+        # Adjacent tags switch in one sequence.
+        ("│<b>a</b><i>b</i>│", "│\033[1ma\033[22;3mb\033[23m"),
+    ],
+)
+def test_minimal_sgr_transitions(line: str, expected: str):
+    assert replace_line(line, ReplaceMode.align_left).startswith(expected)
+
+
+def test_segment_cache_hits_keep_the_output(segment_cache: None):
+    content: str = EXAMPLE.read_text(encoding="utf-8")
+    set_segment_cache_size(0)
+    uncached: str = replace_formatting(content, ReplaceMode.center_line)
+    # Changing the size starts with an empty cache.
+    set_segment_cache_size(SEGMENT_CACHE_SIZE)
+
+    timings: _timings.Timings = _timings.start_recording()
+    try:
+        first: str = replace_formatting(content, ReplaceMode.center_line)
+        second: str = replace_formatting(content, ReplaceMode.center_line)
+    finally:
+        _timings.stop_recording()
+
+    assert first == second == uncached
+    counters: dict[str, int] = timings.counters
+    assert counters["segment_cache_hits"] == counters["segment_cache_misses"]
+    # Tags are counted for every segment, no matter if it was cached.
+    assert counters["tags.b"] == 2 * 2
@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import subprocess
+from pathlib import Path
+
+import pytest
+
+#: Modules which are slow to import and not needed to show a `.utxt` file.
+#: Each of them is only imported where it is used, e.g. `subprocess` once a
+#: `.puml` file is rendered.
+HEAVY_MODULES: list[str] = [
+    "asyncio",
+    "concurrent.futures",
+    "hashlib",
+    "importlib.metadata",
+    "json",
+    "multiprocessing",
+    "shutil",
+    "socket",
+    "subprocess",
+    "tempfile",
+    "utxterm._batch",
+    "utxterm._cache",
+    "utxterm._daemon",
+    "utxterm._plantuml_pool",
+]
+
+#: Upper bound in microseconds for importing the modules of utxterm itself,
+#: without the standard library modules they import.
+OWN_BUDGET_US: int = 30_000
+#: Upper bound in milliseconds for the wall time of showing a small `.utxt`
+#: file, on top of an interpreter which only imports the standard library
+#: modules utxterm needs. These, mostly `dataclasses`, `logging`, `pathlib`
+#: and `argparse`, take about 40 ms on their own and are not measured, as they
+#: depend on the interpreter instead of utxterm.
+STARTUP_BUDGET_MS: int = 25
+
+#: Runs `utxterm --no-daemon --color none <file>` like the installed script.
+MAIN: str = (
+    "import sys; "
+    "sys.argv = ['utxterm', '--no-daemon', '--color', 'none', sys.argv[1]]; "
+    "import utxterm; "
+    "utxterm.main()"
+)
+
+
+def _environ() -> dict[str, str]:
+    src: str = str(Path(__file__).resolve().parent.parent / "src")
+    env: dict[str, str] = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [src, *filter(None, [env.get("PYTHONPATH")])]
+    )
+    # Installed packages are compiled, so compiling the sources on every
+    # run would not be measured at startup either.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def _import_times(utxt_file: Path) -> dict[str, tuple[int, int, int]]:
+    """Return the self and cumulative import time in microseconds and the
+    nesting depth of every module imported while showing the file.
+    """
+
+    result: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", MAIN, str(utxt_file)],
+        env=_environ(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        encoding="utf-8",
+        check=True,
+    )
+
+    times: dict[str, tuple[int, int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split(
+            "|"
+        )
+        if not self_us.strip().isdigit():
+            # The header line.
+            continue
+        depth: int = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+@pytest.fixture(scope="module")
+def utxt_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path: Path = tmp_path_factory.mktemp("startup") / "diagram.utxt"
+    path.write_text(
+        "┌─────────────┐\n│<b>Name</b>     │\n└─────────────┘\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_utxt_file_imports_no_heavy_modules(utxt_file: Path):
+    imported: set[str] = set(_import_times(utxt_file))
+    assert "utxterm._cli" in imported
+    assert [name for name in HEAVY_MODULES if name in imported] == []
+
+
+def test_utxt_file_imports_within_budget(utxt_file: Path):
+    own: list[int] = []
+    # Best of a few runs, to not depend on other load of the machine. The
+    # first one also writes the bytecode if it is missing.
+    for _ in range(3):
+        times: dict[str, tuple[int, int, int]] = _import_times(utxt_file)
+        own.append(
+            sum(
+                self_us
+                for name, (self_us, _, _) in times.items()
+                if name.split(".")[0] == "utxterm"
+            )
+        )
+
+    assert min(own) < OWN_BUDGET_US
+
+
+def test_utxt_file_starts_within_budget(utxt_file: Path):
+    env: dict[str, str] = _environ()
+    # The modules loaded at the end, including those of the interpreter
+    # itself, which are imported again for free.
+    loaded: str = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{MAIN}; print(*sys.modules, file=sys.stderr)",
+            str(utxt_file),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        encoding="utf-8",
+        check=True,
+    ).stderr
+    stdlib: list[str] = [
+        name for name in loaded.split() if name.split(".")[0] != "utxterm"
+    ]
+    commands: list[list[str]] = [
+        [sys.executable, "-c", MAIN, str(utxt_file)],
+        [sys.executable, "-c", f"import {', '.join(stdlib)}"],
+    ]
+
+    best: list[float] = [float("inf")] * len(commands)
+    # Alternating between the commands, so load of the machine affects both.
+    for _ in range(9):
+        for index, command in enumerate(commands):
+            start: float = time.perf_counter()
+            subprocess.run(
+                command, env=env, stdout=subprocess.DEVNULL, check=True
+            )
+            best[index] = min(best[index], time.perf_counter() - start)
+
+    assert (best[0] - best[1]) * 1000 < STARTUP_BUDGET_MS
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from utxterm._replace_formatting import ReplaceMode, replace_line
+
+#: Pieces repeated within a single segment to provoke backtracking or
+#: repeated rescans of the rest of the segment.
+ADVERSARIAL_PIECES: list[str] = [
+    # Unclosed tag values, every `<b:` would search for its `>`.
+    "<b:",
+    "<color:",
+    "<back:#fff",
+    # Closing tags without an opening one.
+    "</b>",
+    "</color>",
+    # Nested opening tags which are never closed.
+    "<b><i><u>",
+    "<color:red><b>",
+    # Runs of shorthand markers.
+    "**",
+    "--",
+    "** ",
+    "-- x",
+    "//a",
+    # Stray brackets.
+    "<",
+    "<<>",
+    "<b",
+    # Balanced pairs, which are all replaced.
+    "<b>x</b>",
+    "**x** --y--",
+]
+
+#: Repetitions of a piece in the small and in the large segment.
+SMALL_REPEATS: int = 5_000
+LARGE_REPEATS: int = 4 * SMALL_REPEATS
+
+#: Upper bound for replacing the large segment.
+MAX_SECONDS: float = 1.0
+#: Upper bound for how much longer the large segment may take than the
+#: small one. Linear time is 4, quadratic time would be 16.
+MAX_GROWTH: float = 8.0
+
+
+def _replace_seconds(line: str, mode: ReplaceMode) -> float:
+    """Best of a few runs, to not depend on other load of the machine."""
+
+    timings: list[float] = []
+    for _ in range(3):
+        start: float = time.perf_counter()
+        replace_line(line, mode)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _segment(piece: str, repeats: int) -> str:
+    return f"│{piece * repeats}│"
+
+
+@pytest.mark.parametrize("piece", ADVERSARIAL_PIECES)
+@pytest.mark.parametrize("mode", list(ReplaceMode))
+def test_scan_is_linear(piece: str, mode: ReplaceMode):
+    small: float = _replace_seconds(_segment(piece, SMALL_REPEATS), mode)
+    large: float = _replace_seconds(_segment(piece, LARGE_REPEATS), mode)
+
+    assert large < MAX_SECONDS
+    # Too short to compare reliably, and fast enough anyway.
+    if large > 0.01:
+        assert large / small < MAX_GROWTH
+
+
+@pytest.mark.parametrize("mode", list(ReplaceMode))
+def test_deeply_nested_pairs_are_linear(mode: ReplaceMode):
+    def line(repeats: int) -> str:
+        return f"│{'<b>' * repeats}x{'</b>' * repeats}│"
+
+    small: float = _replace_seconds(line(SMALL_REPEATS), mode)
+    large: float = _replace_seconds(line(LARGE_REPEATS), mode)
+
+    assert large < MAX_SECONDS
+    if large > 0.01:
+        assert large / small < MAX_GROWTH
+
+
+def test_unbalanced_tags_are_kept():
+    line: str = "│<b:x </b> <b><i>**a│"
+    assert replace_line(line, ReplaceMode.align_left) == line
@@ -0,0 +1,78 @@
+import threading
+
+from utxterm import _timings
+
+
+def test_recordings_of_threads_are_separate():
+    recorded: dict[str, _timings.Timings] = {}
+    started: threading.Barrier = threading.Barrier(2)
+
+    def record(name: str):
+        timings: _timings.Timings = _timings.start_recording()
+        # Both threads record at the same time.
+        started.wait()
+        _timings.count(name)
+        started.wait()
+        _timings.stop_recording()
+        recorded[name] = timings
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=record, args=(name,)) for name in ("a", "b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert recorded["a"].counters == {"a": 1}
+    assert recorded["b"].counters == {"b": 1}
+    assert not _timings.is_enabled()
+
+
+def test_hooks_receive_events_of_all_threads():
+    events: list[_timings.TimingEvent] = []
+    _timings.add_timing_hook(events.append)
+    try:
+        thread: threading.Thread = threading.Thread(
+            target=_timings.count, args=("thread",)
+        )
+        thread.start()
+        thread.join()
+        _timings.count("main")
+    finally:
+        _timings.remove_timing_hook(events.append)
+
+    assert [event.name for event in events] == ["thread", "main"]
+    assert not _timings.is_enabled()
+
+
+class _CountingPool:
+    """Stands in for a `PlantumlPool`, counting every render."""
+
+    size: int = 4
+
+    def render(self, source: str) -> str:
+        for _ in range(1_000):
+            _timings.count("rendered")
+        return source
+
+
+def test_pool_renders_record_into_the_run():
+    from utxterm._batch import _render_sources
+    from utxterm._pumlcallable import InPath
+
+    pool: _CountingPool = _CountingPool()
+    sources: list[str] = [f"source {index}" for index in range(16)]
+    timings: _timings.Timings = _timings.start_recording()
+    try:
+        outputs: list[str] = _render_sources(
+            sources,
+            [None] * len(sources),
+            InPath(),
+            lambda puml_callable, directory: pool,
+        )
+    finally:
+        _timings.stop_recording()
+
+    assert outputs == sources
+    assert timings.counters["rendered"] == 1_000 * len(sources)